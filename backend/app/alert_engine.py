@@ -23,6 +23,7 @@ from app.config import (
     EXCHANGE_RATE_API_URL,
     EXCHANGE_RATE_CACHE_TTL
 )
+from app.http_client import create_http_client
 from app.models import Trade, Strategy, Alert
 
 logger = logging.getLogger(__name__)
@@ -38,11 +39,13 @@ class ExchangeRateCache:
     Attributes:
         rates: Dict mapping currency to EUR exchange rate
         last_update: Timestamp of last cache update
+        client: Pooled HTTP client, created on first fetch and kept until aclose()
     """
     
     def __init__(self):
         self.rates: Dict[str, float] = {}
         self.last_update: Optional[datetime] = None
+        self.client: Optional[httpx.AsyncClient] = None
     
     async def get_rate(self, from_currency: str, to_currency: str = "EUR") -> Optional[float]:
         """Get exchange rate, fetching if needed."""
@@ -64,28 +67,35 @@ class ExchangeRateCache:
     async def _fetch_rates(self):
         """Fetch exchange rates from API."""
         try:
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                response = await client.get(EXCHANGE_RATE_API_URL)
-                response.raise_for_status()
-                data = response.json()
-                
-                # API returns rates as EUR to other currencies
-                # We need inverse for conversion TO EUR
-                base_rates = data.get("rates", {})
-                
-                # Calculate inverse rates (to EUR)
-                for currency, rate in base_rates.items():
-                    if rate > 0:
-                        self.rates[currency] = 1.0 / rate
-                
-                # EUR to EUR is 1.0
-                self.rates["EUR"] = 1.0
-                
-                self.last_update = datetime.utcnow()
-                logger.info(f"Fetched exchange rates for {len(self.rates)} currencies")
-                
+            if self.client is None:
+                self.client = create_http_client()
+            response = await self.client.get(EXCHANGE_RATE_API_URL)
+            response.raise_for_status()
+            data = response.json()
+            
+            # API returns rates as EUR to other currencies
+            # We need inverse for conversion TO EUR
+            base_rates = data.get("rates", {})
+            
+            # Calculate inverse rates (to EUR)
+            for currency, rate in base_rates.items():
+                if rate > 0:
+                    self.rates[currency] = 1.0 / rate
+            
+            # EUR to EUR is 1.0
+            self.rates["EUR"] = 1.0
+            
+            self.last_update = datetime.utcnow()
+            logger.info(f"Fetched exchange rates for {len(self.rates)} currencies")
+            
         except Exception as e:
             logger.error(f"Error fetching exchange rates: {e}", exc_info=True)
+    
+    async def aclose(self):
+        """Close the HTTP client (called on application shutdown)."""
+        if self.client is not None:
+            await self.client.aclose()
+            self.client = None
 
 
 class AlertEngine:
@@ -100,6 +110,10 @@ class AlertEngine:
         self.alerted_strategy_ids: Set[str] = set()
         self.last_volume_alert_time: Optional[datetime] = None
     
+    async def aclose(self):
+        """Release network resources (the exchange rate cache's HTTP client)."""
+        await self.rate_cache.aclose()
+    
     def set_callback(self, callback):
         """Set callback function for alerts (receives Alert object)."""
         self.alert_callback = callback
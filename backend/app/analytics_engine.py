@@ -11,25 +11,299 @@ This module provides comprehensive analytics calculations including:
 
 All calculations are optimized for real-time performance and provide
 insights that professional IRS traders need for market analysis.
+
+Buffer-wide metrics (curve, flow, currency, strategy) are served from
+TradeAggregates, which is updated as trades enter and leave the buffer so a
+poll only costs work proportional to the trades it brought in. Risk,
+real-time and pro trader metrics are vectorized with NumPy over the
+buffer's columnar store (TradeBuffer.columns). Historical context is read
+from per-day summaries of past trade files (see app.historical_index).
 """
 
 import logging
-from datetime import datetime, timedelta
-from typing import List, Dict, Optional
+from datetime import datetime
+from typing import List, Dict, Optional, Iterable, Union
 from collections import defaultdict
 import statistics
 
 import math
 
+import numpy as np
+
 from app.models import (
     Trade, Strategy, Alert, InstrumentDetail, SpreadDetail, SpreadMetrics,
     ProFlowMetrics, VolatilityMetrics, ExecutionMetrics, PriceImpactMetrics,
     ForwardCurveMetrics, HistoricalContext, ProAlert, ProTraderMetrics, ProTraderDelta
 )
+from app.columnar_store import MISSING_CODE
+from app.historical_index import HistoricalIndex, InstrumentHistory
+from app.trade_buffer import TradeBuffer, to_epoch
 
 logger = logging.getLogger(__name__)
 
 
+class TradeAggregates:
+    """
+    Running aggregates over a set of trades, maintained incrementally.
+
+    Each trade is added once when it enters the buffer and retracted when it
+    leaves, so keeping the aggregates current costs O(new trades) per poll
+    instead of a full rescan. The values a trade contributed are recorded on
+    add, which keeps retraction exact even if the Trade object is mutated later.
+
+    Attributes:
+        instruments: {instrument: {notional, count, rate_sum, rate_count}}
+        platforms: {platform: {notional, count}}
+        currencies: {currency: {notional, count}}
+        currency_instruments: {(currency, instrument): {notional, count}}
+        actions: {action_type: count}
+        instrument_by_trade_id: Instrument of each tracked trade
+    """
+
+    def __init__(self):
+        self.instruments = defaultdict(lambda: {"notional": 0.0, "count": 0, "rate_sum": 0.0, "rate_count": 0})
+        self.platforms = defaultdict(lambda: {"notional": 0.0, "count": 0})
+        self.currencies = defaultdict(lambda: {"notional": 0.0, "count": 0})
+        self.currency_instruments = defaultdict(lambda: {"notional": 0.0, "count": 0})
+        self.actions = defaultdict(int)
+        self.instrument_by_trade_id: Dict[str, str] = {}
+        self._contributions: Dict[str, tuple] = {}
+
+    def __len__(self) -> int:
+        return len(self._contributions)
+
+    def add(self, trade: Trade):
+        """Add a trade's contribution to the aggregates."""
+        trade_id = trade.dissemination_identifier
+        if trade_id in self._contributions:
+            self.remove(trade)
+
+        contribution = (
+            trade.instrument,
+            trade.platform_identifier or "Unknown",
+            trade.notional_currency_leg1 or "UNKNOWN",
+            trade.action_type,
+            trade.notional_eur,
+            trade.fixed_rate_leg1,
+        )
+        self._contributions[trade_id] = contribution
+        self._apply(contribution, 1)
+        if trade.instrument:
+            self.instrument_by_trade_id[trade_id] = trade.instrument
+
+    def remove(self, trade: Trade):
+        """Retract a trade's contribution from the aggregates."""
+        trade_id = trade.dissemination_identifier
+        contribution = self._contributions.pop(trade_id, None)
+        if contribution is None:
+            return
+        self._apply(contribution, -1)
+        self.instrument_by_trade_id.pop(trade_id, None)
+
+    def _apply(self, contribution: tuple, sign: int):
+        """Add (sign=1) or retract (sign=-1) one recorded contribution."""
+        instrument, platform, currency, action, notional, rate = contribution
+
+        self.actions[action] += sign
+        if self.actions[action] <= 0:
+            del self.actions[action]
+
+        platform_data = self.platforms[platform]
+        platform_data["count"] += sign
+        if notional:
+            platform_data["notional"] += sign * notional
+        if platform_data["count"] <= 0:
+            del self.platforms[platform]
+
+        if not notional:
+            return
+
+        self._update(self.currencies, currency, sign, notional)
+
+        if not instrument:
+            return
+
+        self._update(self.currency_instruments, (currency, instrument), sign, notional)
+
+        instrument_data = self.instruments[instrument]
+        instrument_data["notional"] += sign * notional
+        instrument_data["count"] += sign
+        if rate is not None:
+            instrument_data["rate_sum"] += sign * rate
+            instrument_data["rate_count"] += sign
+        if instrument_data["count"] <= 0:
+            del self.instruments[instrument]
+
+    @staticmethod
+    def _update(table, key, sign: int, notional: float):
+        """Update a {key: {notional, count}} table, dropping emptied keys."""
+        data = table[key]
+        data["notional"] += sign * notional
+        data["count"] += sign
+        if data["count"] <= 0:
+            del table[key]
+
+
+# Risk notional distribution buckets (EUR), and their lower edges
+NOTIONAL_BUCKETS = ["<100M", "100M-500M", "500M-1B", "1B-5B", ">5B"]
+_NOTIONAL_BUCKET_EDGES = np.array([100_000_000, 500_000_000, 1_000_000_000, 5_000_000_000], dtype=np.float64)
+
+# Price impact size buckets (EUR), and their lower edges
+IMPACT_BUCKETS = ["<100M", "100-500M", ">500M"]
+_IMPACT_BUCKET_EDGES = np.array([100_000_000, 500_000_000], dtype=np.float64)
+
+
+def _has_notional(notional: np.ndarray) -> np.ndarray:
+    """Mask of rows with a usable EUR notional (set and non-zero)."""
+    return ~np.isnan(notional) & (notional != 0)
+
+
+class WindowStats:
+    """
+    Pro trader aggregates for one time window, computed from buffer columns.
+
+    The window is a set of buffer rows, oldest first. Per-instrument stats are
+    grouped reductions (bincount/reduceat) over those rows, so a window costs
+    a fixed number of NumPy passes instead of a Python loop over its trades.
+
+    Attributes:
+        rows: Buffer row indices in the window, oldest first
+        trade_count: Number of trades in the window
+        instruments: Per-instrument stats (trades with notional and rate),
+            most recently traded instrument first
+        impact_counts: {bucket: {instrument: trade count}} for price impact
+        max_size_by_instrument: {instrument: (largest notional, trade id)}
+        large_blocks: Trades above the 5B EUR large block threshold, oldest first
+    """
+
+    def __init__(self, buffer: TradeBuffer, rows: np.ndarray):
+        self._buffer = buffer
+        self._trades: Optional[List[Trade]] = None
+        self.rows = rows
+        self.trade_count = len(rows)
+
+        columns = buffer.columns
+        self.codebook = columns.instruments
+        self.instrument_codes = columns.instrument[rows]
+        self.rates = columns.rate[rows]
+        self.has_rate = columns.has_rate[rows]
+        notional = columns.notional[rows]
+
+        self.large_blocks = [buffer[row] for row in rows[notional > 5_000_000_000].tolist()]
+
+        # Trades with an instrument and a notional
+        sized = np.flatnonzero((self.instrument_codes >= 0) & _has_notional(notional))
+        self.impact_counts = {}
+        self.max_size_by_instrument = {}
+        self.instruments = {}
+        if not sized.size:
+            return
+
+        codes = self.instrument_codes[sized]
+        sizes = notional[sized]
+        instrument_count = len(self.codebook)
+        buckets = np.searchsorted(_IMPACT_BUCKET_EDGES, sizes, side="right")
+        counts = np.bincount(buckets * instrument_count + codes, minlength=len(IMPACT_BUCKETS) * instrument_count)
+        counts = counts.reshape(len(IMPACT_BUCKETS), instrument_count)
+        for index, bucket in enumerate(IMPACT_BUCKETS):
+            self.impact_counts[bucket] = {
+                self.codebook.decode(code): int(counts[index, code])
+                for code in np.flatnonzero(counts[index]).tolist()
+            }
+
+        # Largest trade per instrument (the most recent one on ties)
+        order = np.lexsort((sized, sizes, codes))
+        ordered_codes = codes[order]
+        group_last = order[np.flatnonzero(np.r_[ordered_codes[1:] != ordered_codes[:-1], True])]
+        for position in group_last.tolist():
+            trade = buffer[int(rows[sized[position]])]
+            self.max_size_by_instrument[self.codebook.decode(int(codes[position]))] = (
+                float(sizes[position]), trade.dissemination_identifier
+            )
+
+        rated = self.has_rate[sized]
+        if rated.any():
+            self._accumulate_instruments(
+                codes[rated], sizes[rated], self.rates[sized][rated],
+                columns.timestamp[rows][sized][rated],
+                columns.action[rows][sized][rated] == columns.actions.lookup("NEWT"),
+                buckets[rated]
+            )
+
+    def _accumulate_instruments(
+        self,
+        codes: np.ndarray,
+        sizes: np.ndarray,
+        rates: np.ndarray,
+        timestamps: np.ndarray,
+        is_new: np.ndarray,
+        buckets: np.ndarray
+    ):
+        """Build per-instrument stats from the window's rated trades (oldest first)."""
+        # Stable sort groups trades by instrument, each group still oldest first
+        order = np.argsort(codes, kind="stable")
+        codes, sizes, rates = codes[order], sizes[order], rates[order]
+        timestamps, is_new, buckets = timestamps[order], is_new[order], buckets[order]
+
+        starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+        ends = np.r_[starts[1:], len(codes)]
+        group_count = len(starts)
+        group_ids = np.repeat(np.arange(group_count), ends - starts)
+
+        volume = np.add.reduceat(sizes, starts)
+        rate_sum = np.add.reduceat(rates, starts)
+        weighted_sum = np.add.reduceat(rates * sizes, starts)
+        high = np.maximum.reduceat(rates, starts)
+        low = np.minimum.reduceat(rates, starts)
+        new_count = np.add.reduceat(is_new.astype(np.int64), starts)
+        large_count = np.add.reduceat((sizes > 500_000_000).astype(np.int64), starts)
+
+        # Two-pass sample variance, ignoring NaN or infinite rates
+        finite = np.isfinite(rates)
+        valid_count = np.add.reduceat(finite.astype(np.int64), starts)
+        finite_rates = np.where(finite, rates, 0.0)
+        mean = np.add.reduceat(finite_rates, starts) / np.maximum(valid_count, 1)
+        deviation = np.where(finite, finite_rates - mean[group_ids], 0.0)
+        m2 = np.add.reduceat(deviation * deviation, starts)
+
+        bucket_keys = group_ids * len(IMPACT_BUCKETS) + buckets
+        bucket_shape = (group_count, len(IMPACT_BUCKETS))
+        bucket_rate_sum = np.bincount(bucket_keys, weights=rates, minlength=group_count * len(IMPACT_BUCKETS)).reshape(bucket_shape)
+        bucket_count = np.bincount(bucket_keys, minlength=group_count * len(IMPACT_BUCKETS)).reshape(bucket_shape)
+
+        # Most recently traded instrument first
+        for group in sorted(range(group_count), key=lambda g: order[ends[g] - 1], reverse=True):
+            start, end = int(starts[group]), int(ends[group])
+            # "Last" rate: first trade at the latest execution time
+            last_index = start + int(np.searchsorted(timestamps[start:end], timestamps[end - 1], side="left"))
+            self.instruments[self.codebook.decode(int(codes[start]))] = {
+                "count": end - start,
+                "volume": float(volume[group]),
+                "rate_sum": float(rate_sum[group]),
+                "weighted_sum": float(weighted_sum[group]),
+                "high": float(high[group]),
+                "low": float(low[group]),
+                "last_rate": float(rates[last_index]),
+                "flow_first_rate": float(rates[start]),
+                "flow_last_rate": float(rates[end - 1]),
+                "new_count": int(new_count[group]),
+                "large_count": int(large_count[group]),
+                "valid_count": int(valid_count[group]),
+                "m2": float(m2[group]),
+                "impact_buckets": {
+                    bucket: (float(bucket_rate_sum[group, index]), int(bucket_count[group, index]))
+                    for index, bucket in enumerate(IMPACT_BUCKETS)
+                },
+            }
+
+    @property
+    def trades(self) -> List[Trade]:
+        """Trades in the window, oldest first (built on first access)."""
+        if self._trades is None:
+            self._trades = [self._buffer[row] for row in self.rows.tolist()]
+        return self._trades
+
+
 class AnalyticsEngine:
     """
     Advanced analytics calculation engine.
@@ -43,13 +317,40 @@ class AnalyticsEngine:
         volume_history: Historical volume data for momentum calculations
         max_history_size: Maximum size of history buffers (1000)
         tenor_order: Standard tenor ordering for consistent sorting
+        aggregates: Incremental aggregates over the trade buffer
+        historical_index: Per-day summaries of past trade files
     """
-    
+
     def __init__(self):
         self.rate_history: List[Dict] = []  # Store historical rates for velocity
         self.volume_history: List[tuple] = []  # Store volume for momentum
         self.max_history_size = 1000  # Limit history size
-    
+        self.aggregates = TradeAggregates()
+        self.historical_index = HistoricalIndex()
+
+    def add_trades(self, trades: Iterable[Trade]):
+        """Add trades entering the buffer to the incremental aggregates."""
+        for trade in trades:
+            self.aggregates.add(trade)
+
+    def remove_trades(self, trades: Iterable[Trade]):
+        """Retract trades leaving the buffer from the incremental aggregates."""
+        for trade in trades:
+            self.aggregates.remove(trade)
+
+    def _as_trade_buffer(self, trades: Union[TradeBuffer, List[Trade]]) -> TradeBuffer:
+        """Use a TradeBuffer as-is, or index a plain list of trades by execution time."""
+        return trades if isinstance(trades, TradeBuffer) else TradeBuffer(trades)
+
+    def _resolve_aggregates(self, trades: Optional[List[Trade]]) -> TradeAggregates:
+        """Use the buffer aggregates, or build one-off aggregates for an explicit trade list."""
+        if trades is None:
+            return self.aggregates
+        aggregates = TradeAggregates()
+        for trade in trades:
+            aggregates.add(trade)
+        return aggregates
+
     def estimate_duration(self, instrument: str) -> float:
         """Estimate duration factor for DV01 calculation."""
         # Standard duration estimates for IRS by instrument
@@ -70,45 +371,34 @@ class AnalyticsEngine:
         }
         return duration_map.get(base_instrument, 5.0)  # Default to 5.0 if unknown
     
-    def calculate_hhi(self, volumes: Dict[str, float]) -> float:
+    def calculate_hhi(self, volumes: Union[Dict[str, float], np.ndarray]) -> float:
         """Calculate Herfindahl-Hirschman Index for concentration."""
-        if not volumes:
+        if isinstance(volumes, dict):
+            volumes = np.fromiter(volumes.values(), dtype=np.float64, count=len(volumes))
+        if not len(volumes):
             return 0.0
         
-        total_volume = sum(volumes.values())
+        total_volume = volumes.sum()
         if total_volume == 0:
             return 0.0
         
         # Calculate market shares
-        market_shares = {k: v / total_volume for k, v in volumes.items()}
+        market_shares = volumes / total_volume
         
         # HHI = sum of squared market shares (× 10000 for standard scale)
-        hhi = sum(share ** 2 for share in market_shares.values()) * 10000
+        hhi = float(np.dot(market_shares, market_shares)) * 10000
         return hhi
     
-    def calculate_curve_metrics(self, trades: List[Trade]) -> Dict:
-        """Calculate curve analysis metrics."""
-        # Group by instrument
-        instrument_data = defaultdict(lambda: {"notional": 0.0, "count": 0, "rates": []})
-        
-        for trade in trades:
-            if not trade.instrument or not trade.notional_eur:
-                continue
-            
-            instrument = trade.instrument
-            instrument_data[instrument]["notional"] += trade.notional_eur
-            instrument_data[instrument]["count"] += 1
-            
-            # Collect rates (use leg1 fixed rate if available)
-            if trade.fixed_rate_leg1 is not None:
-                instrument_data[instrument]["rates"].append(trade.fixed_rate_leg1)
+    def calculate_curve_metrics(self, trades: Optional[List[Trade]] = None) -> Dict:
+        """Calculate curve analysis metrics (from buffer aggregates unless trades are given)."""
+        aggregates = self._resolve_aggregates(trades)
         
         # Build instrument distribution
         instrument_distribution = []
         average_rate_by_instrument = {}
         
-        for instrument, data in instrument_data.items():
-            avg_rate = statistics.mean(data["rates"]) if data["rates"] else None
+        for instrument, data in aggregates.instruments.items():
+            avg_rate = data["rate_sum"] / data["rate_count"] if data["rate_count"] else None
             instrument_distribution.append({
                 "instrument": instrument,
                 "notional": data["notional"],
@@ -157,21 +447,11 @@ class AnalyticsEngine:
             "average_rate_by_instrument": average_rate_by_instrument
         }
     
-    def calculate_flow_metrics(self, trades: List[Trade]) -> Dict:
-        """Calculate market flow metrics."""
-        # Action breakdown
-        action_breakdown = defaultdict(int)
-        platform_data = defaultdict(lambda: {"notional": 0.0, "count": 0})
-        
-        for trade in trades:
-            # Count actions
-            action_breakdown[trade.action_type] += 1
-            
-            # Platform data
-            platform = trade.platform_identifier or "Unknown"
-            if trade.notional_eur:
-                platform_data[platform]["notional"] += trade.notional_eur
-            platform_data[platform]["count"] += 1
+    def calculate_flow_metrics(self, trades: Optional[List[Trade]] = None) -> Dict:
+        """Calculate market flow metrics (from buffer aggregates unless trades are given)."""
+        aggregates = self._resolve_aggregates(trades)
+        action_breakdown = aggregates.actions
+        platform_data = aggregates.platforms
         
         # Platform market share
         total_notional = sum(data["notional"] for data in platform_data.values())
@@ -211,71 +491,57 @@ class AnalyticsEngine:
             "avg_trade_size_by_platform": avg_trade_size_by_platform
         }
     
-    def calculate_risk_metrics(self, trades: List[Trade]) -> Dict:
-        """Calculate risk and concentration metrics."""
-        # DV01 calculation
-        total_dv01 = 0.0
-        notionals = []
+    def calculate_risk_metrics(self, trades: Union[TradeBuffer, List[Trade]]) -> Dict:
+        """Calculate risk and concentration metrics (vectorized over the buffer columns)."""
+        columns = self._as_trade_buffer(trades).columns
+        has_notional = _has_notional(columns.notional)
         
-        for trade in trades:
-            if not trade.instrument or not trade.notional_eur:
-                continue
-            
-            duration = self.estimate_duration(trade.instrument)
-            # DV01 approximation: notional × duration × 0.0001 (1bp)
-            dv01_contribution = trade.notional_eur * duration * 0.0001
-            total_dv01 += dv01_contribution
-            
-            notionals.append(trade.notional_eur)
-        
-        # Notional distribution buckets
-        buckets = {
-            "<100M": 0,
-            "100M-500M": 0,
-            "500M-1B": 0,
-            "1B-5B": 0,
-            ">5B": 0
-        }
+        # Trades with both an instrument and a notional
+        sized = has_notional & (columns.instrument >= 0)
+        notionals = columns.notional[sized]
         
-        for notional in notionals:
-            if notional < 100_000_000:
-                buckets["<100M"] += 1
-            elif notional < 500_000_000:
-                buckets["100M-500M"] += 1
-            elif notional < 1_000_000_000:
-                buckets["500M-1B"] += 1
-            elif notional < 5_000_000_000:
-                buckets["1B-5B"] += 1
-            else:
-                buckets[">5B"] += 1
+        # DV01 approximation: notional × duration × 0.0001 (1bp)
+        durations = np.array([self.estimate_duration(instrument) for instrument in columns.instruments.values], dtype=np.float64)
+        total_dv01 = float(np.dot(notionals, durations[columns.instrument[sized]])) * 0.0001 if notionals.size else 0.0
         
-        notional_distribution = [{"bucket": k, "count": v} for k, v in buckets.items()]
+        # Notional distribution buckets
+        bucket_counts = np.bincount(
+            np.searchsorted(_NOTIONAL_BUCKET_EDGES, notionals, side="right"),
+            minlength=len(NOTIONAL_BUCKETS)
+        )
+        notional_distribution = [
+            {"bucket": bucket, "count": int(count)}
+            for bucket, count in zip(NOTIONAL_BUCKETS, bucket_counts)
+        ]
         
-        # Percentiles
+        # Percentiles (partial sort around the requested ranks only)
         percentiles = {}
-        if notionals:
-            notionals_sorted = sorted(notionals)
-            percentiles = {
-                "p50": notionals_sorted[int(len(notionals_sorted) * 0.50)],
-                "p75": notionals_sorted[int(len(notionals_sorted) * 0.75)],
-                "p90": notionals_sorted[int(len(notionals_sorted) * 0.90)],
-                "p95": notionals_sorted[int(len(notionals_sorted) * 0.95)],
-                "p99": notionals_sorted[int(len(notionals_sorted) * 0.99)] if len(notionals_sorted) > 1 else notionals_sorted[-1]
+        if notionals.size:
+            count = notionals.size
+            ranks = {
+                "p50": int(count * 0.50),
+                "p75": int(count * 0.75),
+                "p90": int(count * 0.90),
+                "p95": int(count * 0.95),
+                "p99": int(count * 0.99) if count > 1 else count - 1
             }
+            partitioned = np.partition(notionals, sorted(set(ranks.values())))
+            percentiles = {name: float(partitioned[rank]) for name, rank in ranks.items()}
         
         # Concentration metrics
-        underlying_volumes = defaultdict(float)
-        for trade in trades:
-            if trade.notional_eur and trade.unique_product_identifier_underlier_name:
-                underlying_volumes[trade.unique_product_identifier_underlier_name] += trade.notional_eur
+        with_underlying = has_notional & (columns.underlying >= 0)
+        underlying_volumes = np.bincount(
+            columns.underlying[with_underlying],
+            weights=columns.notional[with_underlying],
+            minlength=len(columns.underlyings)
+        )
         
         concentration_hhi = self.calculate_hhi(underlying_volumes)
         
         # Top 5 concentration
-        total_notional = sum(underlying_volumes.values())
+        total_notional = float(underlying_volumes.sum())
         if total_notional > 0:
-            sorted_underlyings = sorted(underlying_volumes.items(), key=lambda x: x[1], reverse=True)
-            top5_notional = sum(vol for _, vol in sorted_underlyings[:5])
+            top5_notional = float(np.sort(underlying_volumes)[-5:].sum())
             top5_concentration = (top5_notional / total_notional) * 100
         else:
             top5_concentration = 0.0
@@ -288,21 +554,24 @@ class AnalyticsEngine:
             "percentiles": percentiles
         }
     
-    def calculate_realtime_metrics(self, trades: List[Trade], alerts: List[Alert]) -> Dict:
+    def calculate_realtime_metrics(self, trades: Union[TradeBuffer, List[Trade]], alerts: List[Alert]) -> Dict:
         """Calculate real-time activity metrics."""
         now = datetime.utcnow()
+        buffer = self._as_trade_buffer(trades)
+        now_epoch = to_epoch(now)
         
-        # Filter recent trades
-        trades_5min = [t for t in trades if (now - t.execution_timestamp.replace(tzinfo=None)).total_seconds() < 300]
-        trades_15min = [t for t in trades if (now - t.execution_timestamp.replace(tzinfo=None)).total_seconds() < 900]
-        trades_1h = [t for t in trades if (now - t.execution_timestamp.replace(tzinfo=None)).total_seconds() < 3600]
+        # Window starts (bisect on the time-ordered buffer)
+        start_5min = buffer.index_since(now_epoch - 300)
+        start_15min = buffer.index_since(now_epoch - 900)
+        start_1h = buffer.index_since(now_epoch - 3600)
         
-        # Volume calculations
-        volume_last_5min = sum(t.notional_eur or 0 for t in trades_5min)
-        volume_last_15min = sum(t.notional_eur or 0 for t in trades_15min)
-        volume_last_hour = sum(t.notional_eur or 0 for t in trades_1h)
+        # Volume calculations (missing notionals count as 0)
+        notionals = buffer.columns.notional
+        volume_last_5min = float(np.nansum(notionals[start_5min:]))
+        volume_last_15min = float(np.nansum(notionals[start_15min:]))
+        volume_last_hour = float(np.nansum(notionals[start_1h:]))
         
-        trades_last_5min = len(trades_5min)
+        trades_last_5min = len(buffer) - start_5min
         
         # Alert count last hour
         alerts_1h = [a for a in alerts if (now - a.timestamp.replace(tzinfo=None)).total_seconds() < 3600]
@@ -340,48 +609,32 @@ class AnalyticsEngine:
             "rate_velocity": rate_velocity
         }
     
-    def calculate_currency_metrics(self, trades: List[Trade]) -> Dict:
-        """Calculate currency breakdown."""
-        currency_data = defaultdict(lambda: {"notional": 0.0, "count": 0})
-        currency_instrument_data = defaultdict(lambda: defaultdict(float))
+    def calculate_currency_metrics(self, trades: Optional[List[Trade]] = None) -> Dict:
+        """Calculate currency breakdown (from buffer aggregates unless trades are given)."""
+        aggregates = self._resolve_aggregates(trades)
         
-        for trade in trades:
-            if not trade.notional_eur:
-                continue
-            
-            # Use leg1 currency primarily
-            currency = trade.notional_currency_leg1 or "UNKNOWN"
-            currency_data[currency]["notional"] += trade.notional_eur
-            currency_data[currency]["count"] += 1
-            
-            # Currency × Instrument heatmap
-            if trade.instrument:
-                currency_instrument_data[currency][trade.instrument] += trade.notional_eur
-        
-        # Currency breakdown
+        # Currency breakdown (leg1 currency)
         currency_breakdown = [
             {"currency": k, "notional": v["notional"], "count": v["count"]}
-            for k, v in currency_data.items()
+            for k, v in aggregates.currencies.items()
         ]
         currency_breakdown.sort(key=lambda x: x["notional"], reverse=True)
         
-        # Currency heatmap
-        currency_heatmap = []
-        for currency, instrument_data in currency_instrument_data.items():
-            for instrument, notional in instrument_data.items():
-                currency_heatmap.append({
-                    "instrument": instrument,
-                    "currency": currency,
-                    "notional": notional
-                })
+        # Currency × Instrument heatmap
+        currency_heatmap = [
+            {"instrument": instrument, "currency": currency, "notional": data["notional"]}
+            for (currency, instrument), data in aggregates.currency_instruments.items()
+        ]
         
         return {
             "currency_breakdown": currency_breakdown,
             "currency_heatmap": currency_heatmap
         }
     
-    def calculate_strategy_metrics(self, strategies: List[Strategy], trades: List[Trade]) -> Dict:
-        """Calculate strategy intelligence."""
+    def calculate_strategy_metrics(self, strategies: List[Strategy], trades: Optional[List[Trade]] = None) -> Dict:
+        """Calculate strategy intelligence (leg instruments from buffer aggregates unless trades are given)."""
+        instrument_by_trade_id = self._resolve_aggregates(trades).instrument_by_trade_id
+        
         # Strategy avg notional
         strategy_notionals = defaultdict(list)
         for strategy in strategies:
@@ -400,8 +653,7 @@ class AnalyticsEngine:
         strategy_instrument_preference = []
         for strategy in strategies:
             # Get instruments from trades in this strategy
-            strategy_trades = [t for t in trades if t.dissemination_identifier in strategy.legs]
-            instruments = [t.instrument for t in strategy_trades if t.instrument]
+            instruments = [instrument_by_trade_id[leg] for leg in strategy.legs if leg in instrument_by_trade_id]
             unique_instruments = list(set(instruments))
             if unique_instruments:
                 strategy_instrument_preference.append({
@@ -422,8 +674,7 @@ class AnalyticsEngine:
         instrument_stats = defaultdict(lambda: {"count": 0, "total_notional": 0.0})
         for strategy in strategies:
             # Get instruments from trades in this strategy
-            strategy_trades = [t for t in trades if t.dissemination_identifier in strategy.legs]
-            instruments = [t.instrument for t in strategy_trades if t.instrument]
+            instruments = [instrument_by_trade_id[leg] for leg in strategy.legs if leg in instrument_by_trade_id]
             unique_instruments = list(set(instruments))
             
             # Use the first instrument found or strategy type as key
@@ -455,86 +706,31 @@ class AnalyticsEngine:
     # Pro Trader Metrics for EUR IRS Market Makers
     # ============================================================================
 
-    def _calculate_instrument_details_eur(self, trades: List[Trade]) -> Dict[str, InstrumentDetail]:
-        """Calculate detailed metrics for each EUR instrument."""
-        instrument_data = defaultdict(lambda: {
-            "rates": [],
-            "rates_with_notional": [],  # (rate, notional) for VWAP
-            "volumes": [],
-            "trade_count": 0,
-            "total_volume": 0.0,
-            "last_rate": None,
-            "last_timestamp": None
-        })
-        
-        # Group trades by instrument
-        # Accept all trades (not just EUR) if no EUR available
-        eur_trades = [t for t in trades if t.notional_currency_leg1 == "EUR"]
-        trades_to_use = eur_trades if eur_trades else trades
-        
-        for trade in trades_to_use:
-            if not trade.instrument or not trade.notional_eur:
-                continue
-            
-            if trade.fixed_rate_leg1 is None:
-                continue
-            
-            instrument = trade.instrument
-            rate = trade.fixed_rate_leg1
-            notional = trade.notional_eur
-            
-            instrument_data[instrument]["rates"].append(rate)
-            instrument_data[instrument]["rates_with_notional"].append((rate, notional))
-            instrument_data[instrument]["volumes"].append(notional)
-            instrument_data[instrument]["trade_count"] += 1
-            instrument_data[instrument]["total_volume"] += notional
-            
-            # Track last rate
-            if (instrument_data[instrument]["last_timestamp"] is None or 
-                trade.execution_timestamp > instrument_data[instrument]["last_timestamp"]):
-                instrument_data[instrument]["last_rate"] = rate
-                instrument_data[instrument]["last_timestamp"] = trade.execution_timestamp
-        
-        # Calculate metrics per instrument
+    def _calculate_instrument_details_eur(self, window: WindowStats) -> Dict[str, InstrumentDetail]:
+        """Calculate detailed metrics for each EUR instrument from window aggregates."""
         result = {}
-        for instrument, data in instrument_data.items():
-            if not data["rates"]:
-                continue
-            
-            rates = data["rates"]
-            high = max(rates) * 100  # Convert to %
-            low = min(rates) * 100
-            mid = statistics.mean(rates) * 100
+        for instrument, data in window.instruments.items():
+            high = data["high"] * 100  # Convert to %
+            low = data["low"] * 100
+            mid = data["rate_sum"] / data["count"] * 100
             
             # VWAP calculation
-            total_weighted = sum(rate * notional for rate, notional in data["rates_with_notional"])
-            total_notional = sum(data["volumes"])
-            vwap = (total_weighted / total_notional * 100) if total_notional > 0 else None
+            total_notional = data["volume"]
+            vwap = (data["weighted_sum"] / total_notional * 100) if total_notional > 0 else None
             
-            # Volatility (annualized)
+            # Volatility (annualized), ignoring NaN or infinite rates
             std_dev = None
-            if len(rates) > 1:
-                try:
-                    # Filter out any NaN or infinite values
-                    valid_rates = [r for r in rates if not (math.isnan(r) or math.isinf(r))]
-                    if len(valid_rates) > 1:
-                        std_dev = statistics.stdev(valid_rates)
-                        # Annualize: assume trades over time_window, scale to year
-                        volatility = std_dev * (252 ** 0.5) * 100  # Rough annualization
-                    else:
-                        volatility = None
-                except (statistics.StatisticsError, ValueError) as e:
-                    logger.warning(f"Error calculating stdev for instrument {instrument}: {e}")
-                    volatility = None
-            else:
-                volatility = None
+            volatility = None
+            if data["valid_count"] > 1:
+                std_dev = math.sqrt(data["m2"] / (data["valid_count"] - 1))
+                # Annualize: assume trades over time_window, scale to year
+                volatility = std_dev * (252 ** 0.5) * 100  # Rough annualization
             
             # Bid/Ask spread estimation (simplified: use std dev of rates)
             bid_ask_spread = (std_dev * 10000) if std_dev is not None else None  # Convert to bps
             
-            # Price impact (simplified: correlation between size and rate movement)
-            # Group by size buckets and measure impact
-            price_impact = self._estimate_price_impact(data["rates_with_notional"])
+            # Price impact (simplified: rate difference between size buckets)
+            price_impact = self._estimate_price_impact(data["impact_buckets"], data["count"])
             
             result[instrument] = InstrumentDetail(
                 instrument=instrument,
@@ -543,9 +739,9 @@ class AnalyticsEngine:
                 mid=mid,
                 vwap=vwap,
                 last=data["last_rate"] * 100 if data["last_rate"] else None,
-                volume=data["total_volume"],
-                trade_count=data["trade_count"],
-                avg_trade_size=data["total_volume"] / data["trade_count"] if data["trade_count"] > 0 else 0,
+                volume=data["volume"],
+                trade_count=data["count"],
+                avg_trade_size=data["volume"] / data["count"],
                 bid_ask_spread=bid_ask_spread,
                 volatility=volatility,
                 price_impact=price_impact
@@ -553,31 +749,17 @@ class AnalyticsEngine:
         
         return result
 
-    def _estimate_price_impact(self, rates_with_notional: List[tuple]) -> Optional[float]:
-        """Estimate price impact for 100M EUR trade."""
-        if len(rates_with_notional) < 2:
+    def _estimate_price_impact(self, impact_buckets: Dict[str, tuple], trade_count: int) -> Optional[float]:
+        """Estimate price impact for 100M EUR trade from per-size-bucket rate sums."""
+        if trade_count < 2:
             return None
         
-        # Group by size buckets
-        buckets = {
-            "<100M": [],
-            "100-500M": [],
-            ">500M": []
-        }
-        
-        for rate, notional in rates_with_notional:
-            if notional < 100_000_000:
-                buckets["<100M"].append(rate)
-            elif notional < 500_000_000:
-                buckets["100-500M"].append(rate)
-            else:
-                buckets[">500M"].append(rate)
-        
         # Calculate average rate per bucket
-        bucket_avgs = {}
-        for bucket, rates in buckets.items():
-            if rates:
-                bucket_avgs[bucket] = statistics.mean(rates)
+        bucket_avgs = {
+            bucket: rate_sum / count
+            for bucket, (rate_sum, count) in impact_buckets.items()
+            if count
+        }
         
         # Estimate impact: difference between large and small trades
         if ">500M" in bucket_avgs and "<100M" in bucket_avgs:
@@ -634,9 +816,9 @@ class AnalyticsEngine:
             spread_2y_30y=spread_2y_30y
         )
 
-    def _calculate_order_flow_imbalance(self, trades: List[Trade]) -> ProFlowMetrics:
+    def _calculate_order_flow_imbalance(self, window: WindowStats) -> ProFlowMetrics:
         """Calculate order flow imbalance for Market Making."""
-        if not trades:
+        if not window.trade_count:
             return ProFlowMetrics(
                 net_flow_direction="BALANCED",
                 flow_intensity=0.0,
@@ -649,45 +831,30 @@ class AnalyticsEngine:
         
         # Analyze rate movements to infer flow direction
         # If rates are rising, there's sell pressure; if falling, buy pressure
-        instrument_rates = defaultdict(list)
-        instrument_volumes = defaultdict(float)
-        new_trades = 0
-        large_blocks = 0
-        
-        for trade in trades:
-            if trade.instrument and trade.fixed_rate_leg1 is not None and trade.notional_eur:
-                instrument_rates[trade.instrument].append((trade.execution_timestamp, trade.fixed_rate_leg1))
-                instrument_volumes[trade.instrument] += trade.notional_eur
-                
-                if trade.action_type == "NEWT":
-                    new_trades += 1
-                
-                if trade.notional_eur > 500_000_000:
-                    large_blocks += 1
-        
-        # Determine flow direction by analyzing rate trends
         buy_pressure = 0
         sell_pressure = 0
         flow_by_instrument = {}
+        instrument_volumes = {}
+        new_trades = 0
+        large_blocks = 0
         
-        for instrument, rate_history in instrument_rates.items():
-            if len(rate_history) < 2:
+        for instrument, data in window.instruments.items():
+            instrument_volumes[instrument] = data["volume"]
+            new_trades += data["new_count"]
+            large_blocks += data["large_count"]
+            
+            if data["count"] < 2:
                 flow_by_instrument[instrument] = "BALANCED"
                 continue
             
-            # Sort by timestamp
-            rate_history.sort(key=lambda x: x[0])
-            
-            # Calculate trend
-            first_rate = rate_history[0][1]
-            last_rate = rate_history[-1][1]
-            rate_change = last_rate - first_rate
+            # Trend between the first and last rate of the window
+            rate_change = data["flow_last_rate"] - data["flow_first_rate"]
             
             if rate_change < -0.0001:  # Rates falling = buy pressure
-                buy_pressure += instrument_volumes[instrument]
+                buy_pressure += data["volume"]
                 flow_by_instrument[instrument] = "BUY_PRESSURE"
             elif rate_change > 0.0001:  # Rates rising = sell pressure
-                sell_pressure += instrument_volumes[instrument]
+                sell_pressure += data["volume"]
                 flow_by_instrument[instrument] = "SELL_PRESSURE"
             else:
                 flow_by_instrument[instrument] = "BALANCED"
@@ -719,8 +886,19 @@ class AnalyticsEngine:
             flow_by_instrument=flow_by_instrument
         )
 
-    def _calculate_volatility_metrics(self, trades: List[Trade], instrument_metrics: Dict[str, InstrumentDetail]) -> VolatilityMetrics:
-        """Calculate volatility metrics."""
+    def _calculate_volatility_metrics(
+        self,
+        trades: List[Trade],
+        instrument_metrics: Dict[str, InstrumentDetail],
+        historical_30d: Optional[Dict[str, InstrumentHistory]] = None
+    ) -> VolatilityMetrics:
+        """
+        Calculate volatility metrics.
+        
+        volatility_percentile averages, over instruments with history, the
+        percentile of each instrument's volatility among its past 30 days of
+        hourly volatilities (50 without history).
+        """
         # Aggregate volatility across all instruments
         volatilities = [v.volatility for v in instrument_metrics.values() if v.volatility is not None]
         realized_volatility = statistics.mean(volatilities) if volatilities else 0.0
@@ -734,16 +912,24 @@ class AnalyticsEngine:
         
         volatility_by_instrument = {instrument: detail.volatility or 0.0 for instrument, detail in instrument_metrics.items()}
         
+        percentiles = []
+        for instrument, detail in instrument_metrics.items():
+            history = (historical_30d or {}).get(instrument)
+            if history is not None and detail.volatility is not None:
+                percentile = history.volatility_percentile(detail.volatility)
+                if percentile is not None:
+                    percentiles.append(percentile)
+        
         return VolatilityMetrics(
             realized_volatility=realized_volatility,
             rate_velocity=rate_velocity,
             volatility_by_instrument=volatility_by_instrument,
-            volatility_percentile=50.0  # Placeholder, would need historical data
+            volatility_percentile=statistics.mean(percentiles) if percentiles else 50.0
         )
 
-    def _calculate_execution_quality(self, trades: List[Trade], instrument_metrics: Dict[str, InstrumentDetail]) -> ExecutionMetrics:
+    def _calculate_execution_quality(self, window: WindowStats, instrument_metrics: Dict[str, InstrumentDetail]) -> ExecutionMetrics:
         """Calculate execution quality metrics."""
-        if not trades:
+        if not window.trade_count:
             return ExecutionMetrics(
                 avg_slippage=0.0,
                 spread_crossing_rate=0.0,
@@ -752,44 +938,51 @@ class AnalyticsEngine:
                 execution_quality_score=50.0
             )
         
-        slippages = []
-        spread_crossings = 0
-        spreads = []
-        vwap_deviations = []
-        
-        for trade in trades:
-            if not trade.instrument or trade.fixed_rate_leg1 is None:
-                continue
-            
-            instrument = trade.instrument
-            if instrument not in instrument_metrics:
+        # Per-instrument reference levels, indexed by instrument code (NaN = not available)
+        instrument_count = len(window.codebook)
+        mids = np.full(instrument_count, np.nan)
+        spreads_by_code = np.full(instrument_count, np.nan)
+        vwaps = np.full(instrument_count, np.nan)
+        known = np.zeros(instrument_count, dtype=bool)
+        for instrument, detail in instrument_metrics.items():
+            code = window.codebook.lookup(instrument)
+            if code == MISSING_CODE:
                 continue
-            
-            detail = instrument_metrics[instrument]
-            rate = trade.fixed_rate_leg1 * 100  # Convert to %
-            
-            # Slippage vs mid
+            known[code] = True
             if detail.mid is not None:
-                slippage = abs(rate - detail.mid) * 100  # Convert to bps
-                slippages.append(slippage)
-            
-            # Spread crossing (simplified: if trade is far from mid, likely crossed)
-            if detail.bid_ask_spread is not None and detail.mid is not None:
-                spread_half = detail.bid_ask_spread / 2
-                if abs(rate - detail.mid) > spread_half:
-                    spread_crossings += 1
-                spreads.append(detail.bid_ask_spread)
-            
-            # VWAP deviation
+                mids[code] = detail.mid
+            if detail.bid_ask_spread is not None:
+                spreads_by_code[code] = detail.bid_ask_spread
             if detail.vwap is not None:
-                deviation = abs(rate - detail.vwap) * 100  # Convert to bps
-                vwap_deviations.append(deviation)
-        
-        avg_slippage = statistics.mean(slippages) if slippages else 0.0
-        spread_crossing_rate = (spread_crossings / len(trades) * 100) if trades else 0.0
-        effective_spread = statistics.mean(spreads) if spreads else 0.0
-        vwap_deviation = statistics.mean(vwap_deviations) if vwap_deviations else 0.0
-        
+                vwaps[code] = detail.vwap
+        
+        # Trades with a rate on an instrument we have metrics for
+        codes = window.instrument_codes
+        selected = (codes >= 0) & window.has_rate
+        selected[selected] = known[codes[selected]]
+        codes = codes[selected]
+        rates = window.rates[selected] * 100  # Convert to %
+        mid = mids[codes]
+        spread = spreads_by_code[codes]
+        vwap = vwaps[codes]
+        
+        # Slippage vs mid
+        has_mid = ~np.isnan(mid)
+        slippages = np.abs(rates[has_mid] - mid[has_mid]) * 100  # Convert to bps
+        
+        # Spread crossing (simplified: if trade is far from mid, likely crossed)
+        has_spread = has_mid & ~np.isnan(spread)
+        spreads = spread[has_spread]
+        spread_crossings = int(np.count_nonzero(np.abs(rates[has_spread] - mid[has_spread]) > spreads / 2))
+        
+        # VWAP deviation
+        has_vwap = ~np.isnan(vwap)
+        vwap_deviations = np.abs(rates[has_vwap] - vwap[has_vwap]) * 100  # Convert to bps
+        
+        avg_slippage = float(slippages.mean()) if slippages.size else 0.0
+        spread_crossing_rate = spread_crossings / window.trade_count * 100
+        effective_spread = float(spreads.mean()) if spreads.size else 0.0
+        vwap_deviation = float(vwap_deviations.mean()) if vwap_deviations.size else 0.0
         # Execution quality score (0-100, higher is better)
         # Lower slippage and deviation = higher score
         slippage_score = max(0, 100 - avg_slippage * 10)  # Penalize slippage
@@ -804,55 +997,38 @@ class AnalyticsEngine:
             execution_quality_score=execution_quality_score
         )
 
-    def _calculate_price_impact(self, trades: List[Trade], instrument_metrics: Dict[str, InstrumentDetail]) -> PriceImpactMetrics:
+    def _calculate_price_impact(self, window: WindowStats, instrument_metrics: Dict[str, InstrumentDetail]) -> PriceImpactMetrics:
         """Calculate price impact metrics."""
-        # Group trades by size buckets
-        buckets = {
-            "<100M": [],
-            "100-500M": [],
-            ">500M": []
-        }
+        def instrument_impact(instrument: str) -> Optional[float]:
+            detail = instrument_metrics.get(instrument)
+            return detail.price_impact if detail is not None else None
         
+        # Estimate impact (simplified: larger trades have more impact)
         max_impact = 0.0
         max_impact_trade_id = None
         max_impact_size = 0.0
         
-        for trade in trades:
-            if not trade.notional_eur or not trade.instrument:
-                continue
-            
-            size = trade.notional_eur
-            if size < 100_000_000:
-                buckets["<100M"].append(trade)
-            elif size < 500_000_000:
-                buckets["100-500M"].append(trade)
-            else:
-                buckets[">500M"].append(trade)
-            
-            # Estimate impact (simplified: larger trades have more impact)
-            if trade.instrument in instrument_metrics:
-                detail = instrument_metrics[trade.instrument]
-                if detail.price_impact is not None:
-                    impact = detail.price_impact * (size / 100_000_000)  # Scale to trade size
-                    if impact > max_impact:
-                        max_impact = impact
-                        max_impact_trade_id = trade.dissemination_identifier
-                        max_impact_size = size
+        for instrument, (size, trade_id) in window.max_size_by_instrument.items():
+            price_impact = instrument_impact(instrument)
+            if price_impact is not None:
+                impact = price_impact * (size / 100_000_000)  # Scale to trade size
+                if impact > max_impact:
+                    max_impact = impact
+                    max_impact_trade_id = trade_id
+                    max_impact_size = size
         
         # Calculate average impact per bucket
+        # Simplified: use average price impact from instrument metrics
         impact_by_bucket = {}
-        for bucket, bucket_trades in buckets.items():
-            if bucket_trades:
-                # Simplified: use average price impact from instrument metrics
-                impacts = []
-                for trade in bucket_trades:
-                    if trade.instrument in instrument_metrics:
-                        detail = instrument_metrics[trade.instrument]
-                        if detail.price_impact is not None:
-                            impacts.append(detail.price_impact)
-                impact_by_bucket[bucket] = statistics.mean(impacts) if impacts else 0.0
-            else:
-                impact_by_bucket[bucket] = 0.0
+        for bucket in ["<100M", "100-500M", ">500M"]:
+            impact_sum = 0.0
+            impact_count = 0
+            for instrument, count in window.impact_counts.get(bucket, {}).items():
+                price_impact = instrument_impact(instrument)
+                if price_impact is not None:
+                    impact_sum += price_impact * count
+                    impact_count += count
+            impact_by_bucket[bucket] = impact_sum / impact_count if impact_count else 0.0
         
         max_impact_trade = None
         if max_impact_trade_id:
@@ -889,11 +1065,18 @@ class AnalyticsEngine:
     def _calculate_historical_context(
         self,
         instrument_metrics: Dict[str, InstrumentDetail],
-        historical_30d: Optional[List[Trade]],
-        historical_90d: Optional[List[Trade]]
+        historical_30d: Optional[Dict[str, InstrumentHistory]],
+        historical_90d: Optional[Dict[str, InstrumentHistory]]
     ) -> HistoricalContext:
-        """Calculate historical context for comparison."""
-        # Placeholder implementation - would need actual historical data processing
+        """
+        Compare each instrument's current rate with its past rates.
+        
+        The current rate is the window VWAP (mid if there is no volume).
+        Percentiles come from the merged 30/90-day rate sketches; averages
+        and the z-score (90-day history when available) from the daily mean
+        rates. Instruments without history keep neutral values (50th
+        percentile, zero z-score).
+        """
         percentile_30d = {}
         percentile_90d = {}
         z_score = {}
@@ -901,14 +1084,32 @@ class AnalyticsEngine:
         avg_90d = {}
         deviation_from_avg = {}
         
-        # For now, return empty/placeholder values
-        for instrument in instrument_metrics.keys():
+        for instrument, detail in instrument_metrics.items():
+            current = detail.vwap if detail.vwap is not None else detail.mid
+            history_30d = (historical_30d or {}).get(instrument)
+            history_90d = (historical_90d or {}).get(instrument)
+            
             percentile_30d[instrument] = 50.0
             percentile_90d[instrument] = 50.0
             z_score[instrument] = 0.0
             avg_30d[instrument] = 0.0
             avg_90d[instrument] = 0.0
             deviation_from_avg[instrument] = 0.0
+            if current is None:
+                continue
+            
+            # History is in decimal rates, instrument metrics in %
+            rate = current / 100
+            if history_30d is not None:
+                percentile_30d[instrument] = history_30d.percentile_of(rate)
+                avg_30d[instrument] = history_30d.mean * 100
+                deviation_from_avg[instrument] = (rate - history_30d.mean) * 10000  # bps
+            if history_90d is not None:
+                percentile_90d[instrument] = history_90d.percentile_of(rate)
+                avg_90d[instrument] = history_90d.mean * 100
+            reference = history_90d if history_90d is not None else history_30d
+            if reference is not None:
+                z_score[instrument] = reference.z_score(rate)
         
         return HistoricalContext(
             percentile_30d=percentile_30d,
@@ -990,31 +1191,75 @@ class AnalyticsEngine:
 
     def calculate_pro_trader_metrics(
         self,
-        trades: List[Trade],
+        trades: Union[TradeBuffer, List[Trade]],
         time_window_minutes: int,
-        historical_30d: Optional[List[Trade]] = None,
-        historical_90d: Optional[List[Trade]] = None
+        historical_30d: Optional[Dict[str, InstrumentHistory]] = None,
+        historical_90d: Optional[Dict[str, InstrumentHistory]] = None
     ) -> Dict:
-        """Calculate comprehensive pro trader metrics for EUR IRS."""
-        now = datetime.utcnow()
-        cutoff_time = now - timedelta(minutes=time_window_minutes)
-        
-        # Filter trades in time window (prefer EUR but accept all if no EUR available)
-        recent_trades_all = [
-            t for t in trades
-            if t.execution_timestamp.replace(tzinfo=None) >= cutoff_time
-        ]
-        
-        # Try EUR first, fallback to all trades if no EUR
-        recent_trades_eur = [
-            t for t in recent_trades_all
-            if t.notional_currency_leg1 == "EUR"
-        ]
+        """Calculate comprehensive pro trader metrics for EUR IRS over a single window."""
+        return self.calculate_pro_trader_metrics_multi(
+            trades, [time_window_minutes], historical_30d, historical_90d
+        )[time_window_minutes]
+
+    def calculate_pro_trader_metrics_multi(
+        self,
+        trades: Union[TradeBuffer, List[Trade]],
+        time_windows_minutes: List[int],
+        historical_30d: Optional[Dict[str, InstrumentHistory]] = None,
+        historical_90d: Optional[Dict[str, InstrumentHistory]] = None
+    ) -> Dict[int, Dict]:
+        """
+        Calculate pro trader metrics for several nested time windows at once.
+        
+        Every window is a suffix of the time-ordered buffer, located by
+        bisection; the EUR rows of the largest window are found once and
+        narrowed per window. Window aggregates are then vectorized over the
+        buffer columns (see WindowStats). EUR trades are preferred; a window
+        without any EUR trade falls back to all currencies.
+        
+        Args:
+            trades: TradeBuffer, or a list of trades in any order
+            time_windows_minutes: Window lengths in minutes
+            historical_30d: Per-instrument history for 30-day context (see load_historical_summary)
+            historical_90d: Per-instrument history for 90-day context
+            
+        Returns:
+            Dict mapping each window (minutes) to its ProTraderMetrics as a dict
+        """
+        windows = sorted(set(time_windows_minutes))
+        if not windows:
+            return {}
+        
+        buffer = self._as_trade_buffer(trades)
+        now_epoch = to_epoch(datetime.utcnow())
+        
+        # Rows of the largest window, and the EUR rows among them
+        columns = buffer.columns
+        first_row = buffer.index_since(now_epoch - windows[-1] * 60)
+        eur_code = columns.currencies.lookup("EUR")
+        if eur_code == MISSING_CODE:
+            eur_rows = np.empty(0, dtype=np.int64)
+        else:
+            eur_rows = first_row + np.flatnonzero(columns.currency[first_row:] == eur_code)
         
-        recent_trades = recent_trades_eur if recent_trades_eur else recent_trades_all
+        results = {}
+        for window in windows:
+            start = buffer.index_since(now_epoch - window * 60)
+            window_eur_rows = eur_rows[np.searchsorted(eur_rows, start):]
+            
+            # Try EUR first, fallback to all trades if no EUR
+            rows = window_eur_rows if window_eur_rows.size else np.arange(start, len(buffer))
+            self._log_window_selection(window, buffer, len(window_eur_rows), len(rows))
+            
+            results[window] = self._build_pro_trader_metrics(
+                window, WindowStats(buffer, rows), historical_30d, historical_90d
+            )
         
-        # Log for debugging
-        if not recent_trades:
+        return results
+
+    def _log_window_selection(self, time_window_minutes: int, trades: TradeBuffer, eur_count: int, total_count: int):
+        """Log which trades a pro trader window ended up using (for debugging)."""
+        if not total_count:
             logger.warning(f"No trades found in {time_window_minutes}min window (total trades in buffer: {len(trades)})")
             if trades:
                 # Show sample of available trades for debugging
@@ -1026,24 +1271,35 @@ class AnalyticsEngine:
                     if t.instrument:
                         sample_instruments.add(t.instrument)
                 logger.info(f"Sample currencies in buffer: {sample_currencies}, sample instruments: {sample_instruments}")
+        elif eur_count < total_count:
+            logger.info(f"Using {eur_count} EUR trades + {total_count - eur_count} other trades for {time_window_minutes}min window")
         else:
-            eur_count = len(recent_trades_eur)
-            total_count = len(recent_trades)
-            if eur_count < total_count:
-                logger.info(f"Using {eur_count} EUR trades + {total_count - eur_count} other trades for {time_window_minutes}min window")
-            else:
-                logger.debug(f"Using {total_count} EUR trades for {time_window_minutes}min window")
+            logger.debug(f"Using {total_count} EUR trades for {time_window_minutes}min window")
+
+    def _build_pro_trader_metrics(
+        self,
+        time_window_minutes: int,
+        window: WindowStats,
+        historical_30d: Optional[Dict[str, InstrumentHistory]],
+        historical_90d: Optional[Dict[str, InstrumentHistory]]
+    ) -> Dict:
+        """Build ProTraderMetrics for one window from its aggregates."""
+        recent_trades = window.trades
         
         # Calculate all metrics
-        instrument_metrics = self._calculate_instrument_details_eur(recent_trades)
+        instrument_metrics = self._calculate_instrument_details_eur(window)
         spread_metrics = self._calculate_spread_metrics_eur(instrument_metrics)
-        flow_metrics = self._calculate_order_flow_imbalance(recent_trades)
-        volatility_metrics = self._calculate_volatility_metrics(recent_trades, instrument_metrics)
-        execution_metrics = self._calculate_execution_quality(recent_trades, instrument_metrics)
-        price_impact_metrics = self._calculate_price_impact(recent_trades, instrument_metrics)
+        flow_metrics = self._calculate_order_flow_imbalance(window)
+        volatility_metrics = self._calculate_volatility_metrics(recent_trades, instrument_metrics, historical_30d)
+        execution_metrics = self._calculate_execution_quality(window, instrument_metrics)
+        price_impact_metrics = self._calculate_price_impact(window, instrument_metrics)
         forward_curve_metrics = self._calculate_forward_curve(recent_trades)
         historical_context = self._calculate_historical_context(instrument_metrics, historical_30d, historical_90d)
-        alerts = self._detect_pro_alerts(instrument_metrics, spread_metrics, flow_metrics, volatility_metrics, recent_trades)
+        # Only large blocks can raise trade-level alerts
+        alerts = self._detect_pro_alerts(
+            instrument_metrics, spread_metrics, flow_metrics, volatility_metrics,
+            window.large_blocks
+        )
         
         # Build ProTraderMetrics
         pro_metrics = ProTraderMetrics(
@@ -1120,8 +1376,20 @@ class AnalyticsEngine:
         return delta.dict()
 
     def load_historical_trades(self, days: int) -> List[Trade]:
-        """Load historical trades from Excel files."""
-        # Placeholder - would need to implement Excel loading
-        # For now, return empty list
-        return []
+        """
+        Load the trades of the last `days` days (before today) from the daily files.
+        
+        This parses every day file in range. Pro trader metrics only need
+        load_historical_summary(), which is served from the day summary index.
+        """
+        return self.historical_index.load_trades(days)
+
+    def load_historical_summary(self, days: int) -> Dict[str, InstrumentHistory]:
+        """
+        Get per-instrument EUR rate history for the last `days` days (before today).
+        
+        Day files are summarized once and cached (see HistoricalIndex), so
+        this only costs a directory listing unless a new day file appeared.
+        """
+        return self.historical_index.instrument_history(days)
 
@@ -0,0 +1,190 @@
+"""
+Versioned analytics stream (snapshot + patches).
+
+The analytics tree (Analytics plus pro trader metrics) is tens of KB and
+mostly unchanged from one update to the next, so instead of broadcasting it
+whole on every update:
+- Each update is compared with the previous tree and only the differences
+  are sent, as an "analytics_patch" message of JSON-patch-style operations
+  (RFC 6902 "add", "remove" and "replace") with the version they apply to
+- Clients get an "analytics_snapshot" (the full tree and its version) when
+  they connect, when they ask for one (e.g. after a version gap) and
+  periodically (see WS_ANALYTICS_RESYNC_INTERVAL)
+
+Trees are compared in their JSON form (as the clients see them), so values
+that encode identically never produce an operation.
+"""
+
+import json
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.broadcast import encode_json, encode_message
+from app.config import WS_ANALYTICS_RESYNC_INTERVAL
+
+
+def _escape_pointer_token(key: Any) -> str:
+    """Escape a key as a JSON pointer token (RFC 6901)."""
+    return str(key).replace("~", "~0").replace("/", "~1")
+
+
+def _coarsen(ops: List[Dict[str, Any]], new: Any, path: str) -> List[Dict[str, Any]]:
+    """Replace a container as a whole when that is shorter than the operations on its children (never the root)."""
+    if path and len(ops) > 1:
+        replace = [{"op": "replace", "path": path, "value": new}]
+        if len(encode_json(replace)) <= len(encode_json(ops)):
+            return replace
+    return ops
+
+
+def diff_json(old: Any, new: Any, path: str = "") -> List[Dict[str, Any]]:
+    """
+    Compute the patch operations turning one JSON tree into another.
+
+    Objects are compared key by key and lists index by index (items appended
+    at the end are added with the "-" index, trailing items are removed from
+    the last one), so a metric that changed produces a single "replace". An
+    object or list is replaced as a whole when that is shorter than one
+    operation per changed child.
+
+    Args:
+        old: Previous tree (JSON types only)
+        new: New tree (JSON types only)
+        path: JSON pointer of the compared values ("" for the root)
+
+    Returns:
+        List of {"op", "path"[, "value"]} operations, in the order they must be applied
+    """
+    if isinstance(old, dict) and isinstance(new, dict):
+        ops = []
+        for key, value in new.items():
+            child_path = f"{path}/{_escape_pointer_token(key)}"
+            if key not in old:
+                ops.append({"op": "add", "path": child_path, "value": value})
+            else:
+                ops.extend(diff_json(old[key], value, child_path))
+        for key in old:
+            if key not in new:
+                ops.append({"op": "remove", "path": f"{path}/{_escape_pointer_token(key)}"})
+        return _coarsen(ops, new, path)
+
+    if isinstance(old, list) and isinstance(new, list):
+        ops = []
+        common = min(len(old), len(new))
+        for index in range(common):
+            ops.extend(diff_json(old[index], new[index], f"{path}/{index}"))
+        for value in new[common:]:
+            ops.append({"op": "add", "path": f"{path}/-", "value": value})
+        for index in range(len(old) - 1, common - 1, -1):
+            ops.append({"op": "remove", "path": f"{path}/{index}"})
+        return _coarsen(ops, new, path)
+
+    # bool is an int subclass: True == 1 must still be replaced
+    if old == new and type(old) is type(new):
+        return []
+    return [{"op": "replace", "path": path, "value": new}]
+
+
+class AnalyticsStream:
+    """
+    Current analytics tree, its version and the messages that publish it.
+
+    Attributes:
+        tree: Latest analytics tree in JSON form (None until the first update)
+        version: Incremented whenever the tree changes (0: no analytics yet)
+        resync_interval: Seconds between periodic snapshots (0: never)
+        last_snapshot_at: Monotonic time of the last broadcast snapshot
+        snapshots: Snapshots broadcast
+        patches: Patches broadcast
+        unchanged: Updates that changed nothing (nothing broadcast)
+        last_patch_ops: Number of operations of the last patch
+        last_patch_bytes: Size of the last patch message
+        last_snapshot_bytes: Size of the last snapshot message
+    """
+
+    SNAPSHOT_TYPE = "analytics_snapshot"
+    PATCH_TYPE = "analytics_patch"
+
+    def __init__(self, resync_interval: float = WS_ANALYTICS_RESYNC_INTERVAL):
+        self.tree: Optional[Dict[str, Any]] = None
+        self.version = 0
+        self.resync_interval = resync_interval
+        self.last_snapshot_at = time.monotonic()
+        self.snapshots = 0
+        self.patches = 0
+        self.unchanged = 0
+        self.last_patch_ops = 0
+        self.last_patch_bytes = 0
+        self.last_snapshot_bytes = 0
+        self._snapshot_text: Optional[str] = None
+
+    def update(self, analytics: Dict[str, Any]) -> Optional[Tuple[str, str]]:
+        """
+        Record a new analytics tree and build the message publishing it.
+
+        Args:
+            analytics: Analytics dict (may contain datetimes, NaN, ...)
+
+        Returns:
+            (message type, encoded message) to broadcast: a snapshot on the
+            first update, when a periodic resync is due and when the patch
+            would not be smaller, a patch otherwise; None if nothing changed
+        """
+        tree = json.loads(encode_json(analytics))
+        ops = diff_json(self.tree, tree) if self.tree is not None else None
+        if ops == []:
+            self.unchanged += 1
+            return None
+
+        base_version = self.version
+        self.tree = tree
+        self.version += 1
+        self._snapshot_text = None
+
+        resync_due = (
+            self.resync_interval > 0
+            and time.monotonic() - self.last_snapshot_at >= self.resync_interval
+        )
+        if ops is None or resync_due:
+            self.last_snapshot_at = time.monotonic()
+            self.snapshots += 1
+            return self.SNAPSHOT_TYPE, self.snapshot_message()
+
+        text = encode_message(self.PATCH_TYPE, {
+            "base_version": base_version,
+            "version": self.version,
+            "ops": ops
+        })
+        if len(text) >= len(self.snapshot_message()):
+            # Most of the tree changed: the snapshot is not larger
+            self.snapshots += 1
+            return self.SNAPSHOT_TYPE, self.snapshot_message()
+        self.patches += 1
+        self.last_patch_ops = len(ops)
+        self.last_patch_bytes = len(text)
+        return self.PATCH_TYPE, text
+
+    def snapshot_message(self) -> Optional[str]:
+        """Encoded analytics_snapshot of the current version (encoded once per version; None before the first update)."""
+        if self.tree is None:
+            return None
+        if self._snapshot_text is None:
+            self._snapshot_text = encode_message(self.SNAPSHOT_TYPE, {
+                "version": self.version,
+                "analytics": self.tree
+            })
+            self.last_snapshot_bytes = len(self._snapshot_text)
+        return self._snapshot_text
+
+    def metrics(self) -> Dict[str, Any]:
+        """Version, message counts and sizes, for the /metrics endpoint."""
+        return {
+            "version": self.version,
+            "snapshots": self.snapshots,
+            "patches": self.patches,
+            "unchanged": self.unchanged,
+            "last_patch_ops": self.last_patch_ops,
+            "last_patch_bytes": self.last_patch_bytes,
+            "last_snapshot_bytes": self.last_snapshot_bytes,
+            "resync_interval_seconds": self.resync_interval
+        }
@@ -0,0 +1,402 @@
+"""
+WebSocket broadcast fan-out.
+
+This module encodes each outgoing WebSocket message once and sends the
+same text to every connected client concurrently:
+- encode_message builds the {"type", "data", "timestamp"} envelope and
+  serializes it with orjson when installed (NaN/Infinity become null natively),
+  or with sanitize_for_json + json.dumps otherwise
+- Each client (ClientConnection) has a bounded outbound queue drained by its
+  own writer task; broadcast_text queues an encoded message for all of them
+  without waiting, so a slow client never delays the others or the caller,
+  and an overflow policy decides what happens when a client falls behind
+- MessageBatcher collects the items of list messages (e.g. "new_trades") and
+  sends them as one message, optionally merging those added within a short delay
+
+Both encoders write datetimes as ISO 8601 strings.
+"""
+
+import asyncio
+import json
+import logging
+import math
+import time
+from collections import deque
+from datetime import date, datetime
+from typing import Any, Callable, Deque, Dict, List, Optional, Set, Tuple
+
+from fastapi import WebSocket
+
+from app.config import WS_CLIENT_QUEUE_SIZE, WS_OVERFLOW_POLICY, WS_TRADE_BATCH_DELAY
+
+try:
+    import orjson
+except ImportError:  # Optional: falls back to the json module
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+ORJSON_AVAILABLE = orjson is not None
+
+
+def sanitize_for_json(obj):
+    """
+    Sanitize an object for JSON serialization by converting NaN and Inf to None.
+
+    Args:
+        obj: Object to sanitize (dict, list, or primitive)
+
+    Returns:
+        Sanitized object safe for JSON serialization
+    """
+    if isinstance(obj, dict):
+        return {k: sanitize_for_json(v) for k, v in obj.items()}
+    elif isinstance(obj, list):
+        return [sanitize_for_json(item) for item in obj]
+    elif isinstance(obj, float):
+        if math.isnan(obj) or math.isinf(obj):
+            return None
+        return obj
+    else:
+        return obj
+
+
+def _json_default(value: Any) -> Any:
+    """Serialize values the encoders do not handle natively."""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if hasattr(value, "item"):
+        # NumPy scalar (np.float64, np.int64, ...)
+        item = value.item()
+        if isinstance(item, float) and not math.isfinite(item):
+            return None
+        return item
+    return str(value)
+
+
+def encode_json(payload: Any) -> str:
+    """
+    Serialize a payload to JSON text (orjson when available).
+
+    NaN and infinite floats are written as null.
+
+    Args:
+        payload: JSON-compatible data (dicts, lists, primitives, datetimes)
+
+    Returns:
+        JSON text
+    """
+    if orjson is not None:
+        return orjson.dumps(
+            payload,
+            default=_json_default,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        ).decode("utf-8")
+    return json.dumps(sanitize_for_json(payload), default=_json_default)
+
+
+def encode_message(message_type: str, data: Any) -> str:
+    """
+    Encode a WebSocket message envelope once, for every recipient.
+
+    Args:
+        message_type: Type of message (e.g., "new_trade", "alert", "analytics_update")
+        data: Message payload
+
+    Returns:
+        JSON text of {"type", "data", "timestamp"}
+    """
+    return encode_json({
+        "type": message_type,
+        "data": data,
+        "timestamp": datetime.utcnow().isoformat()
+    })
+
+
+class ClientConnection:
+    """
+    A connected WebSocket client with its own bounded outbound queue.
+
+    Messages are queued without waiting (enqueue) and sent by a writer task
+    per client, so a slow or stalled client only delays itself. When its
+    queue is full, the overflow policy decides what gives (see
+    WS_OVERFLOW_POLICY).
+
+    Analytics patches only apply on top of the previous version, so once one
+    of them is dropped, the client gets the current snapshot (from resync)
+    instead of the next patch.
+
+    Attributes:
+        websocket: The client's WebSocket
+        max_queue: Queue capacity in messages
+        overflow_policy: "coalesce", "drop_oldest" or "disconnect"
+        resync: Returns the encoded current analytics snapshot (None: patches
+                are never replaced; the client detects the version gap)
+        needs_resync: A patch was dropped: the next one is replaced by a snapshot
+        queue: Pending (message type, text, enqueue time) entries
+        closed: Whether the client is gone (send failure or disconnected as a laggard)
+        sent: Messages sent
+        dropped: Messages dropped on overflow
+        coalesced: Snapshots (and patches) replaced by a newer snapshot before being sent
+        last_lag: Queue time of the last sent message (seconds)
+        max_lag: Longest queue time of a sent message (seconds)
+        connected_at: Connection time
+    """
+
+    POLICIES = ("coalesce", "drop_oldest", "disconnect")
+
+    # Full snapshots: a newer one makes a queued one obsolete
+    SNAPSHOT_TYPES = {"analytics_update", "analytics_snapshot"}
+
+    # Patches on top of the previous version, replaced by RESYNC_TYPE once one is lost
+    PATCH_TYPES = {"analytics_patch"}
+    RESYNC_TYPE = "analytics_snapshot"
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        max_queue: int = WS_CLIENT_QUEUE_SIZE,
+        overflow_policy: str = WS_OVERFLOW_POLICY,
+        resync: Optional[Callable[[], Optional[str]]] = None
+    ):
+        if overflow_policy not in self.POLICIES:
+            raise ValueError(f"Unknown overflow policy '{overflow_policy}' (expected one of {', '.join(self.POLICIES)})")
+        self.websocket = websocket
+        self.max_queue = max_queue
+        self.overflow_policy = overflow_policy
+        self.resync = resync
+        self.needs_resync = False
+        self.queue: Deque[Tuple[str, str, float]] = deque()
+        self.closed = False
+        self.sent = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.last_lag: Optional[float] = None
+        self.max_lag = 0.0
+        self.connected_at = datetime.utcnow()
+        self._ready = asyncio.Event()
+        self._writer: Optional[asyncio.Task] = None
+
+    def start(self):
+        """Start the writer task."""
+        self._writer = asyncio.create_task(self._write_loop())
+
+    def enqueue(self, message_type: str, text: str) -> bool:
+        """
+        Queue an encoded message without waiting.
+
+        Args:
+            message_type: Message type (snapshot types may be coalesced, patch types
+                          replaced by a snapshot)
+            text: Message encoded by encode_message
+
+        Returns:
+            False if the client is closed or was disconnected by the overflow policy
+        """
+        if self.closed:
+            return False
+        if self._must_resync(message_type):
+            message_type, text = self._resync_message()
+        elif message_type == self.RESYNC_TYPE:
+            self._drop_queued_patches()
+        if self.overflow_policy == "coalesce" and message_type in self.SNAPSHOT_TYPES:
+            if self._remove_first(lambda entry: entry[0] == message_type) is not None:
+                self.coalesced += 1
+        if len(self.queue) >= self.max_queue and not self._make_room():
+            logger.warning(f"WebSocket client too slow ({len(self.queue)} messages queued), disconnecting it")
+            self._disconnect()
+            return False
+        if self._must_resync(message_type):
+            # Making room dropped a patch this one builds on
+            message_type, text = self._resync_message()
+        self.queue.append((message_type, text, time.monotonic()))
+        self._ready.set()
+        return True
+
+    def _must_resync(self, message_type: str) -> bool:
+        """Whether a patch must be replaced by a snapshot (an earlier patch was dropped)."""
+        return message_type in self.PATCH_TYPES and self.needs_resync and self.resync is not None
+
+    def _resync_message(self) -> Tuple[str, str]:
+        """The current snapshot, replacing the queued patches it includes."""
+        self._drop_queued_patches()
+        return self.RESYNC_TYPE, self.resync()
+
+    def _drop_queued_patches(self):
+        """Drop the queued patches (a snapshot being queued includes them)."""
+        while self._remove_first(lambda entry: entry[0] in self.PATCH_TYPES) is not None:
+            self.coalesced += 1
+        self.needs_resync = False
+
+    def _remove_first(self, predicate) -> Optional[Tuple[str, str, float]]:
+        """Remove the oldest queued entry matching predicate; return it (None if there is none)."""
+        for index, entry in enumerate(self.queue):
+            if predicate(entry):
+                del self.queue[index]
+                return entry
+        return None
+
+    def _is_droppable(self, entry: Tuple[str, str, float]) -> bool:
+        """Whether an entry can be dropped by the coalesce policy (snapshots, and patches if they can be resynced)."""
+        return entry[0] in self.SNAPSHOT_TYPES or (entry[0] in self.PATCH_TYPES and self.resync is not None)
+
+    def _make_room(self) -> bool:
+        """Apply the overflow policy to a full queue; return False if the client must be disconnected."""
+        if self.overflow_policy == "drop_oldest":
+            entry = self.queue.popleft()
+        elif self.overflow_policy == "coalesce":
+            entry = self._remove_first(self._is_droppable)
+            if entry is None:
+                return False
+        else:
+            return False
+        if entry[0] in self.PATCH_TYPES:
+            self.needs_resync = True
+        self.dropped += 1
+        return True
+
+    def _disconnect(self):
+        """Drop the queue and close the connection (1013: try again later)."""
+        self.closed = True
+        self.queue.clear()
+        if self._writer is not None:
+            self._writer.cancel()
+        asyncio.create_task(self._close_websocket(1013))
+
+    async def _close_websocket(self, code: int):
+        """Close the WebSocket, ignoring errors (it may already be closed)."""
+        try:
+            await self.websocket.close(code=code)
+        except Exception:
+            pass  # Already closed
+
+    async def _write_loop(self):
+        """Send queued messages in order until the client is closed."""
+        try:
+            while not self.closed:
+                if not self.queue:
+                    self._ready.clear()
+                    await self._ready.wait()
+                    continue
+                _, text, enqueued_at = self.queue.popleft()
+                await self.websocket.send_text(text)
+                lag = time.monotonic() - enqueued_at
+                self.last_lag = lag
+                self.max_lag = max(self.max_lag, lag)
+                self.sent += 1
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            logger.error(f"Error sending WebSocket message: {e}")
+            self.closed = True
+            self.queue.clear()
+
+    async def close(self):
+        """Stop the writer task (the WebSocket itself is closed by its endpoint)."""
+        self.closed = True
+        self.queue.clear()
+        if self._writer is not None:
+            self._writer.cancel()
+            try:
+                await self._writer
+            except asyncio.CancelledError:
+                pass
+
+    def metrics(self) -> Dict[str, Any]:
+        """Queue depth and lag of this client, for the /metrics endpoint."""
+        client = self.websocket.client
+        return {
+            "client": f"{client.host}:{client.port}" if client else None,
+            "connected_at": self.connected_at.isoformat(),
+            "queued": len(self.queue),
+            "oldest_queued_seconds": time.monotonic() - self.queue[0][2] if self.queue else 0.0,
+            "sent": self.sent,
+            "dropped": self.dropped,
+            "coalesced": self.coalesced,
+            "last_lag_seconds": self.last_lag,
+            "max_lag_seconds": self.max_lag,
+            "overflow_policy": self.overflow_policy
+        }
+
+
+def broadcast_text(clients: Set[ClientConnection], message_type: str, text: str):
+    """
+    Queue an encoded message for all clients.
+
+    This never waits for a client: each one's writer task sends it. Clients
+    that are closed (or get disconnected by their overflow policy) are
+    removed from clients.
+
+    Args:
+        clients: Connected clients (updated in place)
+        message_type: Message type
+        text: Message encoded by encode_message
+    """
+    gone = [client for client in clients if not client.enqueue(message_type, text)]
+    clients.difference_update(gone)
+
+
+class MessageBatcher:
+    """
+    Sends the items of a list message in as few messages as possible.
+
+    Items added with add() are sent as one message whose data is the list of
+    items. Without a delay they are sent right away (one message per add());
+    with a delay, the first add() schedules the send and the items added until
+    then go in the same message.
+
+    Attributes:
+        clients: Connected clients (updated in place by broadcast_text)
+        message_type: Type of the message sent (e.g., "new_trades")
+        delay: Micro-batching window in seconds (0: no window)
+        pending: Items not sent yet
+        messages: Messages sent
+        items: Items sent
+    """
+
+    def __init__(self, clients: Set[ClientConnection], message_type: str, delay: float = WS_TRADE_BATCH_DELAY):
+        self.clients = clients
+        self.message_type = message_type
+        self.delay = delay
+        self.pending: List[Any] = []
+        self.messages = 0
+        self.items = 0
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+
+    def add(self, items: List[Any]):
+        """
+        Queue items for the next message.
+
+        Args:
+            items: JSON-compatible items (e.g., trade dicts)
+        """
+        if not items:
+            return
+        self.pending.extend(items)
+        if self.delay <= 0:
+            self.flush()
+        elif self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_later(self.delay, self.flush)
+
+    def flush(self):
+        """Send the pending items as one message (dropped if no client is connected)."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if not self.pending:
+            return
+        items, self.pending = self.pending, []
+        if not self.clients:
+            return
+        broadcast_text(self.clients, self.message_type, encode_message(self.message_type, items))
+        self.messages += 1
+        self.items += len(items)
+
+    def metrics(self) -> Dict[str, Any]:
+        """Messages sent and average items per message, for the /metrics endpoint."""
+        return {
+            "delay_seconds": self.delay,
+            "messages": self.messages,
+            "items": self.items,
+            "avg_items_per_message": self.items / self.messages if self.messages else 0.0
+        }
@@ -0,0 +1,215 @@
+"""
+Columnar (NumPy-backed) trade store.
+
+This module provides TradeColumns, a set of parallel NumPy arrays holding the
+fields the analytics engine aggregates over:
+- Execution timestamp (UTC epoch), EUR notional and fixed rate as float64
+- Instrument, platform, currency, underlying and action type as int32 codes
+
+String fields are dictionary-encoded through a Codebook per field, so
+grouping by instrument or underlying is a bincount/reduceat over integers.
+Missing values are NaN for floats and MISSING_CODE for codes.
+
+The columns are kept row-aligned with TradeBuffer, which owns the Trade
+objects and keeps them sorted by execution time.
+"""
+
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from app.models import Trade
+
+# Code used for missing (None or empty) string values
+MISSING_CODE = -1
+
+
+class Codebook:
+    """
+    Two-way mapping between string values and small integer codes.
+
+    Codes are assigned in order of first appearance and never reused, so a
+    code stays valid for the lifetime of the store.
+
+    Attributes:
+        codes: {value: code}
+        values: Values indexed by code
+    """
+
+    def __init__(self):
+        self.codes: Dict[str, int] = {}
+        self.values: List[str] = []
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def encode(self, value: Optional[str]) -> int:
+        """Return the code for a value, assigning one if it is new."""
+        if not value:
+            return MISSING_CODE
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def lookup(self, value: Optional[str]) -> int:
+        """Return the code for a value, or MISSING_CODE if it was never seen."""
+        if not value:
+            return MISSING_CODE
+        return self.codes.get(value, MISSING_CODE)
+
+    def decode(self, code: int) -> str:
+        """Return the value for a (non-missing) code."""
+        return self.values[code]
+
+
+class TradeColumns:
+    """
+    Growable parallel NumPy columns over a sequence of trades.
+
+    Arrays are over-allocated and grown geometrically, so appending a poll's
+    trades is amortized O(batch). The public column attributes are views of
+    the filled part of each array.
+
+    Attributes:
+        timestamp: Execution time (UTC epoch seconds)
+        notional: notional_eur (NaN when missing)
+        rate: fixed_rate_leg1 (NaN when missing)
+        has_rate: Whether fixed_rate_leg1 was set
+        instrument: Instrument code
+        platform: Platform code
+        currency: Leg 1 notional currency code
+        underlying: Underlier name code
+        action: Action type code
+        instruments, platforms, currencies, underlyings, actions: Codebooks
+    """
+
+    INITIAL_CAPACITY = 1024
+
+    _DTYPES = {
+        "timestamp": np.float64,
+        "notional": np.float64,
+        "rate": np.float64,
+        "has_rate": np.bool_,
+        "instrument": np.int32,
+        "platform": np.int32,
+        "currency": np.int32,
+        "underlying": np.int32,
+        "action": np.int32,
+    }
+
+    def __init__(self):
+        self.instruments = Codebook()
+        self.platforms = Codebook()
+        self.currencies = Codebook()
+        self.underlyings = Codebook()
+        self.actions = Codebook()
+        self._size = 0
+        self._arrays = {
+            name: np.empty(self.INITIAL_CAPACITY, dtype=dtype)
+            for name, dtype in self._DTYPES.items()
+        }
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def timestamp(self) -> np.ndarray:
+        return self._arrays["timestamp"][:self._size]
+
+    @property
+    def notional(self) -> np.ndarray:
+        return self._arrays["notional"][:self._size]
+
+    @property
+    def rate(self) -> np.ndarray:
+        return self._arrays["rate"][:self._size]
+
+    @property
+    def has_rate(self) -> np.ndarray:
+        return self._arrays["has_rate"][:self._size]
+
+    @property
+    def instrument(self) -> np.ndarray:
+        return self._arrays["instrument"][:self._size]
+
+    @property
+    def platform(self) -> np.ndarray:
+        return self._arrays["platform"][:self._size]
+
+    @property
+    def currency(self) -> np.ndarray:
+        return self._arrays["currency"][:self._size]
+
+    @property
+    def underlying(self) -> np.ndarray:
+        return self._arrays["underlying"][:self._size]
+
+    @property
+    def action(self) -> np.ndarray:
+        return self._arrays["action"][:self._size]
+
+    def _row(self, timestamp: float, trade: Trade) -> tuple:
+        """Encode one trade as a tuple of column values (in _DTYPES order)."""
+        notional = trade.notional_eur
+        rate = trade.fixed_rate_leg1
+        return (
+            timestamp,
+            notional if notional is not None else np.nan,
+            rate if rate is not None else np.nan,
+            rate is not None,
+            self.instruments.encode(trade.instrument),
+            self.platforms.encode(trade.platform_identifier),
+            self.currencies.encode(trade.notional_currency_leg1),
+            self.underlyings.encode(trade.unique_product_identifier_underlier_name),
+            self.actions.encode(trade.action_type),
+        )
+
+    def _reserve(self, size: int):
+        """Grow the arrays so that they can hold at least size rows."""
+        capacity = len(self._arrays["timestamp"])
+        if size <= capacity:
+            return
+        while capacity < size:
+            capacity *= 2
+        for name, array in self._arrays.items():
+            grown = np.empty(capacity, dtype=array.dtype)
+            grown[:self._size] = array[:self._size]
+            self._arrays[name] = grown
+
+    def extend(self, rows: Iterable[Tuple[float, Trade]]):
+        """Append (epoch timestamp, trade) pairs at the end of the columns."""
+        encoded = [self._row(timestamp, trade) for timestamp, trade in rows]
+        if not encoded:
+            return
+        start = self._size
+        end = start + len(encoded)
+        self._reserve(end)
+        for name, values in zip(self._DTYPES, zip(*encoded)):
+            self._arrays[name][start:end] = values
+        self._size = end
+
+    def insert(self, index: int, timestamp: float, trade: Trade):
+        """Insert one trade at the given row, shifting later rows up."""
+        self._reserve(self._size + 1)
+        for name, value in zip(self._DTYPES, self._row(timestamp, trade)):
+            array = self._arrays[name]
+            array[index + 1:self._size + 1] = array[index:self._size]
+            array[index] = value
+        self._size += 1
+
+    def drop_front(self, count: int):
+        """Remove the first count rows."""
+        count = min(count, self._size)
+        if count <= 0:
+            return
+        remaining = self._size - count
+        for array in self._arrays.values():
+            array[:remaining] = array[count:self._size]
+        self._size = remaining
+
+    def reset(self, rows: Iterable[Tuple[float, Trade]]):
+        """Replace the contents with the given (epoch timestamp, trade) pairs."""
+        self._size = 0
+        self.extend(rows)
@@ -14,9 +14,26 @@ from pathlib import Path
 # Polling Configuration
 # ============================================================================
 
+# Poll the internal API sources (disable when all trades are pushed, see
+# PUSH_INGEST_ENABLED)
+POLL_ENABLED = os.getenv("POLL_ENABLED", "true").lower() == "true"
+
 # Interval between internal API polls (in seconds)
 # Lower values provide more real-time data but increase API load
-POLL_INTERVAL = 5  # seconds
+# This is the starting interval: the poller then adapts it to market activity
+POLL_INTERVAL = float(os.getenv("POLL_INTERVAL", "5"))  # seconds
+
+# Adaptive polling bounds (in seconds): the interval shrinks toward the floor
+# while polls bring new trades and grows toward the ceiling while idle
+POLL_INTERVAL_MIN = float(os.getenv("POLL_INTERVAL_MIN", "1"))
+POLL_INTERVAL_MAX = float(os.getenv("POLL_INTERVAL_MAX", "30"))
+
+# Interval multipliers after an active (new trades) / idle poll
+POLL_SPEEDUP_FACTOR = float(os.getenv("POLL_SPEEDUP_FACTOR", "0.5"))
+POLL_SLOWDOWN_FACTOR = float(os.getenv("POLL_SLOWDOWN_FACTOR", "1.5"))
+
+# Random jitter applied to each sleep (fraction of the interval, e.g. 0.1 = ±10%)
+POLL_JITTER = float(os.getenv("POLL_JITTER", "0.1"))
 
 # ============================================================================
 # Internal API Configuration
@@ -35,6 +52,107 @@ INTERNAL_API_HEADERS = {
 # API authentication token (if required)
 INTERNAL_API_TOKEN = os.getenv("INTERNAL_API_TOKEN", "")
 
+# Incremental polling: after the first poll, the poller asks only for data
+# reported since the latest trade it has seen (legs' eventTime, else their
+# execution time), passed as this query parameter
+# (ISO 8601 UTC). Leave empty to always fetch the full day. Conditional
+# headers (If-None-Match / If-Modified-Since) are sent whenever the server
+# provided an ETag / Last-Modified, and a 304 response means nothing new.
+INTERNAL_API_SINCE_PARAM = os.getenv("INTERNAL_API_SINCE_PARAM", "since")
+
+# The high-water mark is moved back by this margin (in seconds) so trades
+# sharing the latest timestamp are not missed; duplicates are dropped anyway
+INTERNAL_API_SINCE_OVERLAP = float(os.getenv("INTERNAL_API_SINCE_OVERLAP", "5"))
+
+# Interval (in seconds) between full fetches, which pick up late or corrected
+# trades that an incremental query would not return
+INTERNAL_API_FULL_RESYNC_INTERVAL = float(os.getenv("INTERNAL_API_FULL_RESYNC_INTERVAL", "300"))
+
+# The server is taken to ignore the `since` parameter (and polls become full
+# fetches) after this many incremental polls in a row where most returned
+# trades are older than requested; it is probed again after a resync interval
+INTERNAL_API_SINCE_IGNORED_POLLS = int(os.getenv("INTERNAL_API_SINCE_IGNORED_POLLS", "3"))
+
+# Sources polled concurrently, as a JSON list of objects, e.g.
+# [{"name": "EUR", "url": "https://.../eur/trades", "token": "...", "interval": 2},
+#  {"name": "USD", "url": "https://.../usd/trades", "format": "strategy_api"}]
+# Only "url" is required. Optional keys: "name", "token", "headers" (extra
+# HTTP headers), "interval"/"interval_min"/"interval_max" (default:
+# POLL_INTERVAL/POLL_INTERVAL_MIN/POLL_INTERVAL_MAX), "timeout" (default:
+# HTTP_TIMEOUT) and "format" (response format name; default: detected per
+# item). Each source has its own schedule, incremental cursor and error
+# backoff, so a slow or failing source does not delay the others. Empty: a
+# single source built from INTERNAL_API_URL and INTERNAL_API_TOKEN.
+INTERNAL_API_SOURCES = os.getenv("INTERNAL_API_SOURCES", "")
+
+# Poll responses are parsed as a stream; every this many response items
+# (strategies), the converted trades are handed to processing as one batch
+INTERNAL_API_BATCH_SIZE = int(os.getenv("INTERNAL_API_BATCH_SIZE", "200"))
+
+# New-format items are normalized by a fast path that maps the raw JSON straight
+# to trades without running the pydantic validators (items it cannot handle
+# fall back to validation). Set to true to validate every item (debugging).
+INGEST_STRICT_VALIDATION = os.getenv("INGEST_STRICT_VALIDATION", "false").lower() == "true"
+
+# Size of the LRU caches of the poller's date and notional parsers (per parser).
+# Effective dates and notional strings repeat heavily within a day (spot dates,
+# standard sizes like "500M"); hit rates are reported by GET /metrics.
+PARSE_CACHE_SIZE = int(os.getenv("PARSE_CACHE_SIZE", "4096"))
+
+# Where poll responses are decoded and converted to trades, so that large
+# responses do not block the event loop serving the WebSockets:
+# "thread" (worker threads), "process" (worker processes: parsing runs in
+# parallel with the application, but response formats registered after the
+# pool started are not seen by the workers) or "inline" (in the event loop).
+# With "process", the parser LRU caches live in the worker processes: their
+# hits are not counted in the application, so GET /metrics parser_caches
+# shows zero hits (the caches still work in each worker)
+INGEST_EXECUTOR = os.getenv("INGEST_EXECUTOR", "thread").lower()
+INGEST_WORKERS = int(os.getenv("INGEST_WORKERS", "2"))
+
+# The response body is handed to the workers in chunks of this many bytes
+INGEST_CHUNK_SIZE = int(os.getenv("INGEST_CHUNK_SIZE", "65536"))
+
+# ============================================================================
+# HTTP Client Configuration
+# ============================================================================
+
+# The poller and the exchange rate cache each keep one long-lived HTTP client,
+# so connections are reused (keep-alive) instead of being opened per request.
+HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "10"))  # seconds
+
+# Connection pool limits per client
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "10"))
+HTTP_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", "5"))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30"))  # seconds
+
+# Negotiate HTTP/2 when the server supports it (needs the h2 package,
+# installed with httpx[http2]; falls back to HTTP/1.1 otherwise)
+HTTP2_ENABLED = os.getenv("HTTP2_ENABLED", "true").lower() == "true"
+
+# ============================================================================
+# Push Ingestion Configuration
+# ============================================================================
+
+# Accept trades pushed by the upstream system (POST /ingest, WebSocket
+# /ingest/ws), in the same format as the internal API responses, alongside
+# or instead of polling
+PUSH_INGEST_ENABLED = os.getenv("PUSH_INGEST_ENABLED", "false").lower() == "true"
+
+# Bearer token required from pushing clients. Required: push ingestion stays
+# disabled (with an error at startup) when it is empty
+PUSH_INGEST_TOKEN = os.getenv("PUSH_INGEST_TOKEN", "")
+
+# Maximum number of pushed items waiting to be processed. When full, POST
+# /ingest answers 429 (Retry-After) and the WebSocket stops reading. A POST
+# with more items than this is rejected with 413 (it could never fit).
+PUSH_QUEUE_SIZE = int(os.getenv("PUSH_QUEUE_SIZE", "10000"))
+
+# Pushed items are processed in batches of up to PUSH_BATCH_SIZE items; a
+# batch waits at most PUSH_BATCH_DELAY seconds for more items to arrive
+PUSH_BATCH_SIZE = int(os.getenv("PUSH_BATCH_SIZE", "200"))
+PUSH_BATCH_DELAY = float(os.getenv("PUSH_BATCH_DELAY", "0.05"))
+
 # ============================================================================
 # Alert Configuration
 # ============================================================================
@@ -66,6 +184,41 @@ STRATEGY_TIME_WINDOW = 20  # seconds
 EXCEL_OUTPUT_DIR = Path(os.getenv("EXCEL_OUTPUT_DIR", "./excel_output"))
 EXCEL_OUTPUT_DIR.mkdir(exist_ok=True)  # Create directory if it doesn't exist
 
+# Saving an .xlsx rewrites the whole workbook, so writes are applied in memory
+# and the file is saved at most once per interval (in seconds) or once this
+# many items (trades, strategies, analytics updates) have been applied.
+# Pending writes are always flushed on day rollover and on shutdown.
+EXCEL_SAVE_INTERVAL = float(os.getenv("EXCEL_SAVE_INTERVAL", "5"))  # seconds
+EXCEL_SAVE_BATCH_SIZE = int(os.getenv("EXCEL_SAVE_BATCH_SIZE", "500"))
+
+# ============================================================================
+# Storage Configuration
+# ============================================================================
+
+# System of record for trades:
+# - "journal": append-only JSON-lines journal per day (trades_YYYYMMDD.jsonl),
+#   with the Excel workbook produced as a derived export
+# - "excel": the daily Excel workbook is the store (legacy behaviour)
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "journal")
+
+# Directory where daily journal files are stored
+JOURNAL_DIR = Path(os.getenv("JOURNAL_DIR", "./journal"))
+JOURNAL_DIR.mkdir(exist_ok=True)  # Create directory if it doesn't exist
+
+# Interval (in seconds) between saves of the Excel export when the journal is
+# the system of record (an export can also be requested via POST /export/excel)
+EXCEL_EXPORT_INTERVAL = float(os.getenv("EXCEL_EXPORT_INTERVAL", "300"))  # 5 minutes
+
+# ============================================================================
+# Historical Context Configuration
+# ============================================================================
+
+# Directory where per-day summaries of past trade files are cached
+# (summary_YYYYMMDD.json). A day file is only parsed the first time it is
+# seen; deleting a summary forces it to be rebuilt.
+HISTORY_INDEX_DIR = Path(os.getenv("HISTORY_INDEX_DIR", str(EXCEL_OUTPUT_DIR / "history_index")))
+HISTORY_INDEX_DIR.mkdir(exist_ok=True)  # Create directory if it doesn't exist
+
 # ============================================================================
 # Currency Conversion Configuration
 # ============================================================================
@@ -85,7 +238,18 @@ EXCHANGE_RATE_CACHE_TTL = 3600  # 1 hour in seconds
 # Maximum number of trades to keep in memory buffer
 # Older trades are removed when this limit is reached
 # This prevents unbounded memory growth while maintaining recent trade history
-MAX_TRADES_IN_BUFFER = 1000
+# Buffer-wide analytics are aggregated incrementally rather than recomputed
+# from the whole buffer, so this can be raised (e.g. MAX_TRADES_IN_BUFFER=100000)
+MAX_TRADES_IN_BUFFER = int(os.getenv("MAX_TRADES_IN_BUFFER", "1000"))
+
+# ============================================================================
+# Pro Trader Analytics Configuration
+# ============================================================================
+
+# Time windows (in minutes) for pro trader metrics
+# All windows are computed in one pass over the trades of the largest window,
+# so adding windows (e.g. 1, 5, 240) does not add another buffer scan
+PRO_TRADER_WINDOWS = [10, 15, 20, 30, 60]
 
 # ============================================================================
 # WebSocket Configuration
@@ -95,4 +259,36 @@ MAX_TRADES_IN_BUFFER = 1000
 # Lower values provide more frequent updates but increase network traffic
 WS_BROADCAST_INTERVAL = 1  # seconds for analytics updates
 
+# Each client has its own bounded outbound queue (in messages) drained by its
+# own writer task, so a slow client never delays the others or ingestion
+WS_CLIENT_QUEUE_SIZE = int(os.getenv("WS_CLIENT_QUEUE_SIZE", "256"))
+
+# What happens when a client's queue is full:
+# - "coalesce": a new analytics snapshot replaces the one still queued; when
+#   full, the oldest queued analytics snapshot or patch is dropped, and a
+#   client whose queue only holds other messages is disconnected (it resyncs
+#   on reconnect)
+# - "drop_oldest": the oldest queued message is dropped
+# - "disconnect": the client is disconnected
+# A client that lost an analytics patch gets the current snapshot instead of
+# the next patch.
+WS_OVERFLOW_POLICY = os.getenv("WS_OVERFLOW_POLICY", "coalesce").lower()
+
+# New trades are sent as one "new_trades" message (a list of trades) per
+# processed batch rather than one message per trade. With a delay (in seconds,
+# e.g. 0.005), the trades of batches processed within that window are merged
+# into a single message as well.
+WS_TRADE_BATCH_DELAY = float(os.getenv("WS_TRADE_BATCH_DELAY", "0"))
+
+# Send one legacy "new_trade" message per trade instead (clients that do not
+# handle "new_trades" yet)
+WS_LEGACY_TRADE_MESSAGES = os.getenv("WS_LEGACY_TRADE_MESSAGES", "false").lower() == "true"
+
+# Analytics are sent as a versioned stream: an "analytics_snapshot" (full tree)
+# on connect and on request, then "analytics_patch" messages holding only what
+# changed. A snapshot is broadcast instead of a patch at most this often (in
+# seconds; 0: never), so clients recover from any missed patch.
+WS_ANALYTICS_RESYNC_INTERVAL = float(os.getenv("WS_ANALYTICS_RESYNC_INTERVAL", "60"))
 
+# Broadcast the full legacy "analytics_update" message on every update instead
+WS_LEGACY_ANALYTICS_MESSAGES = os.getenv("WS_LEGACY_ANALYTICS_MESSAGES", "false").lower() == "true"
@@ -5,27 +5,33 @@ This module provides thread-safe Excel file writing with:
 - Daily file rotation (one file per day: trades_YYYYMMDD.xlsx)
 - Three sheets: Trades, Strategies, Analytics
 - Background thread for asynchronous writes
-- Duplicate prevention (updates existing trades instead of creating duplicates)
-- Trade loading on startup (for state persistence)
+- Batched saves (at most one workbook save per interval or batch of items)
+- Duplicate prevention (updates existing trades instead of creating duplicates,
+  located through an in-memory ID -> row index)
+- Streaming, read-only trade loading on startup (for state persistence)
 
 The ExcelWriter uses a queue-based architecture where write operations
 are queued and processed by a background thread, ensuring non-blocking
-writes and thread safety.
+writes and thread safety. Saving an .xlsx rewrites the whole workbook, so
+queued items are applied in memory and the file is saved at most once per
+EXCEL_SAVE_INTERVAL seconds or EXCEL_SAVE_BATCH_SIZE items, plus a forced
+flush on day rollover and on close().
 """
 
 import asyncio
 import logging
+import time
 from datetime import datetime, date
 from pathlib import Path
-from typing import List, Optional
+from typing import Callable, Dict, List, Optional
 from openpyxl import Workbook, load_workbook
 from openpyxl.styles import Font, PatternFill, Alignment
 from openpyxl.utils import get_column_letter
 import threading
 from queue import Queue, Empty
 
-from app.config import EXCEL_OUTPUT_DIR
-from app.models import Trade, Strategy, Analytics
+from app.config import EXCEL_OUTPUT_DIR, EXCEL_SAVE_INTERVAL, EXCEL_SAVE_BATCH_SIZE
+from app.models import Trade, Strategy, Analytics, validate_trades
 
 logger = logging.getLogger(__name__)
 
@@ -52,12 +58,24 @@ class ExcelWriter:
         trades_sheet: Worksheet for trades
         strategies_sheet: Worksheet for strategies
         analytics_sheet: Worksheet for analytics
+        trade_rows: Row of each trade in the Trades sheet, by dissemination_identifier
+        strategy_rows: Row of each strategy in the Strategies sheet, by strategy_id
+        next_trade_row: First free row of the Trades sheet
+        next_strategy_row: First free row of the Strategies sheet
         current_file_path: Path to current Excel file
         running: Flag to control background thread
         writer_thread: Background thread for processing writes
+        save_interval: Seconds between two saves of pending writes
+        save_batch_size: Save early once this many items are pending (None: never)
+        pending_writes: Items applied in memory since the last save
+        last_save: Monotonic time of the last save
+        save_requested: Set to save pending writes without waiting for the interval
     """
     
-    def __init__(self):
+    # Rows validated per batch when loading trades at startup
+    LOAD_BATCH_SIZE = 2000
+    
+    def __init__(self, save_interval: float = EXCEL_SAVE_INTERVAL, save_batch_size: Optional[int] = EXCEL_SAVE_BATCH_SIZE):
         self.current_date = date.today()
         self.write_queue = Queue()
         self.lock = threading.Lock()
@@ -65,15 +83,24 @@ class ExcelWriter:
         self.trades_sheet = None
         self.strategies_sheet = None
         self.analytics_sheet = None
+        self.trade_rows: Dict[str, int] = {}
+        self.strategy_rows: Dict[str, int] = {}
+        self.next_trade_row = 2
+        self.next_strategy_row = 2
         self.current_file_path: Optional[Path] = None
         self.running = True
+        self.save_interval = save_interval
+        self.save_batch_size = save_batch_size
+        self.pending_writes = 0
+        self.last_save = time.monotonic()
+        self.save_requested = threading.Event()
+        
+        # Today's file is opened lazily (by the writer thread or a load), so
+        # constructing the writer never blocks on a large workbook
         
         # Start background writer thread
         self.writer_thread = threading.Thread(target=self._writer_loop, daemon=True)
         self.writer_thread.start()
-        
-        # Initialize today's file
-        self._ensure_file_exists()
     
     def _get_file_path(self, target_date: date) -> Path:
         """Get Excel file path for a given date."""
@@ -81,14 +108,21 @@ class ExcelWriter:
         return EXCEL_OUTPUT_DIR / filename
     
     def _ensure_file_exists(self):
-        """Create or load today's Excel file."""
+        """Create or load today's Excel file (once per day: pending writes live in memory)."""
         today = date.today()
         
         if today != self.current_date:
-            # Date changed - create new file
+            # Date changed - flush yesterday's pending writes, then switch files
+            self._save()
             self.current_date = today
-            self._create_new_file()
-        elif self.current_file_path is None or not self.current_file_path.exists():
+            self.workbook = None
+        
+        if self.workbook is not None:
+            # Already open - never reload over unsaved writes
+            return
+        
+        self.current_file_path = self._get_file_path(self.current_date)
+        if not self.current_file_path.exists():
             # File doesn't exist - create it
             self._create_new_file()
         else:
@@ -106,6 +140,7 @@ class ExcelWriter:
                     self._init_analytics_sheet()
                 else:
                     self.analytics_sheet = self.workbook["Analytics"]
+                self._build_row_indexes()
             except Exception as e:
                 logger.error(f"Error loading Excel file: {e}")
                 self._create_new_file()
@@ -131,7 +166,15 @@ class ExcelWriter:
         self.analytics_sheet = self.workbook.create_sheet("Analytics")
         self._init_analytics_sheet()
         
+        # Fresh file: nothing to index yet
+        self.trade_rows = {}
+        self.strategy_rows = {}
+        self.next_trade_row = 2
+        self.next_strategy_row = 2
+        
         self.workbook.save(self.current_file_path)
+        self.pending_writes = 0
+        self.last_save = time.monotonic()
         logger.info(f"Created new Excel file: {self.current_file_path}")
     
     def _init_trades_sheet(self):
@@ -190,66 +233,121 @@ class ExcelWriter:
         """Queue analytics update."""
         self.write_queue.put(("analytics", analytics))
     
+    def request_save(self):
+        """Save pending writes on the next writer loop iteration."""
+        self.save_requested.set()
+    
+    def close(self):
+        """Stop the writer thread after it has applied and saved everything queued."""
+        if not self.running:
+            return
+        self.running = False
+        self.writer_thread.join()
+        logger.info("Excel writer stopped")
+    
+    def _drain_queue(self, timeout: float) -> list:
+        """Wait up to timeout for one queued item, then take everything else queued."""
+        items = [self.write_queue.get(timeout=timeout)]
+        while True:
+            try:
+                items.append(self.write_queue.get_nowait())
+            except Empty:
+                return items
+    
+    def _apply_items(self, items: list):
+        """Apply queued items to the in-memory workbook."""
+        # Each analytics item rewrites the whole sheet: only the latest one matters
+        last_analytics = None
+        for index, (item_type, _) in enumerate(items):
+            if item_type == "analytics":
+                last_analytics = index
+        
+        # A failing item is logged and skipped; the rest of the batch is still applied
+        applied = 0
+        for index, (item_type, data) in enumerate(items):
+            try:
+                if item_type == "trade":
+                    self._write_trade(data)
+                elif item_type == "strategy":
+                    self._write_strategy(data)
+                elif item_type == "analytics" and index == last_analytics:
+                    self._write_analytics(data)
+                else:
+                    continue
+                applied += 1
+            except Exception as e:
+                logger.error(f"Error writing {item_type} to Excel: {e}", exc_info=True)
+        self.pending_writes += applied
+    
+    def _save(self):
+        """Save the workbook if there are writes pending."""
+        if not self.pending_writes or self.workbook is None:
+            return
+        self.workbook.save(self.current_file_path)
+        logger.debug(f"Saved {self.pending_writes} pending writes to {self.current_file_path}")
+        self.pending_writes = 0
+        self.last_save = time.monotonic()
+    
     def _writer_loop(self):
         """Background thread loop for writing to Excel."""
-        while self.running:
+        while self.running or not self.write_queue.empty():
+            # Wake up in time for the next due save when writes are pending
+            timeout = 1.0
+            if self.pending_writes:
+                timeout = max(0.05, min(timeout, self.last_save + self.save_interval - time.monotonic()))
+            
+            try:
+                items = self._drain_queue(timeout)
+            except Empty:
+                items = []
+            
             try:
-                item = self.write_queue.get(timeout=1)
-                item_type, data = item
-                
                 with self.lock:
-                    self._ensure_file_exists()
-                    
-                    if item_type == "trade":
-                        self._write_trade(data)
-                    elif item_type == "strategy":
-                        self._write_strategy(data)
-                    elif item_type == "analytics":
-                        self._write_analytics(data)
-                    
-                    self.workbook.save(self.current_file_path)
+                    if items:
+                        self._ensure_file_exists()
+                        self._apply_items(items)
                     
-            except Empty:
-                # Queue is empty, continue waiting - this is normal
-                continue
+                    save_due = time.monotonic() - self.last_save >= self.save_interval
+                    if self.save_requested.is_set():
+                        self.save_requested.clear()
+                        save_due = True
+                    batch_full = self.save_batch_size is not None and self.pending_writes >= self.save_batch_size
+                    if batch_full or save_due:
+                        self._save()
             except Exception as e:
-                if self.running:  # Only log if still running
-                    logger.error(f"Error in Excel writer loop: {e}", exc_info=True)
+                logger.error(f"Error in Excel writer loop: {e}", exc_info=True)
+        
+        # Final flush on shutdown
+        try:
+            with self.lock:
+                self._save()
+        except Exception as e:
+            logger.error(f"Error flushing Excel file on shutdown: {e}", exc_info=True)
+    
+    def _build_row_indexes(self):
+        """Index the ID column of the Trades and Strategies sheets (ID -> row)."""
+        # openpyxl recomputes max_row from every cell on each access: read it once
+        self.next_trade_row = self.trades_sheet.max_row + 1
+        self.next_strategy_row = self.strategies_sheet.max_row + 1
+        
+        self.trade_rows = {}
+        for row, (trade_id,) in enumerate(self.trades_sheet.iter_rows(min_row=2, max_col=1, values_only=True), start=2):
+            if trade_id:
+                self.trade_rows[str(trade_id)] = row
+        
+        self.strategy_rows = {}
+        for row, (strategy_id,) in enumerate(self.strategies_sheet.iter_rows(min_row=2, max_col=1, values_only=True), start=2):
+            if strategy_id:
+                self.strategy_rows[str(strategy_id)] = row
     
     def _write_trade(self, trade: Trade):
-        """Write a trade to the Trades sheet."""
-        # Check if trade already exists (by ID)
-        for row in range(2, self.trades_sheet.max_row + 1):
-            if self.trades_sheet.cell(row=row, column=1).value == trade.dissemination_identifier:
-                # Update existing row
-                self.trades_sheet.cell(row=row, column=2, value=trade.execution_timestamp.strftime("%Y-%m-%d %H:%M:%S"))
-                self.trades_sheet.cell(row=row, column=3, value=trade.action_type)
-                self.trades_sheet.cell(row=row, column=4, value=trade.unique_product_identifier_underlier_name or "")
-                self.trades_sheet.cell(row=row, column=5, value=trade.notional_amount_leg1)
-                self.trades_sheet.cell(row=row, column=6, value=trade.notional_amount_leg2)
-                self.trades_sheet.cell(row=row, column=7, value=trade.notional_currency_leg1)
-                self.trades_sheet.cell(row=row, column=8, value=trade.notional_currency_leg2)
-                self.trades_sheet.cell(row=row, column=9, value=trade.fixed_rate_leg1)
-                self.trades_sheet.cell(row=row, column=10, value=trade.fixed_rate_leg2)
-                self.trades_sheet.cell(row=row, column=11, value=trade.spread_leg2)
-                rate_display = ""
-                if trade.fixed_rate_leg1:
-                    rate_display = f"{trade.fixed_rate_leg1 * 100:.4f}%"
-                elif trade.spread_leg2 is not None:
-                    rate_display = f"Spread: {trade.spread_leg2}"
-                self.trades_sheet.cell(row=row, column=12, value=rate_display)
-                self.trades_sheet.cell(row=row, column=13, value=trade.expiration_date or "")
-                self.trades_sheet.cell(row=row, column=14, value=trade.instrument or "")
-                self.trades_sheet.cell(row=row, column=15, value=trade.platform_identifier or "")
-                self.trades_sheet.cell(row=row, column=16, value=trade.strategy_id or "")
-                self.trades_sheet.cell(row=row, column=17, value="Yes" if trade.package_indicator else "No")
-                self.trades_sheet.cell(row=row, column=18, value=trade.notional_eur or 0)
-                self.trades_sheet.cell(row=row, column=19, value="Yes" if trade.is_forward else "No")
-                self.trades_sheet.cell(row=row, column=20, value=trade.effective_date or "")
-                return
-        
-        # Add new trade
-        row = self.trades_sheet.max_row + 1
+        """Write a trade to the Trades sheet (updating its row if it already exists)."""
+        row = self.trade_rows.get(trade.dissemination_identifier)
+        if row is None:
+            # Add new trade
+            row = self.next_trade_row
+            self.next_trade_row += 1
+            self.trade_rows[trade.dissemination_identifier] = row
         
         # Calculate rate display
         rate_display = ""
@@ -281,21 +379,13 @@ class ExcelWriter:
     
     def _write_strategy(self, strategy: Strategy):
         """Write or update a strategy in the Strategies sheet."""
-        # Check if strategy already exists
-        for row in range(2, self.strategies_sheet.max_row + 1):
-            if self.strategies_sheet.cell(row=row, column=1).value == strategy.strategy_id:
-                # Update existing row
-                self.strategies_sheet.cell(row=row, column=2, value=strategy.strategy_type)
-                self.strategies_sheet.cell(row=row, column=3, value=strategy.underlying_name)
-                self.strategies_sheet.cell(row=row, column=4, value=len(strategy.legs))
-                self.strategies_sheet.cell(row=row, column=5, value=strategy.total_notional_eur)
-                self.strategies_sheet.cell(row=row, column=6, value=strategy.execution_start.strftime("%Y-%m-%d %H:%M:%S"))
-                self.strategies_sheet.cell(row=row, column=7, value=strategy.execution_end.strftime("%Y-%m-%d %H:%M:%S"))
-                self.strategies_sheet.cell(row=row, column=8, value=strategy.package_transaction_price or "")
-                return
-        
-        # Add new strategy
-        row = self.strategies_sheet.max_row + 1
+        row = self.strategy_rows.get(strategy.strategy_id)
+        if row is None:
+            # Add new strategy
+            row = self.next_strategy_row
+            self.next_strategy_row += 1
+            self.strategy_rows[strategy.strategy_id] = row
+        
         self.strategies_sheet.cell(row=row, column=1, value=strategy.strategy_id)
         self.strategies_sheet.cell(row=row, column=2, value=strategy.strategy_type)
         self.strategies_sheet.cell(row=row, column=3, value=strategy.underlying_name)
@@ -398,64 +488,126 @@ class ExcelWriter:
                 self.analytics_sheet.cell(row=row, column=2, value=f"Notional: {currency_data['notional']}, Count: {currency_data['count']}")
                 row += 1
     
-    def load_trades_from_excel(self) -> List[Trade]:
-        """Load all trades from today's Excel file."""
+    def load_trades_from_excel(self, progress: Optional[Callable[[int], None]] = None) -> List[Trade]:
+        """
+        Load all trades from today's Excel file.
+        
+        Args:
+            progress: Optional callback, called with the number of rows read so far
+            
+        Returns:
+            Trades in sheet order
+        """
+        return self.read_trades_file(self._get_file_path(date.today()), progress)
+    
+    @classmethod
+    def read_trades_file(cls, file_path: Path, progress: Optional[Callable[[int], None]] = None) -> List[Trade]:
+        """
+        Load all trades from a daily Excel file.
+        
+        Rows are streamed from a read-only, values-only workbook (the editable
+        workbook used for writes is opened separately by the writer thread)
+        and validated into Trade objects in batches. This does not need a
+        writer instance, so past days can be read without starting one.
+        
+        Args:
+            file_path: Path to a trades_YYYYMMDD.xlsx file
+            progress: Optional callback, called with the number of rows read so far
+            
+        Returns:
+            Trades in sheet order
+        """
         trades = []
+        if not file_path.exists():
+            logger.info(f"No trades found in Excel file {file_path}")
+            return trades
+        
         try:
-            self._ensure_file_exists()
-            if not self.trades_sheet or self.trades_sheet.max_row < 2:
-                logger.info("No trades found in Excel file")
-                return trades
-            
-            # Read all rows (skip header row 1)
-            for row in range(2, self.trades_sheet.max_row + 1):
-                try:
-                    trade_id = self.trades_sheet.cell(row=row, column=1).value
-                    if not trade_id:
+            workbook = load_workbook(file_path, read_only=True, data_only=True)
+            try:
+                rows_read = 0
+                batch = []
+                # Read all rows (skip header row 1)
+                for row_number, values in enumerate(workbook["Trades"].iter_rows(min_row=2, values_only=True), start=2):
+                    rows_read += 1
+                    try:
+                        record = cls._trade_record_from_row(values)
+                    except Exception as e:
+                        logger.warning(f"Error loading trade from row {row_number}: {e}")
                         continue
+                    if record is not None:
+                        batch.append((row_number, record))
                     
-                    timestamp_str = self.trades_sheet.cell(row=row, column=2).value
-                    if isinstance(timestamp_str, str):
-                        timestamp = datetime.strptime(timestamp_str, "%Y-%m-%d %H:%M:%S")
-                    else:
-                        timestamp = timestamp_str if isinstance(timestamp_str, datetime) else datetime.utcnow()
-                    
-                    # Reconstruct trade from Excel row
-                    trade = Trade(
-                        dissemination_identifier=str(trade_id),
-                        action_type=self.trades_sheet.cell(row=row, column=3).value or "NEWT",
-                        event_type="TRADE",
-                        event_timestamp=timestamp,
-                        execution_timestamp=timestamp,
-                        effective_date=self.trades_sheet.cell(row=row, column=20).value if self.trades_sheet.max_column >= 20 else None,
-                        expiration_date=self.trades_sheet.cell(row=row, column=13).value or None,
-                        notional_amount_leg1=float(self.trades_sheet.cell(row=row, column=5).value or 0),
-                        notional_amount_leg2=float(self.trades_sheet.cell(row=row, column=6).value or 0),
-                        notional_currency_leg1=self.trades_sheet.cell(row=row, column=7).value or "",
-                        notional_currency_leg2=self.trades_sheet.cell(row=row, column=8).value or "",
-                        fixed_rate_leg1=self.trades_sheet.cell(row=row, column=9).value,
-                        fixed_rate_leg2=self.trades_sheet.cell(row=row, column=10).value,
-                        spread_leg1=None,
-                        spread_leg2=self.trades_sheet.cell(row=row, column=11).value,
-                        unique_product_identifier="",
-                        unique_product_identifier_underlier_name=self.trades_sheet.cell(row=row, column=4).value or None,
-                        platform_identifier=self.trades_sheet.cell(row=row, column=15).value or None,
-                        package_indicator=self.trades_sheet.cell(row=row, column=17).value == "Yes" if self.trades_sheet.cell(row=row, column=17).value else False,
-                        package_transaction_price=None,  # Not stored in Excel currently
-                        strategy_id=self.trades_sheet.cell(row=row, column=16).value or None,
-                        notional_eur=float(self.trades_sheet.cell(row=row, column=18).value or 0),
-                        instrument=self.trades_sheet.cell(row=row, column=14).value or None,
-                        is_forward=self.trades_sheet.cell(row=row, column=19).value == "Yes" if self.trades_sheet.max_column >= 19 and self.trades_sheet.cell(row=row, column=19).value else False,
-                        effective_date_dt=None
-                    )
-                    trades.append(trade)
-                except Exception as e:
-                    logger.warning(f"Error loading trade from row {row}: {e}")
-                    continue
+                    if len(batch) >= cls.LOAD_BATCH_SIZE:
+                        trades.extend(cls._validate_trade_rows(batch))
+                        batch = []
+                        if progress:
+                            progress(rows_read)
+                
+                trades.extend(cls._validate_trade_rows(batch))
+                if progress:
+                    progress(rows_read)
+            finally:
+                workbook.close()
             
-            logger.info(f"Loaded {len(trades)} trades from Excel file")
+            logger.info(f"Loaded {len(trades)} trades from Excel file {file_path}")
         except Exception as e:
             logger.error(f"Error loading trades from Excel: {e}", exc_info=True)
         
         return trades
-
+    
+    @staticmethod
+    def _trade_record_from_row(values: tuple) -> Optional[dict]:
+        """Map a Trades sheet row (tuple of cell values) to Trade fields, or None for an empty row."""
+        # Older files may have fewer columns (no Is Forward / Effective Date)
+        values = tuple(values) + (None,) * (20 - len(values))
+        (trade_id, timestamp_value, action, underlying, notional_leg1, notional_leg2,
+         currency_leg1, currency_leg2, fixed_rate_leg1, fixed_rate_leg2, spread_leg2,
+         _rate_display, maturity, instrument, platform, strategy_id, package,
+         notional_eur, is_forward, effective_date) = values[:20]
+        if not trade_id:
+            return None
+        
+        if isinstance(timestamp_value, str):
+            timestamp = datetime.strptime(timestamp_value, "%Y-%m-%d %H:%M:%S")
+        else:
+            timestamp = timestamp_value if isinstance(timestamp_value, datetime) else datetime.utcnow()
+        
+        # Reconstruct trade from Excel row
+        return {
+            "dissemination_identifier": str(trade_id),
+            "action_type": action or "NEWT",
+            "event_type": "TRADE",
+            "event_timestamp": timestamp,
+            "execution_timestamp": timestamp,
+            "effective_date": effective_date,
+            "expiration_date": maturity or None,
+            "notional_amount_leg1": float(notional_leg1 or 0),
+            "notional_amount_leg2": float(notional_leg2 or 0),
+            "notional_currency_leg1": currency_leg1 or "",
+            "notional_currency_leg2": currency_leg2 or "",
+            "fixed_rate_leg1": fixed_rate_leg1,
+            "fixed_rate_leg2": fixed_rate_leg2,
+            "spread_leg1": None,
+            "spread_leg2": spread_leg2,
+            "unique_product_identifier": "",
+            "unique_product_identifier_underlier_name": underlying or None,
+            "platform_identifier": platform or None,
+            "package_indicator": package == "Yes",
+            "package_transaction_price": None,  # Not stored in Excel currently
+            "strategy_id": strategy_id or None,
+            "notional_eur": float(notional_eur or 0),
+            "instrument": instrument or None,
+            "is_forward": is_forward == "Yes",
+            "effective_date_dt": None
+        }
+    
+    @staticmethod
+    def _validate_trade_rows(batch: List[tuple]) -> List[Trade]:
+        """Validate a batch of (row number, trade record) pairs, logging rows that fail."""
+        if not batch:
+            return []
+        trades, errors = validate_trades([record for _, record in batch])
+        for index, error in errors:
+            logger.warning(f"Error loading trade from row {batch[index][0]}: {error}")
+        return trades
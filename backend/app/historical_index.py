@@ -0,0 +1,363 @@
+"""
+Multi-day historical index over the daily trade files.
+
+This module provides the HistoricalIndex used by the analytics engine to put
+the current session in the context of the previous 30/90 days. Past days are
+read from the daily files (trades_YYYYMMDD.jsonl in JOURNAL_DIR, or
+trades_YYYYMMDD.xlsx in EXCEL_OUTPUT_DIR) and reduced to a per-day summary:
+- Per currency and instrument: trade count, volume, mean/std/min/max rate
+  and rate percentiles
+- Per currency and instrument: mergeable quantile sketches (see
+  app.quantile_sketch) of trade rates, trade sizes and hourly volatility
+
+Summaries are written to HISTORY_INDEX_DIR (summary_YYYYMMDD.json) and kept
+in memory, so a day file is parsed once, and the index is only refreshed
+when a new day file appears. Historical context then comes from merging
+the day sketches and from the daily means, without touching the trade files
+on each poll.
+"""
+
+import json
+import logging
+import re
+import threading
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.config import EXCEL_OUTPUT_DIR, HISTORY_INDEX_DIR, JOURNAL_DIR
+from app.excel_writer import ExcelWriter
+from app.models import Trade
+from app.quantile_sketch import QuantileSketch
+from app.storage import TradeJournal
+
+logger = logging.getLogger(__name__)
+
+# Daily trade files: trades_YYYYMMDD.jsonl (journal) or trades_YYYYMMDD.xlsx (Excel)
+DAY_FILE_PATTERN = re.compile(r"^trades_(\d{8})\.(jsonl|xlsx)$")
+
+# Rate percentiles stored in each day summary
+SUMMARY_PERCENTILES = (5, 25, 50, 75, 95)
+
+# Distributions sketched per day and instrument
+SKETCHED_METRICS = ("rate", "volume", "volatility")
+
+
+def annualized_volatility(rates: np.ndarray) -> Optional[float]:
+    """
+    Volatility of a set of rates, scaled like AnalyticsEngine instrument volatility.
+
+    Returns:
+        std dev * sqrt(252) * 100, or None with fewer than 2 rates
+    """
+    if rates.size < 2:
+        return None
+    return float(rates.std(ddof=1)) * (252 ** 0.5) * 100
+
+
+def summarize_day(day: date, trades: List[Trade]) -> Dict:
+    """
+    Reduce one day of trades to per-currency, per-instrument statistics.
+
+    Rates are kept in the trades' units (decimal, e.g. 0.0245 for 2.45%).
+    Volatility is sampled once per hour with at least two rates, which is
+    comparable with the live metrics' 60-minute window.
+
+    Args:
+        day: Day the trades belong to
+        trades: The day's trades
+
+    Returns:
+        Summary dict: {"date", "trade_count", "currencies": {currency: {instrument: stats}}}
+    """
+    groups: Dict[Tuple[str, str], Tuple[List[float], List[float], Dict[int, List[float]]]] = {}
+    for trade in trades:
+        if not trade.instrument:
+            continue
+        key = (trade.notional_currency_leg1 or "", trade.instrument)
+        rates, notionals, hourly_rates = groups.setdefault(key, ([], [], {}))
+        notionals.append(trade.notional_eur or 0.0)
+        if trade.fixed_rate_leg1 is not None:
+            rates.append(trade.fixed_rate_leg1)
+            hourly_rates.setdefault(trade.execution_timestamp.hour, []).append(trade.fixed_rate_leg1)
+
+    currencies: Dict[str, Dict[str, Dict]] = {}
+    for (currency, instrument), (rates, notionals, hourly_rates) in groups.items():
+        stats = {
+            "count": len(notionals),
+            "volume": float(np.sum(notionals)),
+            "rate_count": 0,
+        }
+        rate_values = np.asarray(rates, dtype=np.float64)
+        rate_values = rate_values[np.isfinite(rate_values)]
+        volatilities = []
+        for hour_rates in hourly_rates.values():
+            hour_values = np.asarray(hour_rates, dtype=np.float64)
+            volatility = annualized_volatility(hour_values[np.isfinite(hour_values)])
+            if volatility is not None:
+                volatilities.append(volatility)
+        stats["sketches"] = {
+            "rate": QuantileSketch.from_values(rate_values).to_dict(),
+            "volume": QuantileSketch.from_values(notionals).to_dict(),
+            "volatility": QuantileSketch.from_values(volatilities).to_dict(),
+        }
+        if rate_values.size:
+            percentiles = np.percentile(rate_values, SUMMARY_PERCENTILES)
+            stats.update({
+                "rate_count": int(rate_values.size),
+                "rate_mean": float(rate_values.mean()),
+                "rate_std": float(rate_values.std(ddof=1)) if rate_values.size > 1 else 0.0,
+                "rate_min": float(rate_values.min()),
+                "rate_max": float(rate_values.max()),
+                "rate_percentiles": {
+                    f"p{p}": float(value) for p, value in zip(SUMMARY_PERCENTILES, percentiles)
+                },
+            })
+        currencies.setdefault(currency, {})[instrument] = stats
+
+    return {
+        "date": day.isoformat(),
+        "trade_count": len(trades),
+        "currencies": currencies,
+    }
+
+
+class InstrumentHistory:
+    """
+    An instrument's rate, trade size and volatility history over a range of past days.
+
+    Attributes:
+        instrument: Instrument (tenor)
+        days: Number of days with at least one rate for the instrument
+        daily_means: Daily mean rates, sorted ascending (decimal)
+        mean: Mean of the daily means
+        std: Standard deviation of the daily means (0 with fewer than 2 days)
+        avg_daily_volume: Average EUR volume per day with trades
+        sketches: Merged QuantileSketch per metric ("rate", "volume", "volatility")
+    """
+
+    def __init__(self, instrument: str, day_stats: List[Dict]):
+        self.instrument = instrument
+        daily_means = [stats["rate_mean"] for stats in day_stats if stats["rate_count"]]
+        self.daily_means = np.sort(np.asarray(daily_means, dtype=np.float64))
+        self.days = int(self.daily_means.size)
+        self.mean = float(self.daily_means.mean()) if self.days else 0.0
+        self.std = float(self.daily_means.std(ddof=1)) if self.days > 1 else 0.0
+        self.avg_daily_volume = float(np.mean([stats["volume"] for stats in day_stats])) if day_stats else 0.0
+        self.sketches: Dict[str, QuantileSketch] = {
+            metric: QuantileSketch.merged(
+                QuantileSketch.from_dict(stats["sketches"][metric])
+                for stats in day_stats if "sketches" in stats
+            )
+            for metric in SKETCHED_METRICS
+        }
+
+    def percentile_of(self, rate: float) -> float:
+        """Percentile of the given rate among past trade rates (50 without history)."""
+        percentile = self.sketches["rate"].percentile_of(rate)
+        return percentile if percentile is not None else 50.0
+
+    def volatility_percentile(self, volatility: float) -> Optional[float]:
+        """Percentile of the given volatility among past hourly volatilities, or None without history."""
+        return self.sketches["volatility"].percentile_of(volatility)
+
+    def z_score(self, rate: float) -> float:
+        """Z-score of the given rate against the daily means (0 without dispersion)."""
+        if self.std <= 0:
+            return 0.0
+        return (rate - self.mean) / self.std
+
+
+class HistoricalIndex:
+    """
+    Cached per-day summaries of the past daily trade files.
+
+    Today's file is never indexed: it is still being written, and the
+    current session is what historical context is compared against.
+
+    Attributes:
+        excel_dir: Directory of the daily Excel files
+        journal_dir: Directory of the daily journal files
+        index_dir: Directory where day summaries are cached
+        summaries: Day summaries by date
+        failed_days: Newest source file mtime of the days whose summary could
+            not be built (retried only once one of their files changes)
+    """
+
+    # Bumped when the summary format changes, so cached files get rebuilt
+    SUMMARY_VERSION = 2
+
+    def __init__(
+        self,
+        excel_dir: Path = EXCEL_OUTPUT_DIR,
+        journal_dir: Path = JOURNAL_DIR,
+        index_dir: Path = HISTORY_INDEX_DIR
+    ):
+        self.excel_dir = excel_dir
+        self.journal_dir = journal_dir
+        self.index_dir = index_dir
+        self.summaries: Dict[date, Dict] = {}
+        self.failed_days: Dict[date, Optional[float]] = {}
+        self._history_cache: Dict[tuple, Dict[str, InstrumentHistory]] = {}
+        self._lock = threading.Lock()
+
+    def _scan_day_files(self) -> Dict[date, List[Path]]:
+        """List the past day files, journal first (it is the system of record)."""
+        today = date.today()
+        day_files: Dict[date, List[Path]] = {}
+        for directory in (self.journal_dir, self.excel_dir):
+            if not directory.exists():
+                continue
+            for path in directory.iterdir():
+                match = DAY_FILE_PATTERN.match(path.name)
+                if not match:
+                    continue
+                try:
+                    day = datetime.strptime(match.group(1), "%Y%m%d").date()
+                except ValueError:
+                    continue
+                if day < today:
+                    day_files.setdefault(day, []).append(path)
+        return day_files
+
+    def _summary_path(self, day: date) -> Path:
+        """Get the cached summary path for a given date."""
+        return self.index_dir / f"summary_{day.strftime('%Y%m%d')}.json"
+
+    @staticmethod
+    def _newest_mtime(paths: List[Path]) -> Optional[float]:
+        """Modification time of the newest of a day's files (None if one disappeared)."""
+        try:
+            return max(path.stat().st_mtime for path in paths)
+        except OSError:
+            return None
+
+    def _read_day(self, day: date, paths: List[Path]) -> List[Trade]:
+        """Read a day's trades from the first of its files that has any."""
+        for path in paths:
+            if path.suffix == ".jsonl":
+                trades = TradeJournal(path.parent).load_trades(day)
+            else:
+                trades = ExcelWriter.read_trades_file(path)
+            if trades:
+                return trades
+        return []
+
+    def _load_or_build_summary(self, day: date, paths: List[Path]) -> Dict:
+        """Load a day's cached summary, or build it from the day files if missing or stale."""
+        summary_path = self._summary_path(day)
+        newest_source = max(path.stat().st_mtime for path in paths)
+        if summary_path.exists() and summary_path.stat().st_mtime >= newest_source:
+            try:
+                with open(summary_path, "r", encoding="utf-8") as summary_file:
+                    summary = json.load(summary_file)
+                if summary.get("version") == self.SUMMARY_VERSION:
+                    return summary
+            except Exception as e:
+                logger.warning(f"Rebuilding unreadable summary {summary_path}: {e}")
+
+        summary = summarize_day(day, self._read_day(day, paths))
+        summary["version"] = self.SUMMARY_VERSION
+        try:
+            # Write then rename, so a crash never leaves a truncated summary behind
+            temp_path = summary_path.with_suffix(".tmp")
+            with open(temp_path, "w", encoding="utf-8") as summary_file:
+                json.dump(summary, summary_file)
+            temp_path.replace(summary_path)
+        except Exception as e:
+            logger.warning(f"Could not cache summary {summary_path}: {e}")
+        logger.info(f"Indexed {summary['trade_count']} trades for {day.isoformat()}")
+        return summary
+
+    def refresh(self) -> bool:
+        """
+        Summarize day files that are not indexed yet.
+
+        Listing the directories is cheap; day files are only parsed when
+        their summary is missing or older than the file. A day that failed
+        to index is skipped until one of its files is modified.
+
+        Returns:
+            True if new days were indexed
+        """
+        with self._lock:
+            day_files = self._scan_day_files()
+            new_days = sorted(
+                day for day in day_files
+                if day not in self.summaries
+                and not (day in self.failed_days and self.failed_days[day] == self._newest_mtime(day_files[day]))
+            )
+            indexed = False
+            for day in new_days:
+                try:
+                    self.summaries[day] = self._load_or_build_summary(day, day_files[day])
+                    self.failed_days.pop(day, None)
+                    indexed = True
+                except Exception as e:
+                    logger.error(f"Error indexing trades for {day.isoformat()}: {e}", exc_info=True)
+                    # Not retried (nor re-parsed) on every refresh until the file changes
+                    self.failed_days[day] = self._newest_mtime(day_files[day])
+            if indexed:
+                self._history_cache.clear()
+            return indexed
+
+    def day_summaries(self, days: int) -> List[Dict]:
+        """Return the summaries of the last `days` days before today, oldest first."""
+        self.refresh()
+        today = date.today()
+        first_day = today - timedelta(days=days)
+        return [
+            self.summaries[day]
+            for day in sorted(self.summaries)
+            if first_day <= day < today
+        ]
+
+    def instrument_history(self, days: int, currency: str = "EUR") -> Dict[str, InstrumentHistory]:
+        """
+        Per-instrument history (daily mean rates, merged sketches) over the last `days` days.
+
+        Results are cached until a new day is indexed (or the date changes).
+
+        Args:
+            days: Number of past days to cover
+            currency: Leg 1 notional currency of the trades to consider
+
+        Returns:
+            {instrument: InstrumentHistory}, for instruments with at least one rate
+        """
+        self.refresh()
+        key = (days, currency, date.today())
+        cached = self._history_cache.get(key)
+        if cached is not None:
+            return cached
+
+        day_stats: Dict[str, List[Dict]] = {}
+        for summary in self.day_summaries(days):
+            for instrument, stats in summary["currencies"].get(currency, {}).items():
+                day_stats.setdefault(instrument, []).append(stats)
+
+        history = {
+            instrument: InstrumentHistory(instrument, stats)
+            for instrument, stats in day_stats.items()
+            if any(day["rate_count"] for day in stats)
+        }
+        self._history_cache[key] = history
+        return history
+
+    def load_trades(self, days: int) -> List[Trade]:
+        """
+        Load the trades of the last `days` days before today, oldest day first.
+
+        This parses every day file in range; analytics should use
+        instrument_history() instead, which only reads the cached summaries.
+        """
+        today = date.today()
+        first_day = today - timedelta(days=days)
+        day_files = self._scan_day_files()
+        trades: List[Trade] = []
+        for day in sorted(day_files):
+            if first_day <= day < today:
+                trades.extend(self._read_day(day, day_files[day]))
+        return trades
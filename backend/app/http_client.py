@@ -0,0 +1,52 @@
+"""
+Shared HTTP client factory.
+
+This module builds the long-lived httpx.AsyncClient instances used to call
+the internal API and the exchange rate API. Each owner (Poller,
+ExchangeRateCache) keeps its client for its whole lifetime, so requests
+reuse pooled keep-alive connections instead of paying a TCP/TLS handshake
+per poll, and closes it on application shutdown.
+"""
+
+import importlib.util
+import logging
+
+import httpx
+
+from app.config import (
+    HTTP2_ENABLED, HTTP_KEEPALIVE_EXPIRY, HTTP_MAX_CONNECTIONS,
+    HTTP_MAX_KEEPALIVE_CONNECTIONS, HTTP_TIMEOUT
+)
+
+logger = logging.getLogger(__name__)
+
+# httpx only supports HTTP/2 when the optional h2 package is installed
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+
+def create_http_client(timeout: float = HTTP_TIMEOUT) -> httpx.AsyncClient:
+    """
+    Create a pooled async HTTP client configured from app.config.
+    
+    HTTP/2 is used when enabled (HTTP2_ENABLED) and the h2 package is
+    available; otherwise the client speaks HTTP/1.1 with keep-alive.
+    
+    Args:
+        timeout: Request timeout in seconds
+        
+    Returns:
+        httpx.AsyncClient (the caller owns it and must aclose() it)
+    """
+    http2 = HTTP2_ENABLED and HTTP2_AVAILABLE
+    if HTTP2_ENABLED and not HTTP2_AVAILABLE:
+        logger.info("HTTP/2 requested but the h2 package is not installed, using HTTP/1.1")
+    
+    return httpx.AsyncClient(
+        timeout=timeout,
+        http2=http2,
+        limits=httpx.Limits(
+            max_connections=HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=HTTP_KEEPALIVE_EXPIRY
+        )
+    )
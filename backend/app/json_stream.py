@@ -0,0 +1,140 @@
+"""
+Incremental JSON array parsing.
+
+This module decodes a JSON document received in chunks and returns the
+elements of a top-level array as soon as each one is complete (a top-level
+object is returned as a single item). JSONArrayDecoder is fed the chunks one
+at a time with feed(), then once more with final=True at the end of the body
+(an empty body yields nothing). It is a plain object, so it can be handed to
+a worker thread or process together with the next chunk (see
+app.poller.decode_and_convert).
+
+Only the unparsed tail of the stream is buffered, so memory stays
+proportional to one element rather than to the whole response, and
+elements can be processed while the rest of the body is still arriving.
+"""
+
+import codecs
+import json
+from typing import Any, List
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = " \t\n\r"
+_DELIMITERS = _WHITESPACE + ",]}"
+
+
+class JSONStreamError(ValueError):
+    """Raised when the streamed document is not valid JSON."""
+
+
+def _skip_whitespace(buffer: str, index: int) -> int:
+    """Return the index of the first non-whitespace character at or after index."""
+    while index < len(buffer) and buffer[index] in _WHITESPACE:
+        index += 1
+    return index
+
+
+class JSONArrayDecoder:
+    """
+    Incremental decoder of a top-level JSON array (or single value).
+
+    Attributes:
+        buffer: Decoded text not parsed yet (at most one incomplete element)
+        in_array: Whether the document is an array (None until its first character)
+        expect_value: After "[" or ",": an element (or "]") comes next
+        finished: Whether the end of the document has been parsed
+    """
+
+    def __init__(self):
+        self.buffer = ""
+        self.in_array = None
+        self.expect_value = True
+        self.finished = False
+        self._raw = b""  # Trailing bytes of an incomplete UTF-8 sequence
+
+    def feed(self, data: bytes, final: bool = False) -> List[Any]:
+        """
+        Decode the next chunk of the document.
+
+        Args:
+            data: Next raw (UTF-8) chunk
+            final: Whether this is the last chunk (the document must be complete)
+
+        Returns:
+            The elements completed by this chunk, in order
+
+        Raises:
+            JSONStreamError: If the document is malformed, truncated (final
+                             chunk) or followed by other data
+        """
+        raw = self._raw + data
+        text, consumed = codecs.utf_8_decode(raw, "strict", final)
+        self._raw = raw[consumed:]
+
+        if self.finished:
+            # Only whitespace may follow the document
+            if text.strip(_WHITESPACE):
+                raise JSONStreamError("Unexpected data after JSON document")
+            return []
+
+        buffer = self.buffer + text
+        index = 0
+        items = []
+        while True:
+            index = _skip_whitespace(buffer, index)
+            if index >= len(buffer):
+                break
+
+            if self.in_array is None:
+                if buffer[index] == "[":
+                    self.in_array = True
+                    index += 1
+                    continue
+                # Not an array: the whole document is one value
+                self.in_array = False
+
+            if self.in_array and not self.expect_value:
+                if buffer[index] == ",":
+                    self.expect_value = True
+                    index += 1
+                    continue
+                if buffer[index] == "]":
+                    self.finished = True
+                    index += 1
+                    break
+                raise JSONStreamError(f"Expected ',' or ']' at offset {index}")
+
+            if self.in_array and buffer[index] == "]":
+                self.finished = True
+                index += 1
+                break
+
+            try:
+                value, end = _decoder.raw_decode(buffer, index)
+            except json.JSONDecodeError:
+                if final:
+                    raise JSONStreamError("Truncated or invalid JSON document")
+                break  # Element not complete yet: wait for the next chunk
+            if not final and not isinstance(value, (dict, list, str)) and (
+                end == len(buffer) or buffer[end] not in _DELIMITERS
+            ):
+                # A number may continue in the next chunk ("1" + "2", "4e" + "10")
+                break
+
+            index = end
+            items.append(value)
+            if not self.in_array:
+                self.finished = True
+                break
+            self.expect_value = False
+
+        if self.finished:
+            if buffer[index:].strip(_WHITESPACE):
+                raise JSONStreamError("Unexpected data after JSON document")
+            self.buffer = ""
+        else:
+            self.buffer = buffer[index:]
+            if final and self.in_array is not None:
+                raise JSONStreamError("Truncated JSON document")
+        return items
+
@@ -6,34 +6,41 @@ This is the main application module that orchestrates:
 - Trade processing and normalization
 - Strategy processing (from internal API)
 - Alert generation
-- Excel file writing
+- Trade persistence (daily journal, with Excel export)
 - WebSocket broadcasting
 - Analytics calculation
 
 The application maintains a global state with:
-- Trade buffer (in-memory, max 1000 trades)
+- Trade buffer (in-memory, bounded by MAX_TRADES_IN_BUFFER)
 - Tracked strategies (from internal API)
 - Alert engine
-- Excel writer
+- Storage (journal and/or Excel writer)
 - Analytics engine
 
-All trades are persisted to daily Excel files and loaded on startup to maintain
-state across application restarts.
+All trades are persisted to the day's store (see app.storage) and loaded on
+startup to maintain state across application restarts.
 """
 
 import asyncio
+import hmac
 import logging
-from datetime import datetime
-from typing import List, Set
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+from typing import List, Optional, Set
+from fastapi import FastAPI, HTTPException, Request, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
 import json
 
-from app.config import MAX_TRADES_IN_BUFFER, POLL_INTERVAL
-from app.poller import Poller
-from app.excel_writer import ExcelWriter
+from app.config import (
+    MAX_TRADES_IN_BUFFER, POLL_ENABLED, POLL_INTERVAL, PRO_TRADER_WINDOWS,
+    PUSH_INGEST_ENABLED, PUSH_INGEST_TOKEN, WS_LEGACY_ANALYTICS_MESSAGES, WS_LEGACY_TRADE_MESSAGES
+)
+from app.poller import Poller, parser_cache_stats, response_format_counts
+from app.push_ingest import PushIngestor
+from app.broadcast import ClientConnection, MessageBatcher, broadcast_text, encode_message
+from app.analytics_stream import AnalyticsStream
+from app.storage import Storage
 from app.alert_engine import AlertEngine
 from app.analytics_engine import AnalyticsEngine
+from app.trade_buffer import TradeBuffer
 from app.models import (
     Trade, Strategy, Alert, Analytics, CurveMetrics, FlowMetrics, RiskMetrics,
     RealTimeMetrics, CurrencyMetrics, StrategyMetrics, ProTraderMetrics, ProTraderDelta
@@ -61,8 +68,8 @@ app.add_middleware(
 # Global State Initialization
 # ============================================================================
 
-# Excel writer for continuous daily file logging
-excel_writer = ExcelWriter()
+# Trade storage (daily journal as system of record, Excel as export)
+storage = Storage()
 
 # Alert engine for EUR-based threshold alerts
 alert_engine = AlertEngine()
@@ -70,8 +77,9 @@ alert_engine = AlertEngine()
 # Analytics engine for advanced metrics calculation
 analytics_engine = AnalyticsEngine()
 
-# Memory buffer for trades (max 1000 trades, oldest removed when limit reached)
-trade_buffer: List[Trade] = []
+# Memory buffer for trades, ordered by execution time
+# (max MAX_TRADES_IN_BUFFER trades, oldest executions removed when limit reached)
+trade_buffer = TradeBuffer()
 
 # Track seen trade IDs to avoid duplicates (using dissemination_identifier)
 # This set persists across buffer cleanups to prevent re-processing
@@ -86,7 +94,13 @@ package_legs: dict[str, List[Trade]] = {}
 tracked_strategies: dict[str, Strategy] = {}
 
 # WebSocket connections for real-time updates
-active_connections: Set[WebSocket] = set()
+active_connections: Set[ClientConnection] = set()
+
+# New trades go out as one "new_trades" message per batch (see WS_TRADE_BATCH_DELAY)
+trade_batcher = MessageBatcher(active_connections, "new_trades")
+
+# Analytics go out as a versioned snapshot + patch stream (see app.analytics_stream)
+analytics_stream = AnalyticsStream()
 
 # Daily statistics for analytics
 daily_stats = {
@@ -102,37 +116,27 @@ daily_stats = {
 # Alert buffer for realtime metrics (last 1000 alerts)
 recent_alerts: List[Alert] = []
 
+# Internal API poller (started once the history is loaded)
+poller: Optional[Poller] = None
 
-def sanitize_for_json(obj):
-    """
-    Sanitize an object for JSON serialization by converting NaN and Inf to None.
-    
-    Args:
-        obj: Object to sanitize (dict, list, or primitive)
-        
-    Returns:
-        Sanitized object safe for JSON serialization
-    """
-    import math
-    
-    if isinstance(obj, dict):
-        return {k: sanitize_for_json(v) for k, v in obj.items()}
-    elif isinstance(obj, list):
-        return [sanitize_for_json(item) for item in obj]
-    elif isinstance(obj, float):
-        if math.isnan(obj) or math.isinf(obj):
-            return None
-        return obj
-    else:
-        return obj
+# Push ingestion queue (PUSH_INGEST_ENABLED; its consumer starts once the history is loaded)
+push_ingestor: Optional[PushIngestor] = None
+
+# Polled and pushed batches are processed one at a time
+ingest_lock = asyncio.Lock()
+
+# Startup history load progress ("pending" -> "loading" -> "ready")
+history_status = {"state": "pending", "rows_read": 0, "trades_loaded": 0}
 
 
 async def broadcast_message(message_type: str, data: dict):
     """
     Broadcast message to all connected WebSocket clients.
     
-    Sends a JSON message to all active WebSocket connections. Automatically
-    removes disconnected clients from the active_connections set.
+    Encodes the message once (see app.broadcast) and queues it for every
+    active connection; each client's writer task sends it, so this never
+    waits for a slow client. Automatically removes disconnected clients
+    from the active_connections set.
     
     Args:
         message_type: Type of message (e.g., "trade_update", "alert", "analytics_update")
@@ -142,25 +146,10 @@ async def broadcast_message(message_type: str, data: dict):
         Disconnected clients are automatically removed from active_connections
         to prevent memory leaks.
     """
-    # Sanitize data to remove NaN and Inf values
-    sanitized_data = sanitize_for_json(data)
-    
-    message = {
-        "type": message_type,
-        "data": sanitized_data,
-        "timestamp": datetime.utcnow().isoformat()
-    }
-    
-    disconnected = set()
-    for connection in active_connections:
-        try:
-            await connection.send_text(json.dumps(message, default=str))
-        except Exception as e:
-            logger.error(f"Error sending WebSocket message: {e}")
-            disconnected.add(connection)
-    
-    # Remove disconnected clients
-    active_connections.difference_update(disconnected)
+    # Encoded once for all clients, then queued for each of them
+    if not active_connections:
+        return
+    broadcast_text(active_connections, message_type, encode_message(message_type, data))
 
 
 async def handle_alert(alert: Alert):
@@ -182,38 +171,45 @@ async def handle_alert(alert: Alert):
     await broadcast_message("alert", alert.dict())
 
 
-async def process_trades(trades: List[Trade], strategies: List[Strategy] = None):
+async def process_trades(trades: List[Trade], strategies: List[Strategy] = None) -> int:
     """
-    Process new trades and strategies: write to Excel, generate alerts.
+    Process new trades and strategies: persist them, generate alerts.
     
     This is the main trade processing function called by the Poller whenever
     new trades and strategies are fetched from the internal API. It:
     1. Filters out duplicate trades (using dissemination_identifier)
     2. Adds trades to the memory buffer
-    3. Writes trades to Excel (via ExcelWriter)
+    3. Persists trades (via Storage)
     4. Processes pre-classified strategies from internal API
     5. Generates alerts (via AlertEngine, only for new trades)
     6. Updates daily statistics
-    7. Broadcasts updates via WebSocket
+    7. Broadcasts updates via WebSocket (new trades as one "new_trades" message,
+       plus one "package_updated" message per existing package that gained legs)
     
     Args:
         trades: List of new Trade objects from internal API
         strategies: List of pre-classified Strategy objects from internal API
         
+    Returns:
+        Number of new (not previously seen) trades, used by the Poller to
+        adapt its polling interval
+        
     Note:
         Only truly new trades (not in seen_trade_ids) trigger alerts to
         prevent duplicate notifications.
     """
-    global trade_buffer, daily_stats, seen_trade_ids, package_legs, tracked_strategies
+    global daily_stats, seen_trade_ids, package_legs, tracked_strategies
     
     if strategies is None:
         strategies = []
     
     if not trades:
-        return
+        return 0
     
     # Filter out duplicates using dissemination_identifier
     new_trades = []
+    # Packages that gained legs in this batch -> number of legs they had before
+    changed_packages: dict[str, int] = {}
     for trade in trades:
         trade_id = trade.dissemination_identifier
         if trade_id not in seen_trade_ids:
@@ -225,26 +221,13 @@ async def process_trades(trades: List[Trade], strategies: List[Strategy] = None)
                 package_key = trade.package_transaction_price
                 if package_key not in package_legs:
                     package_legs[package_key] = []
+                changed_packages.setdefault(package_key, len(package_legs[package_key]))
                 package_legs[package_key].append(trade)
         else:
             logger.debug(f"Skipping duplicate trade: {trade_id}")
     
     if not new_trades:
-        return
-    
-    # Add to buffer
-    trade_buffer.extend(new_trades)
-    
-    # Keep buffer size limited (also clean seen_trade_ids)
-    # But keep alerted_trade_ids to prevent re-alerting
-    if len(trade_buffer) > MAX_TRADES_IN_BUFFER:
-        # Remove old trade IDs from seen set
-        removed_trades = trade_buffer[:-MAX_TRADES_IN_BUFFER]
-        for old_trade in removed_trades:
-            seen_trade_ids.discard(old_trade.dissemination_identifier)
-            # Keep alerted_trade_ids even if trade is removed from buffer
-            # This prevents re-alerting if the same trade comes back
-        trade_buffer = trade_buffer[-MAX_TRADES_IN_BUFFER:]
+        return 0
     
     # Process each new trade
     for trade in new_trades:
@@ -259,8 +242,8 @@ async def process_trades(trades: List[Trade], strategies: List[Strategy] = None)
         if alert:
             logger.info(f"Generated alert for new trade: {trade.dissemination_identifier}")
         
-        # Write to Excel
-        excel_writer.append_trade(trade)
+        # Persist
+        storage.append_trade(trade)
         
         # Update daily stats
         daily_stats["total_trades"] += 1
@@ -281,6 +264,21 @@ async def process_trades(trades: List[Trade], strategies: List[Strategy] = None)
         daily_stats["trades_per_hour"][hour_key] = \
             daily_stats["trades_per_hour"].get(hour_key, 0) + 1
     
+    # Add to buffer once EUR notionals are resolved (the aggregates record them)
+    trade_buffer.extend(new_trades)
+    analytics_engine.add_trades(new_trades)
+    
+    # Keep buffer size limited (also clean seen_trade_ids)
+    # But keep alerted_trade_ids to prevent re-alerting
+    removed_trades = trade_buffer.trim(MAX_TRADES_IN_BUFFER)
+    if removed_trades:
+        # Remove old trade IDs from seen set
+        for old_trade in removed_trades:
+            seen_trade_ids.discard(old_trade.dissemination_identifier)
+            # Keep alerted_trade_ids even if trade is removed from buffer
+            # This prevents re-alerting if the same trade comes back
+        analytics_engine.remove_trades(removed_trades)
+    
     # Process pre-classified strategies from internal API
     # Track existing strategy IDs before processing new ones
     existing_strategy_ids_before = set(tracked_strategies.keys())
@@ -288,16 +286,15 @@ async def process_trades(trades: List[Trade], strategies: List[Strategy] = None)
     for strategy in strategies:
         # Assign strategy IDs to trades
         for trade_id in strategy.legs:
-            for trade in trade_buffer:
-                if trade.dissemination_identifier == trade_id:
-                    trade.strategy_id = strategy.strategy_id
-                    break
+            trade = trade_buffer.get(trade_id)
+            if trade:
+                trade.strategy_id = strategy.strategy_id
         
         # Store strategy
         tracked_strategies[strategy.strategy_id] = strategy
         
-        # Write strategy to Excel
-        excel_writer.update_strategy(strategy)
+        # Persist strategy
+        storage.update_strategy(strategy)
         
         # Generate strategy alert (only for new strategies)
         is_new_strategy = strategy.strategy_id not in existing_strategy_ids_before
@@ -314,47 +311,65 @@ async def process_trades(trades: List[Trade], strategies: List[Strategy] = None)
     # Check volume trend (only for new trades)
     await alert_engine.check_volume_trend(new_trades, only_new_trades=True)
     
-    # Broadcast new trades (with package legs if applicable)
-    for trade in new_trades:
-        trade_dict = trade.dict()
-        
-        # Add package legs if this is a package trade
-        if trade.package_indicator and trade.package_transaction_price:
-            package_key = trade.package_transaction_price
-            if package_key in package_legs:
-                trade_dict["package_legs"] = [leg.dict() for leg in package_legs[package_key]]
-                trade_dict["package_legs_count"] = len(package_legs[package_key])
+    # Broadcast new trades (with package legs if applicable), in one message
+    if active_connections:
+        # Leg dicts of each changed package, built once for all its trades
+        package_leg_dicts = {
+            package_key: [leg.dict() for leg in package_legs[package_key]]
+            for package_key in changed_packages
+        }
         
-        await broadcast_message("new_trade", trade_dict)
-    
-    # Also update existing trades in buffer that belong to the same package
-    # But don't generate alerts for these updates
-    for trade in trade_buffer:
-        # Skip if this trade was just added (already processed)
-        if trade in new_trades:
-            continue
+        trade_dicts = []
+        for trade in new_trades:
+            trade_dict = trade.dict()
             
-        trade_dict = trade.dict()
-        updated = False
+            # Add package legs if this is a package trade
+            if trade.package_indicator and trade.package_transaction_price:
+                package_key = trade.package_transaction_price
+                if package_key in package_leg_dicts:
+                    trade_dict["package_legs"] = package_leg_dicts[package_key]
+                    trade_dict["package_legs_count"] = len(package_leg_dicts[package_key])
+            
+            trade_dicts.append(trade_dict)
         
-        # Update package legs
-        if trade.package_indicator and trade.package_transaction_price:
-            package_key = trade.package_transaction_price
-            if package_key in package_legs:
-                trade_dict["package_legs"] = [leg.dict() for leg in package_legs[package_key]]
-                trade_dict["package_legs_count"] = len(package_legs[package_key])
-                updated = True
+        if WS_LEGACY_TRADE_MESSAGES:
+            for trade_dict in trade_dicts:
+                await broadcast_message("new_trade", trade_dict)
+        else:
+            trade_batcher.add(trade_dicts)
         
-        if updated:
-            await broadcast_message("trade_updated", trade_dict)
+        # Packages that already had legs before this batch: clients hold those
+        # legs with the previous package, so send the new package once (the
+        # new legs already carry it). Packages that did not change are not sent.
+        for package_key, previous_count in changed_packages.items():
+            if previous_count == 0:
+                continue
+            legs = package_legs[package_key]
+            leg_dicts = package_leg_dicts[package_key]
+            if WS_LEGACY_TRADE_MESSAGES:
+                # Legacy clients update each existing leg from a trade_updated message
+                for leg_dict in leg_dicts[:previous_count]:
+                    await broadcast_message("trade_updated", {
+                        **leg_dict, "package_legs": leg_dicts, "package_legs_count": len(leg_dicts)
+                    })
+            else:
+                await broadcast_message("package_updated", {
+                    "package_key": package_key,
+                    "parent_trade_id": legs[0].dissemination_identifier,
+                    "added_leg_ids": [leg.dissemination_identifier for leg in legs[previous_count:]],
+                    "legs": leg_dicts,
+                    "legs_count": len(leg_dicts)
+                })
     
     # Update analytics periodically
     await update_analytics()
+    
+    return len(new_trades)
 
 
 async def update_analytics():
-    """Update and broadcast analytics with advanced metrics."""
-    global daily_stats, trade_buffer, recent_alerts
+    """Update and broadcast analytics with advanced metrics (as a patch of what changed, see app.analytics_stream)."""
+    global daily_stats, recent_alerts
     
     # Calculate top underlyings
     top_underlyings = sorted(
@@ -383,15 +398,15 @@ async def update_analytics():
         avg_size = daily_stats["total_notional_eur"] / daily_stats["total_trades"]
     
     # Calculate advanced metrics using analytics engine
+    # Buffer-wide metrics come from the engine's incremental aggregates
     try:
-        curve_metrics_dict = analytics_engine.calculate_curve_metrics(trade_buffer)
-        flow_metrics_dict = analytics_engine.calculate_flow_metrics(trade_buffer)
+        curve_metrics_dict = analytics_engine.calculate_curve_metrics()
+        flow_metrics_dict = analytics_engine.calculate_flow_metrics()
         risk_metrics_dict = analytics_engine.calculate_risk_metrics(trade_buffer)
         realtime_metrics_dict = analytics_engine.calculate_realtime_metrics(trade_buffer, recent_alerts)
-        currency_metrics_dict = analytics_engine.calculate_currency_metrics(trade_buffer)
+        currency_metrics_dict = analytics_engine.calculate_currency_metrics()
         strategy_metrics_dict = analytics_engine.calculate_strategy_metrics(
-            list(tracked_strategies.values()),
-            trade_buffer
+            list(tracked_strategies.values())
         )
         
         # Create metric objects
@@ -416,18 +431,20 @@ async def update_analytics():
     pro_trader_deltas = None
     
     try:
-        # Load historical data (placeholder - would need actual implementation)
-        historical_30d = analytics_engine.load_historical_trades(30)
-        historical_90d = analytics_engine.load_historical_trades(90)
+        # Historical context from the per-day summary index; a new day file
+        # is summarized once, in a worker thread (past files can be large)
+        loop = asyncio.get_running_loop()
+        historical_30d = await loop.run_in_executor(None, analytics_engine.load_historical_summary, 30)
+        historical_90d = await loop.run_in_executor(None, analytics_engine.load_historical_summary, 90)
         
-        # Calculate metrics for all time windows
-        for window in [10, 15, 20, 30, 60]:
-            metrics = analytics_engine.calculate_pro_trader_metrics(
-                trade_buffer,
-                window,
-                historical_30d,
-                historical_90d
-            )
+        # Calculate metrics for all time windows in a single pass
+        metrics_by_window = analytics_engine.calculate_pro_trader_metrics_multi(
+            trade_buffer,
+            PRO_TRADER_WINDOWS,
+            historical_30d,
+            historical_90d
+        )
+        for window, metrics in metrics_by_window.items():
             pro_trader_metrics[f"{window}min"] = metrics
         
         # Calculate deltas (10min vs 1h)
@@ -459,7 +476,7 @@ async def update_analytics():
     )
     
     # Write to Excel
-    excel_writer.update_analytics(analytics)
+    storage.update_analytics(analytics)
     
     # Broadcast analytics with pro trader metrics
     analytics_dict = analytics.dict()
@@ -467,58 +484,91 @@ async def update_analytics():
     if pro_trader_deltas:
         analytics_dict["pro_trader_deltas"] = pro_trader_deltas
     
-    await broadcast_message("analytics_update", analytics_dict)
+    if WS_LEGACY_ANALYTICS_MESSAGES:
+        await broadcast_message("analytics_update", analytics_dict)
+        return
+    
+    # Only what changed since the previous version (or a periodic snapshot)
+    message = analytics_stream.update(analytics_dict)
+    if message is not None and active_connections:
+        message_type, text = message
+        broadcast_text(active_connections, message_type, text)
 
 
-@app.on_event("startup")
-async def startup():
-    """Startup event: initialize poller and load trades from Excel."""
-    global trade_buffer, seen_trade_ids, package_legs, daily_stats
+def restore_loaded_trades(loaded_trades: List[Trade]):
+    """Rebuild in-memory state (buffer, seen IDs, package legs, daily stats) from loaded trades."""
+    # Add loaded trades to buffer
+    trade_buffer.extend(loaded_trades)
+    analytics_engine.add_trades(loaded_trades)
     
-    logger.info("Starting IRS monitoring application...")
-    
-    # Load trades from Excel file (today's file)
-    logger.info("Loading trades from Excel file...")
-    loaded_trades = excel_writer.load_trades_from_excel()
-    
-    if loaded_trades:
-        # Add loaded trades to buffer
-        trade_buffer.extend(loaded_trades)
+    # Mark all loaded trades as seen (to avoid duplicates)
+    for trade in loaded_trades:
+        seen_trade_ids.add(trade.dissemination_identifier)
         
-        # Mark all loaded trades as seen (to avoid duplicates)
-        for trade in loaded_trades:
-            seen_trade_ids.add(trade.dissemination_identifier)
-            
-            # Track package legs
-            if trade.package_indicator and trade.package_transaction_price:
-                package_key = trade.package_transaction_price
-                if package_key not in package_legs:
-                    package_legs[package_key] = []
-                package_legs[package_key].append(trade)
-            
-            # Update daily stats
-            daily_stats["total_trades"] += 1
-            if trade.notional_eur:
-                daily_stats["total_notional_eur"] += trade.notional_eur
-                daily_stats["largest_trade_eur"] = max(
-                    daily_stats["largest_trade_eur"],
-                    trade.notional_eur
-                )
-                
-                # Update underlying volumes
-                underlying = trade.unique_product_identifier_underlier_name or "Unknown"
-                daily_stats["underlying_volumes"][underlying] = \
-                    daily_stats["underlying_volumes"].get(underlying, 0.0) + trade.notional_eur
+        # Track package legs
+        if trade.package_indicator and trade.package_transaction_price:
+            package_key = trade.package_transaction_price
+            if package_key not in package_legs:
+                package_legs[package_key] = []
+            package_legs[package_key].append(trade)
+        
+        # Update daily stats
+        daily_stats["total_trades"] += 1
+        if trade.notional_eur:
+            daily_stats["total_notional_eur"] += trade.notional_eur
+            daily_stats["largest_trade_eur"] = max(
+                daily_stats["largest_trade_eur"],
+                trade.notional_eur
+            )
             
-            # Update trades per hour
-            hour_key = trade.execution_timestamp.strftime("%Y-%m-%d %H:00")
-            daily_stats["trades_per_hour"][hour_key] = \
-                daily_stats["trades_per_hour"].get(hour_key, 0) + 1
+            # Update underlying volumes
+            underlying = trade.unique_product_identifier_underlier_name or "Unknown"
+            daily_stats["underlying_volumes"][underlying] = \
+                daily_stats["underlying_volumes"].get(underlying, 0.0) + trade.notional_eur
         
-        logger.info(f"Loaded {len(loaded_trades)} trades from Excel into buffer")
+        # Update trades per hour
+        hour_key = trade.execution_timestamp.strftime("%Y-%m-%d %H:00")
+        daily_stats["trades_per_hour"][hour_key] = \
+            daily_stats["trades_per_hour"].get(hour_key, 0) + 1
+
+
+async def process_batch(trades: List[Trade], strategies: List[Strategy]) -> int:
+    """
+    Process a polled or pushed batch (callback of the Poller and PushIngestor).
     
-    # Set alert callback
-    alert_engine.set_callback(handle_alert)
+    Batches from all sources are serialized by ingest_lock, so they form a
+    single stream in which already seen trades are dropped as duplicates.
+    """
+    async with ingest_lock:
+        return await process_trades(trades, strategies)
+
+
+async def load_history():
+    """
+    Load today's trades in a worker thread, then start polling and push ingestion.
+    
+    Runs as a background task so the app serves HTTP and WebSocket clients
+    while the history loads. The poller and the push consumer only start
+    once loading is done, so that already-persisted trades are recognized as
+    seen and not re-alerted.
+    """
+    global poller
+    
+    def report_progress(rows_read: int):
+        history_status["rows_read"] = rows_read
+    
+    history_status["state"] = "loading"
+    logger.info("Loading trades from storage...")
+    loop = asyncio.get_running_loop()
+    try:
+        loaded_trades = await loop.run_in_executor(None, storage.load_trades, report_progress)
+    except Exception as e:
+        logger.error(f"Error loading trades from storage: {e}", exc_info=True)
+        loaded_trades = []
+    
+    if loaded_trades:
+        restore_loaded_trades(loaded_trades)
+        logger.info(f"Loaded {len(loaded_trades)} trades from storage into buffer")
     
     # Mark all existing trades in buffer as already alerted
     # This prevents alerts for trades that were already loaded
@@ -526,72 +576,135 @@ async def startup():
         alert_engine.alerted_trade_ids.add(trade.dissemination_identifier)
     logger.info(f"Marked {len(trade_buffer)} existing trades as already alerted")
     
+    history_status["state"] = "ready"
+    history_status["trades_loaded"] = len(loaded_trades)
+    
+    # Clients that connected while loading got an empty snapshot
+    if loaded_trades and active_connections:
+        await broadcast_message("initial_state", build_initial_state())
+    
+    # Start consuming pushed trades (queued while the history loaded)
+    if push_ingestor is not None:
+        push_ingestor.start()
+    
     # Start poller in background
-    # Create wrapper function to match Poller callback signature
-    async def process_data(trades: List[Trade], strategies: List[Strategy]):
-        await process_trades(trades, strategies)
+    if POLL_ENABLED:
+        poller = Poller(process_batch)
+        poller.start()
+        logger.info("Poller started")
+
+
+@app.on_event("startup")
+async def startup():
+    """Startup event: start loading today's trades (the poller starts once they are loaded)."""
+    global push_ingestor
+    logger.info("Starting IRS monitoring application...")
     
-    poller = Poller(process_data)
-    poller.running = True
-    asyncio.create_task(poller._poll_with_retry())
+    # Pushed items are queued from now on, and processed once the history is loaded
+    if PUSH_INGEST_ENABLED and not PUSH_INGEST_TOKEN:
+        # Pushed trades reach alerts, storage and every client: never accept them anonymously
+        logger.error("PUSH_INGEST_ENABLED is set without PUSH_INGEST_TOKEN: push ingestion stays disabled")
+    elif PUSH_INGEST_ENABLED:
+        push_ingestor = PushIngestor.create(process_batch)
+    
+    # Set alert callback
+    alert_engine.set_callback(handle_alert)
+    
+    # Load history in the background so WebSocket clients can connect meanwhile
+    asyncio.create_task(load_history())
     
     logger.info("Application started")
 
 
+@app.on_event("shutdown")
+async def shutdown():
+    """Shutdown event: stop polling and push ingestion, close HTTP clients, flush and close storage."""
+    logger.info("Shutting down IRS monitoring application...")
+    if poller is not None:
+        await poller.aclose()
+    if push_ingestor is not None:
+        await push_ingestor.stop()
+    await alert_engine.aclose()
+    await asyncio.get_running_loop().run_in_executor(None, storage.close)
+
+
+def build_initial_state() -> dict:
+    """Build the initial_state payload: last 100 trades (with package legs), strategies, summary analytics."""
+    initial_trades = []
+    for trade in trade_buffer[-100:]:  # Last 100 trades
+        trade_dict = trade.dict()
+        # Add package legs if this is a package trade
+        if trade.package_indicator and trade.package_transaction_price:
+            package_key = trade.package_transaction_price
+            if package_key in package_legs:
+                trade_dict["package_legs"] = [leg.dict() for leg in package_legs[package_key]]
+                trade_dict["package_legs_count"] = len(package_legs[package_key])
+        
+        initial_trades.append(trade_dict)
+    
+    return {
+        "trades": initial_trades,
+        "strategies": [s.dict() for s in tracked_strategies.values()],
+        "analytics": Analytics(
+            total_trades=daily_stats["total_trades"],
+            total_notional_eur=daily_stats["total_notional_eur"],
+            avg_size_eur=daily_stats["total_notional_eur"] / max(daily_stats["total_trades"], 1),
+            largest_trade_eur=daily_stats["largest_trade_eur"],
+            strategies_count=daily_stats["strategies_count"],
+            top_underlyings=[],
+            trades_per_hour=[],
+            strategy_distribution=[]
+        ).dict()
+    }
+
+
+def send_analytics_snapshot(client: ClientConnection):
+    """Queue the current analytics snapshot for one client (nothing before the first analytics update)."""
+    if WS_LEGACY_ANALYTICS_MESSAGES:
+        return
+    text = analytics_stream.snapshot_message()
+    if text is not None:
+        client.enqueue(AnalyticsStream.SNAPSHOT_TYPE, text)
+
+
 @app.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
     """WebSocket endpoint for real-time updates."""
     await websocket.accept()
-    active_connections.add(websocket)
-    logger.info(f"WebSocket client connected. Total: {len(active_connections)}")
+    client = ClientConnection(websocket, resync=analytics_stream.snapshot_message)
+    client.start()
     
     try:
         # Mark all existing trades as already alerted to prevent alerts on initial load
         for trade in trade_buffer:
             alert_engine.alerted_trade_ids.add(trade.dissemination_identifier)
         
-        # Send initial state with package legs
-        initial_trades = []
-        for trade in trade_buffer[-100:]:  # Last 100 trades
-            trade_dict = trade.dict()
-            # Add package legs if this is a package trade
-            if trade.package_indicator and trade.package_transaction_price:
-                package_key = trade.package_transaction_price
-                if package_key in package_legs:
-                    trade_dict["package_legs"] = [leg.dict() for leg in package_legs[package_key]]
-                    trade_dict["package_legs_count"] = len(package_legs[package_key])
-            
-            initial_trades.append(trade_dict)
-        
-        await websocket.send_text(json.dumps({
-            "type": "initial_state",
-            "data": {
-                "trades": initial_trades,
-                "strategies": [s.dict() for s in tracked_strategies.values()],
-                "analytics": Analytics(
-                    total_trades=daily_stats["total_trades"],
-                    total_notional_eur=daily_stats["total_notional_eur"],
-                    avg_size_eur=daily_stats["total_notional_eur"] / max(daily_stats["total_trades"], 1),
-                    largest_trade_eur=daily_stats["largest_trade_eur"],
-                    strategies_count=daily_stats["strategies_count"],
-                    top_underlyings=[],
-                    trades_per_hour=[],
-                    strategy_distribution=[]
-                ).dict()
-            }
-        }, default=str))
+        # Send initial state with package legs (queued before the client
+        # receives any broadcast, so it always comes first)
+        client.enqueue("initial_state", encode_message("initial_state", build_initial_state()))
+        send_analytics_snapshot(client)
+        active_connections.add(client)
+        logger.info(f"WebSocket client connected. Total: {len(active_connections)}")
         
-        # Keep connection alive
+        # Keep connection alive and answer client requests
         while True:
             try:
                 data = await websocket.receive_text()
-                # Echo back or handle client messages if needed
             except WebSocketDisconnect:
                 break
-    except WebSocketDisconnect:
+            try:
+                request = json.loads(data)
+            except ValueError:
+                continue
+            if isinstance(request, dict) and request.get("type") == "resync":
+                # The client missed an analytics patch (version gap)
+                send_analytics_snapshot(client)
+    except (WebSocketDisconnect, RuntimeError):
+        # RuntimeError: the server already closed a client that fell too far behind
         pass
     finally:
-        active_connections.discard(websocket)
+        active_connections.discard(client)
+        await client.close()
         logger.info(f"WebSocket client disconnected. Total: {len(active_connections)}")
 
 
@@ -601,10 +714,110 @@ async def root():
     return {
         "status": "running",
         "trades_in_buffer": len(trade_buffer),
-        "active_connections": len(active_connections)
+        "active_connections": len(active_connections),
+        "history": history_status
+    }
+
+
+@app.get("/metrics")
+async def metrics():
+    """Operational metrics (polling cadence, push queue, WebSocket client lag, trade batching and analytics stream, response formats, parser caches)."""
+    return {
+        "poller": poller.metrics() if poller is not None else None,
+        "push_ingest": push_ingestor.metrics() if push_ingestor is not None else None,
+        "websocket_clients": [client.metrics() for client in active_connections],
+        "trade_broadcast": trade_batcher.metrics(),
+        "analytics_stream": analytics_stream.metrics(),
+        "response_formats": dict(response_format_counts),
+        "parser_caches": parser_cache_stats()
     }
 
 
+def check_push_access(authorization: Optional[str]):
+    """Reject push ingestion when it is disabled or the bearer token does not match."""
+    if push_ingestor is None:
+        raise HTTPException(status_code=404, detail="Push ingestion is disabled")
+    # Constant-time comparison, so response times do not leak the token
+    expected = f"Bearer {PUSH_INGEST_TOKEN}".encode()
+    if not hmac.compare_digest((authorization or "").encode(), expected):
+        raise HTTPException(status_code=401, detail="Invalid or missing push ingestion token")
+
+
+@app.post("/ingest", status_code=202)
+async def ingest(request: Request):
+    """
+    Push ingestion: queue a list of response items (or a single item).
+    
+    Items use the internal API response format. The whole request is
+    rejected with 429 when the queue cannot take it; retry after the
+    Retry-After delay. A request with more items than the queue can ever
+    hold is rejected with 413: split it.
+    """
+    check_push_access(request.headers.get("Authorization"))
+    try:
+        payload = await request.json()
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Request body is not valid JSON")
+    items = payload if isinstance(payload, list) else [payload]
+    
+    if len(items) > push_ingestor.queue.maxsize:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Too many items in one request ({len(items)}, max {push_ingestor.queue.maxsize}), split it"
+        )
+    if not push_ingestor.offer(items):
+        raise HTTPException(
+            status_code=429,
+            detail="Ingest queue full, retry later",
+            headers={"Retry-After": "1"}
+        )
+    return {"accepted": len(items), "queued": push_ingestor.queue.qsize()}
+
+
+@app.websocket("/ingest/ws")
+async def ingest_websocket(websocket: WebSocket):
+    """
+    Push ingestion over a persistent WebSocket.
+    
+    Each text message is a list of response items (or a single item) and is
+    acknowledged with {"type": "ack", "accepted": n}. When the queue is full
+    the server stops reading until there is room, which pushes back on the
+    sender. The token can be given as Authorization header or ?token=.
+    """
+    token = websocket.query_params.get("token")
+    authorization = websocket.headers.get("Authorization") or (f"Bearer {token}" if token else None)
+    try:
+        check_push_access(authorization)
+    except HTTPException as e:
+        await websocket.close(code=1008, reason=e.detail)
+        return
+    
+    await websocket.accept()
+    logger.info("Push ingestion WebSocket connected")
+    try:
+        while True:
+            message = await websocket.receive_text()
+            try:
+                payload = json.loads(message)
+            except ValueError:
+                await websocket.send_json({"type": "error", "detail": "Message is not valid JSON"})
+                continue
+            items = payload if isinstance(payload, list) else [payload]
+            await push_ingestor.put(items)
+            await websocket.send_json({"type": "ack", "accepted": len(items)})
+    except WebSocketDisconnect:
+        pass
+    finally:
+        logger.info("Push ingestion WebSocket disconnected")
+
+
+@app.post("/export/excel")
+async def export_excel():
+    """Save the Excel export of today's trades now instead of at the next interval."""
+    storage.export_excel()
+    return {"status": "export requested", "backend": storage.backend}
+
+
 @app.get("/health")
 async def health():
     """Health check endpoint."""
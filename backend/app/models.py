@@ -14,8 +14,8 @@ All models use Pydantic BaseModel for automatic validation and JSON serializatio
 """
 
 from datetime import datetime
-from typing import Optional, List, Dict, Any, Union
-from pydantic import BaseModel, Field, validator
+from typing import Optional, List, Dict, Any, Tuple, Union
+from pydantic import BaseModel, Field, TypeAdapter, ValidationError, validator
 import math
 
 
@@ -251,6 +251,10 @@ class Trade(BaseModel):
         strategy_id: Detected strategy ID (if part of a multi-leg strategy)
         notional_eur: Notional amount converted to EUR
         instrument: Instrument (maturity of swap, e.g., "10Y", "5Y10Y", "30Y")
+        reported_timestamp: When the source reported the trade (leg eventTime,
+                            else the parsed execution time; None when the
+                            source gave no usable time). Drives the incremental
+                            polling mark; never serialized
     """
     dissemination_identifier: str
     original_dissemination_identifier: Optional[str] = None
@@ -296,12 +300,47 @@ class Trade(BaseModel):
     notional_eur: Optional[float] = None
     instrument: Optional[str] = None  # e.g., "10Y", "5Y10Y", "30Y"
     
+    # Polling metadata (excluded from dict()/JSON, so not journaled nor broadcast)
+    reported_timestamp: Optional[datetime] = Field(default=None, exclude=True)
+    
     class Config:
         json_encoders = {
             datetime: lambda v: v.isoformat()
         }
 
 
+_trade_list_adapter = TypeAdapter(List[Trade])
+
+
+def validate_trades(records: List[Dict[str, Any]]) -> Tuple[List[Trade], List[Tuple[int, Exception]]]:
+    """
+    Validate a batch of trade dicts into Trade objects.
+    
+    The whole batch is validated in a single call, which is much cheaper than
+    one Trade(**record) per row. If any record is invalid, the batch is
+    validated record by record so that only the bad ones are dropped.
+    
+    Args:
+        records: Trade field dicts
+        
+    Returns:
+        Tuple of (valid trades in input order, [(record index, error)])
+    """
+    try:
+        return _trade_list_adapter.validate_python(records), []
+    except ValidationError:
+        pass
+    
+    trades = []
+    errors = []
+    for index, record in enumerate(records):
+        try:
+            trades.append(Trade(**record))
+        except Exception as e:
+            errors.append((index, e))
+    return trades, errors
+
+
 class Strategy(BaseModel):
     """
     Strategy model for multi-leg Interest Rate Swap strategies.
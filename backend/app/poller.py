@@ -5,24 +5,54 @@ This module handles polling the internal API for Interest Rate Swap trade data
 with pre-classified strategies. It includes:
 - API polling with exponential backoff retry logic
 - Trade data normalization and parsing from internal API format
-- Conversion from internal API response to Trade and Strategy models
+- Conversion from internal API response to Trade and Strategy models, with the
+  response format detected per item (pluggable via register_response_format)
 
 The module polls the internal API at regular intervals and normalizes raw trade data
-into the application's Trade and Strategy model formats.
+into the application's Trade and Strategy model formats. Polls are incremental
+where the server allows it (see PollCursor): only data newer than the latest
+trade seen is requested, and unchanged responses are skipped via ETag /
+Last-Modified, with a periodic full fetch as a safety net. Decoding and
+conversion of the responses run in a worker pool (INGEST_EXECUTOR) so that
+large responses do not stall the event loop.
 """
 
 import asyncio
+import json
 import logging
-from datetime import datetime
-from typing import List, Dict, Any, Optional, Tuple
+import math
+import random
+import time
+from collections import Counter
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import date, datetime, time as dt_time, timezone
+from functools import lru_cache
+from typing import List, Dict, Any, AsyncIterator, Callable, Optional, Tuple
 from dateutil import parser
 import httpx
-from app.config import INTERNAL_API_URL, INTERNAL_API_HEADERS, INTERNAL_API_TOKEN, POLL_INTERVAL
+from app.config import (
+    INTERNAL_API_URL, INTERNAL_API_HEADERS, INTERNAL_API_TOKEN, POLL_INTERVAL,
+    POLL_INTERVAL_MIN, POLL_INTERVAL_MAX, POLL_SPEEDUP_FACTOR, POLL_SLOWDOWN_FACTOR, POLL_JITTER,
+    INTERNAL_API_SINCE_PARAM, INTERNAL_API_SINCE_OVERLAP, INTERNAL_API_FULL_RESYNC_INTERVAL,
+    INTERNAL_API_SINCE_IGNORED_POLLS, INTERNAL_API_BATCH_SIZE, INGEST_STRICT_VALIDATION, PARSE_CACHE_SIZE,
+    INGEST_EXECUTOR, INGEST_WORKERS, INGEST_CHUNK_SIZE, INTERNAL_API_SOURCES, HTTP_TIMEOUT
+)
+from app.http_client import create_http_client
+from app.json_stream import JSONArrayDecoder
+from app.trade_buffer import to_epoch
 from app.models import Trade, Strategy, InternalAPIResponse, Leg, StrategyAPIResponse, LegAPI
 
 logger = logging.getLogger(__name__)
 
 
+# Multipliers of abbreviated notionals ("20M", "2B", "150K")
+NOTIONAL_MULTIPLIERS = {"K": 1_000, "M": 1_000_000, "B": 1_000_000_000}
+
+# Strings the API uses for missing values (compared lowercase)
+_NULL_STRINGS = ("nan", "none", "null", "")
+
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
 def parse_notional(notional_str) -> float:
     """
     Parse notional string to float, handling various formats.
@@ -65,23 +95,39 @@ def parse_notional(notional_str) -> float:
     
     try:
         # Check for abbreviated formats (M = millions, B = billions, K = thousands)
-        multiplier = 1.0
-        if cleaned.endswith('B'):
-            multiplier = 1_000_000_000
-            cleaned = cleaned[:-1]
-        elif cleaned.endswith('M'):
-            multiplier = 1_000_000
-            cleaned = cleaned[:-1]
-        elif cleaned.endswith('K'):
-            multiplier = 1_000
-            cleaned = cleaned[:-1]
-        
-        return float(cleaned) * multiplier
+        multiplier = NOTIONAL_MULTIPLIERS.get(cleaned[-1])
+        if multiplier is not None:
+            return float(cleaned[:-1]) * multiplier
+        return float(cleaned)
     except (ValueError, TypeError):
         logger.warning(f"Could not parse notional: {notional_str}")
         return 0.0
 
 
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def parse_notional_text(notional_str: str) -> Optional[float]:
+    """
+    Parse a notional string the way the API model validators do.
+    
+    Unlike parse_notional, missing or unparseable values ("nan", "", "n/a")
+    give None rather than 0.0.
+    
+    Args:
+        notional_str: Notional as string (e.g., "20M", "2B", "650,000,000+")
+        
+    Returns:
+        Parsed notional as float, or None
+    """
+    cleaned = notional_str.strip().upper().replace(",", "").replace(" ", "").rstrip("+")
+    if cleaned.lower() in _NULL_STRINGS:
+        return None
+    multiplier = NOTIONAL_MULTIPLIERS.get(cleaned[-1])
+    try:
+        return float(cleaned[:-1]) * multiplier if multiplier else float(cleaned)
+    except ValueError:
+        return None
+
+
 def parse_rate(rate_str: str) -> Optional[float]:
     """
     Parse rate string to float.
@@ -100,6 +146,7 @@ def parse_rate(rate_str: str) -> Optional[float]:
         return None
 
 
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
 def parse_date(date_str: str) -> Optional[datetime]:
     """
     Parse ISO date string to datetime object.
@@ -121,6 +168,84 @@ def parse_date(date_str: str) -> Optional[datetime]:
         return None
 
 
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def parse_effective_date(date_str: str) -> datetime:
+    """
+    Parse an ISO 8601 effective/expiration date.
+    
+    datetime.fromisoformat handles the usual forms; other ISO variants go
+    through dateutil's isoparse.
+    
+    Args:
+        date_str: ISO format date string (e.g., "2024-01-17")
+        
+    Returns:
+        Parsed datetime object
+        
+    Raises:
+        ValueError: If the string is not an ISO 8601 date
+    """
+    try:
+        return datetime.fromisoformat(date_str)
+    except ValueError:
+        return parser.isoparse(date_str)
+
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def is_forward_start(effective_date_str: str, today: date) -> bool:
+    """
+    Whether a swap with this effective date is forward-starting as of `today`.
+    
+    A swap is forward-starting when it becomes effective more than 2 days
+    after the trade. Days are counted from the end of `today`, which for
+    date-only effective dates gives the same result as counting from the
+    current time at any moment of the day, so the answer can be cached per day.
+    
+    Args:
+        effective_date_str: ISO format effective date
+        today: Current UTC date
+        
+    Returns:
+        True if the swap is forward-starting
+        
+    Raises:
+        ValueError: If the effective date cannot be parsed
+    """
+    effective_date = parse_effective_date(effective_date_str).replace(tzinfo=None)
+    return (effective_date - datetime.combine(today, dt_time.max)).days > 2
+
+
+# Memoized parsers reported by parser_cache_stats()
+_CACHED_PARSERS = {
+    "parse_date": parse_date,
+    "parse_effective_date": parse_effective_date,
+    "is_forward_start": is_forward_start,
+    "parse_notional": parse_notional,
+    "parse_notional_text": parse_notional_text,
+}
+
+
+def parser_cache_stats() -> Dict[str, Dict[str, Any]]:
+    """
+    Hit/miss counters of the memoized parsers.
+    
+    Returns:
+        Dict of parser name -> {"hits", "misses", "size", "max_size", "hit_rate"}
+    """
+    stats = {}
+    for name, cached_parser in _CACHED_PARSERS.items():
+        info = cached_parser.cache_info()
+        lookups = info.hits + info.misses
+        stats[name] = {
+            "hits": info.hits,
+            "misses": info.misses,
+            "size": info.currsize,
+            "max_size": info.maxsize,
+            "hit_rate": round(info.hits / lookups, 4) if lookups else None,
+        }
+    return stats
+
+
 def normalize_leg_api_to_trade(leg: LegAPI, strategy_id: str, execution_datetime: Optional[str] = None, instrument: Optional[str] = None) -> Optional[Trade]:
     """
     Convert a LegAPI from new API to a Trade model.
@@ -153,18 +278,15 @@ def normalize_leg_api_to_trade(leg: LegAPI, strategy_id: str, execution_datetime
         
         if effective_date_str:
             try:
-                effective_date_dt = parser.isoparse(effective_date_str)
-                now = datetime.utcnow()
-                if effective_date_dt.tzinfo:
-                    effective_date_dt_naive = effective_date_dt.replace(tzinfo=None)
-                else:
-                    effective_date_dt_naive = effective_date_dt
-                days_diff = (effective_date_dt_naive - now).days
-                is_forward = days_diff > 2
+                effective_date_dt = parse_effective_date(effective_date_str)
+                is_forward = is_forward_start(effective_date_str, datetime.utcnow().date())
             except Exception as e:
                 logger.warning(f"Error parsing effectiveDate: {e}")
         
-        execution_timestamp = parse_date(execution_timestamp_str) or datetime.utcnow()
+        parsed_execution_timestamp = parse_date(execution_timestamp_str)
+        execution_timestamp = parsed_execution_timestamp or datetime.utcnow()
+        # The polling mark follows the report time, never the utcnow fallback
+        reported_timestamp = parse_date(leg.eventTime) or parsed_execution_timestamp
         
         # Extract notional - use leg1, fallback to leg2
         # Parse string formats if needed (already handled by validator, but ensure it's a number)
@@ -232,6 +354,7 @@ def normalize_leg_api_to_trade(leg: LegAPI, strategy_id: str, execution_datetime
             strategy_id=strategy_id,
             notional_eur=notional_leg1 if notional_currency_leg1 == "EUR" else None,  # Simplified
             instrument=instrument,  # Passed from strategy level
+            reported_timestamp=reported_timestamp,
             is_forward=is_forward
         )
     except Exception as e:
@@ -270,18 +393,13 @@ def normalize_leg_to_trade(leg: Leg, strategy_id: Optional[str] = None, date_str
         
         if effective_date_str:
             try:
-                effective_date_dt = parser.isoparse(effective_date_str)
-                now = datetime.utcnow()
-                if effective_date_dt.tzinfo:
-                    effective_date_dt_naive = effective_date_dt.replace(tzinfo=None)
-                else:
-                    effective_date_dt_naive = effective_date_dt
-                days_diff = (effective_date_dt_naive - now).days
-                is_forward = days_diff > 2
+                effective_date_dt = parse_effective_date(effective_date_str)
+                is_forward = is_forward_start(effective_date_str, datetime.utcnow().date())
             except Exception as e:
                 logger.warning(f"Error parsing effectiveDate: {e}")
         
-        execution_timestamp = parse_date(execution_timestamp_str) or datetime.utcnow()
+        parsed_execution_timestamp = parse_date(execution_timestamp_str)
+        execution_timestamp = parsed_execution_timestamp or datetime.utcnow()
         
         # Extract notional - try different possible field names
         # Parse string formats if needed
@@ -329,6 +447,7 @@ def normalize_leg_to_trade(leg: Leg, strategy_id: Optional[str] = None, date_str
             strategy_id=strategy_id,
             notional_eur=notional if notional_currency == "EUR" else None,
             instrument=leg.instrument,
+            reported_timestamp=parsed_execution_timestamp,  # No eventTime in this format
             is_forward=is_forward
         )
     except Exception as e:
@@ -336,6 +455,19 @@ def normalize_leg_to_trade(leg: Leg, strategy_id: Optional[str] = None, date_str
         return None
 
 
+def classify_strategy_by_leg_count(num_legs: int) -> str:
+    """Fallback strategy type when the API does not provide the product."""
+    if num_legs == 1:
+        return "Outright"
+    elif num_legs == 2:
+        return "Spread"
+    elif num_legs == 3:
+        return "Butterfly"
+    elif num_legs >= 4:
+        return "Curve"
+    return "Package"
+
+
 def convert_strategy_api_response(response_data: StrategyAPIResponse) -> Tuple[List[Trade], Optional[Strategy]]:
     """
     Convert new StrategyAPIResponse to Trade and Strategy models.
@@ -374,18 +506,7 @@ def convert_strategy_api_response(response_data: StrategyAPIResponse) -> Tuple[L
             if response_data.product:
                 strategy_type = response_data.product
             else:
-                # Fallback: Classify strategy type based on leg count
-                num_legs = response_data.legsCount or len(leg_trades)
-                if num_legs == 1:
-                    strategy_type = "Outright"
-                elif num_legs == 2:
-                    strategy_type = "Spread"
-                elif num_legs == 3:
-                    strategy_type = "Butterfly"
-                elif num_legs >= 4:
-                    strategy_type = "Curve"
-                else:
-                    strategy_type = "Package"
+                strategy_type = classify_strategy_by_leg_count(response_data.legsCount or len(leg_trades))
             
             # Calculate total notional
             # Parse string formats if needed (already handled by validator)
@@ -454,6 +575,258 @@ def convert_strategy_api_response(response_data: StrategyAPIResponse) -> Tuple[L
     return trades, strategy
 
 
+# ----------------------------------------------------------------------------
+# Fast-path normalization (new format)
+#
+# The upstream strategy API is trusted: instead of validating each item into
+# StrategyAPIResponse/LegAPI models and then building a validated Trade per
+# leg, the fast path reads the raw dicts, applies the same cleaning as the
+# model validators, and builds Trade/Strategy with model_construct (no
+# re-validation). Anything it does not expect makes the item go through the
+# validated path instead, which is also used for every item when
+# INGEST_STRICT_VALIDATION is set.
+# ----------------------------------------------------------------------------
+
+_LEG_API_FIELDS = tuple(LegAPI.model_fields)
+
+
+def _fast_float(value) -> Optional[float]:
+    """Float field: missing, NaN and infinite values become None."""
+    if value is None:
+        return None
+    value = float(value)
+    return value if math.isfinite(value) else None
+
+
+def _fast_notional(value) -> Optional[float]:
+    """Notional field: numbers or abbreviated strings ("20M", "2B"), as the model validators."""
+    if not isinstance(value, str):
+        return _fast_float(value)
+    return parse_notional_text(value)
+
+
+def _fast_package_price(value) -> Optional[str]:
+    """Package transaction price: kept as a string, NaN/empty values become None."""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        return None if value.lower() in _NULL_STRINGS else value
+    return str(value) if math.isfinite(value) else None
+
+
+def _fast_bool(value) -> Optional[bool]:
+    """Boolean field: only JSON booleans are accepted on the fast path."""
+    if value is None or isinstance(value, bool):
+        return value
+    raise TypeError(f"Expected a boolean, got {value!r}")
+
+
+def _construct(model, values: Dict[str, Any]):
+    """
+    Build a model from a dict holding all its fields, without validation.
+    
+    Same result as model.model_construct(**values), minus its per-field
+    defaults handling, which dominates the cost of the fast path.
+    """
+    instance = model.__new__(model)
+    object.__setattr__(instance, "__dict__", values)
+    object.__setattr__(instance, "__pydantic_fields_set__", set(values))
+    object.__setattr__(instance, "__pydantic_extra__", None)
+    object.__setattr__(instance, "__pydantic_private__", None)
+    return instance
+
+
+def clean_leg_api(leg: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Clean a raw new-format leg without building a LegAPI.
+    
+    Args:
+        leg: Raw leg dict from the API response
+        
+    Returns:
+        Dict with the same content as LegAPI(**leg).dict()
+    """
+    cleaned = {name: leg.get(name) for name in _LEG_API_FIELDS}
+    for key, value in leg.items():
+        if key not in cleaned:
+            cleaned[key] = value  # Extra fields are kept, as with LegAPI
+    if cleaned["id"] is not None and not isinstance(cleaned["id"], (str, int)):
+        raise TypeError(f"Unexpected leg id {cleaned['id']!r}")
+    cleaned["notionalAmountLeg1"] = _fast_notional(cleaned["notionalAmountLeg1"])
+    cleaned["notionalAmountLeg2"] = _fast_notional(cleaned["notionalAmountLeg2"])
+    for name in ("fixedRateLeg1", "fixedRateLeg2", "spreadLeg1", "spreadLeg2", "packageSpread"):
+        cleaned[name] = _fast_float(cleaned[name])
+    cleaned["packageIndicator"] = _fast_bool(cleaned["packageIndicator"])
+    cleaned["packageTransactionPrice"] = _fast_package_price(cleaned["packageTransactionPrice"])
+    return cleaned
+
+
+def fast_leg_api_to_trade(
+    leg: Dict[str, Any],
+    strategy_id: str,
+    execution_datetime: Optional[str],
+    instrument: Optional[str],
+    now: datetime
+) -> Trade:
+    """
+    Fast-path equivalent of normalize_leg_api_to_trade for a cleaned leg dict.
+    
+    Args:
+        leg: Leg dict cleaned by clean_leg_api
+        strategy_id: Strategy ID this leg belongs to
+        execution_datetime: Execution datetime from parent strategy
+        instrument: Instrument (maturity of swap) from strategy level
+        now: Current UTC time (naive), shared by the legs of a response item
+        
+    Returns:
+        Trade built without validation
+        
+    Raises:
+        ValueError: If the effective date cannot be parsed
+    """
+    effective_date_str = leg["effectiveDate"]
+    effective_date_dt = None
+    is_forward = False
+    if effective_date_str:
+        effective_date_dt = parse_effective_date(effective_date_str)
+        is_forward = is_forward_start(effective_date_str, now.date())
+    
+    parsed_execution_timestamp = parse_date(leg["executionTime"] or leg["eventTime"] or execution_datetime)
+    execution_timestamp = parsed_execution_timestamp or now
+    
+    notional_leg1 = leg["notionalAmountLeg1"] or 0.0
+    notional_leg2 = leg["notionalAmountLeg2"] or notional_leg1
+    
+    if leg["id"] is not None:
+        dissemination_id = str(leg["id"])
+    elif leg["upiIsin"] or leg["upi"]:
+        dissemination_id = str(leg["upiIsin"] or leg["upi"])
+    else:
+        leg_hash = hash(str(sorted((k, v) for k, v in leg.items() if v is not None)))
+        dissemination_id = f"LEG_{abs(leg_hash)}"
+    
+    return _construct(Trade, {
+        "dissemination_identifier": dissemination_id,
+        "original_dissemination_identifier": None,
+        "action_type": "NEWT",
+        "event_type": "TRADE",
+        "event_timestamp": execution_timestamp,
+        "execution_timestamp": execution_timestamp,
+        "effective_date": effective_date_str,
+        "effective_date_dt": effective_date_dt,
+        "expiration_date": leg["expirationDate"],
+        "is_forward": is_forward,
+        "notional_amount_leg1": float(notional_leg1),
+        "notional_amount_leg2": float(notional_leg2),
+        "notional_currency_leg1": "EUR",  # Same default as normalize_leg_api_to_trade
+        "notional_currency_leg2": "EUR",
+        "fixed_rate_leg1": leg["fixedRateLeg1"],
+        "fixed_rate_leg2": leg["fixedRateLeg2"],
+        "spread_leg1": leg["spreadLeg1"],
+        "spread_leg2": leg["spreadLeg2"],
+        "unique_product_identifier": leg["upi"] or "UNKNOWN",
+        "unique_product_identifier_short_name": None,
+        "unique_product_identifier_underlier_name": leg["rateUnderlier"] or leg["upi"] or "UNKNOWN",
+        "platform_identifier": leg["platformCode"] or leg["platformName"],
+        "package_indicator": leg["packageIndicator"] or False,
+        "package_transaction_price": leg["packageTransactionPrice"],
+        "strategy_id": strategy_id,
+        "notional_eur": float(notional_leg1),
+        "instrument": instrument,
+        "reported_timestamp": parse_date(leg["eventTime"]) or parsed_execution_timestamp,
+    })
+
+
+def convert_strategy_api_item_fast(response_item: Dict[str, Any]) -> Tuple[List[Trade], Optional[Strategy]]:
+    """
+    Fast-path equivalent of convert_strategy_api_response for a raw response item.
+    
+    Args:
+        response_item: Raw new-format item (parsed JSON object)
+        
+    Returns:
+        Tuple of (list of Trade objects, Strategy object or None)
+        
+    Raises:
+        TypeError, ValueError, KeyError, AttributeError: If the item is not
+            in the shape the fast path handles (use the validated path)
+    """
+    strategy_id = str(response_item["id"])
+    execution_datetime = response_item.get("executionDateTime")
+    instrument = response_item.get("instrument")
+    now = datetime.utcnow()
+    
+    legs_data = [clean_leg_api(leg) for leg in response_item.get("legs") or []]
+    leg_trades = [
+        fast_leg_api_to_trade(leg, strategy_id, execution_datetime, instrument, now)
+        for leg in legs_data
+    ]
+    if not leg_trades:
+        return leg_trades, None
+    
+    product = response_item.get("product")
+    legs_count = response_item.get("legsCount")
+    legs_count = int(legs_count) if legs_count is not None else None
+    notional = _fast_notional(response_item.get("notional"))
+    notional_truncated = _fast_notional(response_item.get("notionalTruncated"))
+    
+    total_notional = notional or notional_truncated
+    if not total_notional:
+        total_notional = sum(t.notional_eur or t.notional_amount_leg1 for t in leg_trades)
+    
+    exec_dt = parse_date(execution_datetime) if execution_datetime else None
+    if exec_dt:
+        execution_start = execution_end = exec_dt
+    else:
+        execution_start = min(t.execution_timestamp for t in leg_trades)
+        execution_end = max(t.execution_timestamp for t in leg_trades)
+    
+    package_transaction_price = next(
+        (leg["packageTransactionPrice"] for leg in legs_data if leg["packageTransactionPrice"] is not None),
+        None
+    )
+    
+    strategy = _construct(Strategy, {
+        "strategy_id": strategy_id,
+        "strategy_type": product or classify_strategy_by_leg_count(legs_count or len(leg_trades)),
+        "underlying_name": response_item.get("underlier") or leg_trades[0].unique_product_identifier_underlier_name,
+        "legs": [t.dissemination_identifier for t in leg_trades],
+        "legs_data": legs_data,
+        "total_notional_eur": float(total_notional),
+        "execution_start": execution_start,
+        "execution_end": execution_end,
+        "package_transaction_price": package_transaction_price,
+        "execution_date_time": execution_datetime,
+        "price": _fast_float(response_item.get("price")),
+        "iron_price": _fast_float(response_item.get("ironPrice")),
+        "product": product,
+        "underlier": response_item.get("underlier"),
+        "tenor": response_item.get("tenor"),
+        "instrument": instrument,
+        "legs_count": legs_count or len(leg_trades),
+        "notional": notional,
+        "notional_truncated": notional_truncated,
+        "platform": legs_data[0]["platformCode"] or legs_data[0]["platformName"],
+        "d2c": _fast_bool(response_item.get("d2c"))
+    })
+    return leg_trades, strategy
+
+
+def convert_strategy_api_item(response_item: Dict[str, Any]) -> Tuple[List[Trade], Optional[Strategy]]:
+    """
+    Convert a raw new-format item, through the fast path unless INGEST_STRICT_VALIDATION.
+    
+    Items the fast path cannot handle are converted through the validated
+    models, which report the problem as usual.
+    """
+    if not INGEST_STRICT_VALIDATION:
+        try:
+            return convert_strategy_api_item_fast(response_item)
+        except (TypeError, ValueError, KeyError, AttributeError) as e:
+            logger.debug(f"Fast normalization failed for item {response_item.get('id')}, validating it: {e}")
+    return convert_strategy_api_response(StrategyAPIResponse(**response_item))
+
+
 def convert_internal_api_response(response_data: InternalAPIResponse) -> Tuple[List[Trade], Optional[Strategy]]:
     """
     Convert internal API response to Trade and Strategy models.
@@ -519,7 +892,479 @@ def convert_internal_api_response(response_data: InternalAPIResponse) -> Tuple[L
     return trades, strategy
 
 
-async def poll_internal_api() -> Tuple[List[Trade], List[Strategy]]:
+class PollCursor:
+    """
+    Incremental polling state for the internal API.
+    
+    Tracks a high-water mark (latest execution time seen) and the validators
+    of the last response (ETag, Last-Modified). A request is incremental when
+    there is a high-water mark, the server has not shown it ignores the
+    `since` parameter, and no full resync is due.
+    
+    Responses are streamed, so the trades of a poll are observed batch by
+    batch; the high-water mark and validators are only committed once the
+    whole response has been received, so an interrupted poll is retried
+    from the previous mark.
+    
+    The mark follows the trades' report time (Trade.reported_timestamp: the
+    legs' eventTime when present), never a time made up for a leg without
+    one. The server is only taken to ignore `since` after
+    INTERNAL_API_SINCE_IGNORED_POLLS incremental polls in a row where most
+    returned trades are older than requested (a single late-reported trade
+    proves nothing), and it is probed again once a full resync interval has
+    passed.
+    
+    Attributes:
+        high_water: Latest trade report time seen (UTC epoch), or None before the first data
+        etag: ETag of the last 200 response, if any
+        last_modified: Last-Modified of the last 200 response, if any
+        since_supported: False while the server is taken to ignore `since`
+        ignored_polls: Incremental polls in a row where most trades were older than requested
+        last_full_fetch: time.monotonic() of the last full fetch (None: never)
+        full_resync_interval: Seconds between full fetches
+    """
+    
+    def __init__(self, full_resync_interval: float = INTERNAL_API_FULL_RESYNC_INTERVAL):
+        self.high_water: Optional[float] = None
+        self.etag: Optional[str] = None
+        self.last_modified: Optional[str] = None
+        self.since_supported = True
+        self.ignored_polls = 0
+        self.last_full_fetch: Optional[float] = None
+        self.full_resync_interval = full_resync_interval
+        self._since_ignored_at: Optional[float] = None
+        self._pending_high_water: Optional[float] = None
+        self._poll_dated = 0
+        self._poll_older = 0
+    
+    def start_poll(self) -> Optional[float]:
+        """Reset the state of the current poll and return its `since` (None: full fetch)."""
+        self._pending_high_water = None
+        self._poll_dated = 0
+        self._poll_older = 0
+        return self.since()
+    
+    def since(self) -> Optional[float]:
+        """Return the epoch to request data from, or None if this poll must be a full fetch."""
+        if not INTERNAL_API_SINCE_PARAM or not self.since_supported or self.high_water is None:
+            return None
+        if self.last_full_fetch is None or time.monotonic() - self.last_full_fetch >= self.full_resync_interval:
+            return None
+        return self.high_water - INTERNAL_API_SINCE_OVERLAP
+    
+    def request_headers(self) -> Dict[str, str]:
+        """Conditional request headers for the validators of the last response."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+    
+    def observe(self, trades: List[Trade], since: Optional[float]):
+        """
+        Note the trades received so far by the current poll: their latest
+        report time, and how many are older than the requested `since`.
+        
+        Trades without a report time (no usable time in the response) are
+        left out, so they can never move the mark.
+        """
+        epochs = [to_epoch(trade.reported_timestamp) for trade in trades if trade.reported_timestamp is not None]
+        if not epochs:
+            return
+        self._poll_dated += len(epochs)
+        if since is not None:
+            self._poll_older += sum(1 for epoch in epochs if epoch < since)
+        latest = max(epochs)
+        if self._pending_high_water is None or latest > self._pending_high_water:
+            self._pending_high_water = latest
+    
+    def commit(self, response: httpx.Response, since: Optional[float]):
+        """
+        Record a fully received 200 response: its validators, the new
+        high-water mark, and whether the server honoured `since`.
+        """
+        self.etag = response.headers.get("ETag")
+        self.last_modified = response.headers.get("Last-Modified")
+        if since is None:
+            self._full_fetch_done()
+        elif self._poll_dated:
+            if self._poll_older * 2 > self._poll_dated:
+                self.ignored_polls += 1
+            else:
+                self.ignored_polls = 0
+            if self.ignored_polls >= INTERNAL_API_SINCE_IGNORED_POLLS and self.since_supported:
+                # Polls stay correct without the parameter (already seen trades
+                # are dropped downstream); it is probed again after a resync interval
+                logger.info(
+                    f"Internal API seems to ignore the '{INTERNAL_API_SINCE_PARAM}' parameter "
+                    f"({self.ignored_polls} polls in a row), using full fetches"
+                )
+                self.since_supported = False
+                self._since_ignored_at = time.monotonic()
+        if self._pending_high_water is not None and (
+            self.high_water is None or self._pending_high_water > self.high_water
+        ):
+            self.high_water = self._pending_high_water
+        self._pending_high_water = None
+    
+    def not_modified(self, since: Optional[float]):
+        """
+        Record a 304 response: nothing changed since the validators were issued.
+        
+        A 304 to a full fetch confirms the complete data set, so it counts as
+        a full fetch (otherwise since() would keep asking for full fetches).
+        """
+        if since is None:
+            self._full_fetch_done()
+    
+    def _full_fetch_done(self):
+        """Note a full fetch, and probe `since` again once a resync interval has passed since it was given up."""
+        self.last_full_fetch = time.monotonic()
+        if not self.since_supported and self.last_full_fetch - self._since_ignored_at >= self.full_resync_interval:
+            logger.info(f"Probing the internal API '{INTERNAL_API_SINCE_PARAM}' parameter again")
+            self.since_supported = True
+            self.ignored_polls = 0
+
+
+def format_since(epoch: float) -> str:
+    """Format an epoch timestamp as an ISO 8601 UTC string (e.g. 2024-01-15T10:30:00Z)."""
+    return datetime.fromtimestamp(epoch, timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+class ResponseFormat:
+    """
+    A registered internal API response format.
+    
+    Attributes:
+        name: Format name (used in logs and format counters)
+        detector: Function returning True if a response item is in this format
+        converter: Function converting a response item to (trades, strategy or None)
+    """
+    
+    def __init__(
+        self,
+        name: str,
+        detector: Callable[[Dict[str, Any]], bool],
+        converter: Callable[[Dict[str, Any]], Tuple[List[Trade], Optional[Strategy]]]
+    ):
+        self.name = name
+        self.detector = detector
+        self.converter = converter
+
+
+# Keys only found in the new format (StrategyAPIResponse / LegAPI)
+STRATEGY_API_KEYS = {"executionDateTime", "legsCount", "ironPrice", "notionalTruncated", "underlier", "d2c"}
+STRATEGY_API_LEG_KEYS = {
+    "notionalAmountLeg1", "fixedRateLeg1", "executionTime", "eventTime",
+    "effectiveDate", "expirationDate", "upi", "upiIsin", "platformCode"
+}
+
+
+def _leg_keys(response_item: Dict[str, Any]) -> set:
+    """Union of the keys of all legs of a response item."""
+    keys = set()
+    legs = response_item.get("legs")
+    if isinstance(legs, list):
+        for leg in legs:
+            if isinstance(leg, dict):
+                keys.update(leg)
+    return keys
+
+
+def is_internal_api_item(response_item: Dict[str, Any]) -> bool:
+    """Old format: a `date` field and snake_case legs (no new-format keys)."""
+    return (
+        "date" in response_item
+        and not STRATEGY_API_KEYS.intersection(response_item)
+        and not STRATEGY_API_LEG_KEYS.intersection(_leg_keys(response_item))
+    )
+
+
+def is_strategy_api_item(response_item: Dict[str, Any]) -> bool:
+    """New format: any other item with an id (all other StrategyAPIResponse fields are optional)."""
+    return "id" in response_item
+
+
+# Checked in order: registered formats first, then the built-in ones
+_builtin_formats: List[ResponseFormat] = [
+    ResponseFormat(
+        "internal_api",
+        is_internal_api_item,
+        lambda item: convert_internal_api_response(InternalAPIResponse(**item))
+    ),
+    ResponseFormat(
+        "strategy_api",
+        is_strategy_api_item,
+        convert_strategy_api_item
+    ),
+]
+_registered_formats: List[ResponseFormat] = []
+
+# Response items seen per detected format ("unknown" when nothing matched)
+response_format_counts: Counter = Counter()
+
+
+def register_response_format(
+    name: str,
+    detector: Callable[[Dict[str, Any]], bool],
+    converter: Callable[[Dict[str, Any]], Tuple[List[Trade], Optional[Strategy]]]
+):
+    """
+    Register an additional upstream response format.
+    
+    Registered formats are checked before the built-in ones (in registration
+    order), so their detector can be specific without having to rule out the
+    built-in formats. Registering an existing name replaces it.
+    
+    Args:
+        name: Format name
+        detector: Function returning True for response items in this format;
+                  it should only inspect a few keys (it runs for every item)
+        converter: Function converting a response item to (trades, strategy or None)
+    """
+    _registered_formats[:] = [f for f in _registered_formats if f.name != name]
+    _registered_formats.append(ResponseFormat(name, detector, converter))
+    logger.info(f"Registered internal API response format '{name}'")
+
+
+def detect_response_format(response_item: Any) -> Optional[ResponseFormat]:
+    """Return the format of a response item, or None if no detector matches."""
+    if not isinstance(response_item, dict):
+        return None
+    for response_format in _registered_formats + _builtin_formats:
+        if response_format.detector(response_item):
+            return response_format
+    return None
+
+
+def get_response_format(name: str) -> Optional[ResponseFormat]:
+    """Return the registered or built-in format with this name, or None."""
+    for response_format in _registered_formats + _builtin_formats:
+        if response_format.name == name:
+            return response_format
+    return None
+
+
+def decode_and_convert(
+    decoder: JSONArrayDecoder,
+    data: bytes,
+    final: bool = False,
+    format_name: Optional[str] = None
+) -> Tuple[JSONArrayDecoder, List[Tuple[str, List[Trade], Optional[Strategy], Optional[str]]]]:
+    """
+    Decode the next chunk of a response body and convert the items it completes.
+    
+    This is the CPU-heavy stage of a poll, run in the ingest executor. It
+    only works on its arguments, so it runs the same in a worker thread or
+    process (a worker process gets a copy of the decoder: always continue
+    with the returned one). Format counters and error logs are left to the
+    caller, in the application process.
+    
+    Args:
+        decoder: Decoder state of the response body
+        data: Next chunk of the body
+        final: Whether this is the end of the body
+        format_name: Format of all the items (None: detected per item)
+        
+    Returns:
+        Tuple of (decoder to use for the next chunk,
+                  [(format name, trades, strategy or None, error message or None)] per item)
+        
+    Raises:
+        JSONStreamError: If the body is not valid JSON
+    """
+    return decoder, convert_items(decoder.feed(data, final), format_name)
+
+
+def convert_items(
+    response_items: List[Any],
+    format_name: Optional[str] = None
+) -> List[Tuple[str, List[Trade], Optional[Strategy], Optional[str]]]:
+    """
+    Convert parsed response items, reporting the outcome per item.
+    
+    Like decode_and_convert, this only works on its arguments, so it can run
+    in the ingest executor.
+    
+    Args:
+        response_items: Parsed response items (JSON objects)
+        format_name: Format of all the items (None: detected per item)
+        
+    Returns:
+        [(format name, trades, strategy or None, error message or None)] per item
+    """
+    results = []
+    fixed_format = get_response_format(format_name) if format_name else None
+    for response_item in response_items:
+        response_format = fixed_format or detect_response_format(response_item)
+        if response_format is None:
+            results.append(("unknown", [], None, "Unrecognized response item format"))
+            continue
+        try:
+            trades, strategy = response_format.converter(response_item)
+        except Exception as e:
+            results.append((response_format.name, [], None, f"{type(e).__name__}: {e}"))
+            continue
+        results.append((response_format.name, trades, strategy, None))
+    return results
+
+
+INGEST_EXECUTORS = ("thread", "process", "inline")
+
+
+def create_ingest_executor(kind: str = INGEST_EXECUTOR, workers: int = INGEST_WORKERS) -> Optional[Executor]:
+    """
+    Create the executor that decodes and converts poll responses.
+    
+    Args:
+        kind: "thread", "process" or "inline" (no executor: the event loop does the work)
+        workers: Number of worker threads/processes
+        
+    Returns:
+        The executor, or None for "inline"
+        
+    Raises:
+        ValueError: If kind is unknown
+    """
+    if kind not in INGEST_EXECUTORS:
+        raise ValueError(f"Unknown ingest executor '{kind}' (expected one of {', '.join(INGEST_EXECUTORS)})")
+    if kind == "thread":
+        return ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ingest")
+    if kind == "process":
+        return ProcessPoolExecutor(max_workers=workers)
+    return None
+
+
+async def stream_internal_api(
+    client: httpx.AsyncClient,
+    cursor: Optional[PollCursor] = None,
+    batch_size: int = INTERNAL_API_BATCH_SIZE,
+    executor: Optional[Executor] = None,
+    source: Optional["PollSource"] = None
+) -> AsyncIterator[Tuple[List[Trade], List[Strategy]]]:
+    """
+    Poll internal API, yielding normalized trades and strategies in batches.
+    
+    The response body is parsed incrementally (see app.json_stream): each
+    item is validated and converted as soon as it has been received, and a
+    batch is yielded every batch_size items, so memory stays proportional to
+    a batch and the first trades can be processed before the body is complete.
+    
+    With an executor, decoding and conversion (decode_and_convert) run in
+    it, one INGEST_CHUNK_SIZE chunk of the body at a time, and the event
+    loop only reads the body and hands over the results.
+    
+    With a cursor, the request is incremental when possible (`since` query
+    parameter and conditional headers, see PollCursor); a 304 Not Modified
+    response yields nothing.
+    
+    Args:
+        client: Pooled HTTP client
+        cursor: Incremental polling state, updated from the response (None: full fetch)
+        batch_size: Number of response items per yielded batch
+        executor: Ingest executor (None: decode and convert in the event loop)
+        source: Source to poll: URL, token, headers, timeout and response
+                format (None: INTERNAL_API_URL with INTERNAL_API_TOKEN)
+        
+    Yields:
+        Tuples of (list of Trade objects, list of Strategy objects)
+        
+    Raises:
+        httpx.HTTPError: On request or HTTP status errors
+        JSONStreamError: If the body is not valid JSON
+    """
+    url = source.url if source is not None else INTERNAL_API_URL
+    token = source.token if source is not None else INTERNAL_API_TOKEN
+    format_name = source.response_format if source is not None else None
+    source_name = source.name if source is not None else "internal API"
+    
+    # Prepare headers with authentication if token is provided
+    headers = INTERNAL_API_HEADERS.copy()
+    if source is not None:
+        headers.update(source.headers)
+    if token:
+        headers["Authorization"] = f"Bearer {token}"
+    
+    params = {}
+    since = None
+    if cursor is not None:
+        headers.update(cursor.request_headers())
+        since = cursor.start_poll()
+        if since is not None:
+            params[INTERNAL_API_SINCE_PARAM] = format_since(since)
+    
+    request_options = {"timeout": source.timeout} if source is not None else {}
+    async with client.stream("GET", url, headers=headers, params=params, **request_options) as response:
+        if response.status_code == 304:
+            logger.debug(f"{source_name} data not modified since last poll")
+            if cursor is not None:
+                cursor.not_modified(since)
+            return
+        response.raise_for_status()
+        
+        batch_trades: List[Trade] = []
+        batch_strategies: List[Strategy] = []
+        batch_items = 0
+        total_trades = 0
+        total_strategies = 0
+        
+        # Handles both a single response object and a list of responses
+        loop = asyncio.get_running_loop()
+        decoder = JSONArrayDecoder()
+        chunks = response.aiter_bytes(INGEST_CHUNK_SIZE)
+        final = False
+        while not final:
+            try:
+                data = await chunks.__anext__()
+            except StopAsyncIteration:
+                data, final = b"", True
+            
+            if executor is None:
+                decoder, results = decode_and_convert(decoder, data, final, format_name)
+            else:
+                decoder, results = await loop.run_in_executor(
+                    executor, decode_and_convert, decoder, data, final, format_name
+                )
+            
+            for item_format, trades, strategy, error in results:
+                response_format_counts[item_format] += 1
+                if error is not None:
+                    logger.error(f"Error processing API response item ({item_format}): {error}")
+                    continue
+                
+                batch_trades.extend(trades)
+                if strategy:
+                    batch_strategies.append(strategy)
+                batch_items += 1
+                
+                if batch_items >= batch_size:
+                    if cursor is not None:
+                        cursor.observe(batch_trades, since)
+                    total_trades += len(batch_trades)
+                    total_strategies += len(batch_strategies)
+                    yield batch_trades, batch_strategies
+                    batch_trades, batch_strategies, batch_items = [], [], 0
+        
+        if cursor is not None:
+            cursor.observe(batch_trades, since)
+        total_trades += len(batch_trades)
+        total_strategies += len(batch_strategies)
+        if batch_trades or batch_strategies:
+            yield batch_trades, batch_strategies
+        
+        if cursor is not None:
+            cursor.commit(response, since)
+        
+        fetch_kind = "incremental" if since is not None else "full"
+        logger.info(f"Polled {total_trades} trades and {total_strategies} strategies from {source_name} ({fetch_kind})")
+
+
+async def poll_internal_api(
+    client: Optional[httpx.AsyncClient] = None,
+    cursor: Optional[PollCursor] = None,
+    raise_on_error: bool = False
+) -> Tuple[List[Trade], List[Strategy]]:
     """
     Poll internal API and return list of normalized trades and strategies.
     
@@ -527,147 +1372,392 @@ async def poll_internal_api() -> Tuple[List[Trade], List[Strategy]]:
     and converts all responses to Trade and Strategy objects. Handles HTTP errors gracefully
     by returning empty lists.
     
-    Supports both old and new API formats:
+    Supports both old and new API formats (and any registered with
+    register_response_format):
     - Old format: InternalAPIResponse with Leg objects
     - New format: StrategyAPIResponse with LegAPI objects (pre-classified strategies)
     
+    This collects all the batches of stream_internal_api(); the Poller
+    consumes the stream directly instead.
+    
+    Args:
+        client: Pooled HTTP client to reuse. Without one, a temporary client
+                is created and closed for this call.
+        cursor: Incremental polling state, updated from the response (None: full fetch)
+        raise_on_error: Re-raise request errors (after logging) instead of
+                        returning empty lists, so the caller can back off
+    
     Returns:
         Tuple of (list of normalized Trade objects, list of Strategy objects)
         
     Note:
         This function is async and should be called with await. It uses httpx
-        for asynchronous HTTP requests with a 10-second timeout.
+        for asynchronous HTTP requests (timeout: HTTP_TIMEOUT).
     """
-    async with httpx.AsyncClient(timeout=10.0) as client:
-        try:
-            # Prepare headers with authentication if token is provided
-            headers = INTERNAL_API_HEADERS.copy()
-            if INTERNAL_API_TOKEN:
-                headers["Authorization"] = f"Bearer {INTERNAL_API_TOKEN}"
-            
-            response = await client.get(INTERNAL_API_URL, headers=headers)
-            response.raise_for_status()
-            
-            data = response.json()
-            
-            # Handle both single response and list of responses
-            if isinstance(data, list):
-                responses = data
-            else:
-                responses = [data]
-            
-            all_trades = []
-            all_strategies = []
-            
-            for response_item in responses:
-                try:
-                    # Try new API format first (StrategyAPIResponse)
-                    try:
-                        api_response = StrategyAPIResponse(**response_item)
-                        trades, strategy = convert_strategy_api_response(api_response)
-                        all_trades.extend(trades)
-                        if strategy:
-                            all_strategies.append(strategy)
-                        continue
-                    except Exception:
-                        # If it fails, try old format
-                        pass
-                    
-                    # Try old API format (InternalAPIResponse)
-                    try:
-                        api_response = InternalAPIResponse(**response_item)
-                        trades, strategy = convert_internal_api_response(api_response)
-                        all_trades.extend(trades)
-                        if strategy:
-                            all_strategies.append(strategy)
-                    except Exception as e:
-                        logger.error(f"Error processing API response item (both formats failed): {e}", exc_info=True)
-                        continue
-                        
-                except Exception as e:
-                    logger.error(f"Error processing API response item: {e}", exc_info=True)
-                    continue
-            
-            logger.info(f"Polled {len(all_trades)} trades and {len(all_strategies)} strategies from internal API")
-            return all_trades, all_strategies
+    if client is None:
+        async with create_http_client() as temporary_client:
+            return await poll_internal_api(temporary_client, cursor, raise_on_error)
+    
+    all_trades = []
+    all_strategies = []
+    try:
+        async for trades, strategies in stream_internal_api(client, cursor):
+            all_trades.extend(trades)
+            all_strategies.extend(strategies)
+        return all_trades, all_strategies
+        
+    except httpx.HTTPError as e:
+        logger.error(f"HTTP error polling internal API: {e}")
+        if raise_on_error:
+            raise
+        return [], []
+    except Exception as e:
+        logger.error(f"Unexpected error polling internal API: {e}", exc_info=True)
+        if raise_on_error:
+            raise
+        return [], []
+
+
+class AdaptiveSchedule:
+    """
+    Polling interval that follows market activity.
+    
+    After a poll that brought new trades the interval is multiplied by
+    speedup (toward floor); after an idle poll by slowdown (toward
+    ceiling). Each sleep is the interval with random jitter, so several
+    instances do not poll in lockstep.
+    
+    Attributes:
+        interval: Current interval in seconds (before jitter)
+        floor: Shortest interval
+        ceiling: Longest interval
+        speedup: Multiplier after an active poll (< 1)
+        slowdown: Multiplier after an idle poll (> 1)
+        jitter: Jitter as a fraction of the interval
+        last_delay: Last sleep returned by next_delay()
+    """
+    
+    def __init__(
+        self,
+        initial: float = POLL_INTERVAL,
+        floor: float = POLL_INTERVAL_MIN,
+        ceiling: float = POLL_INTERVAL_MAX,
+        speedup: float = POLL_SPEEDUP_FACTOR,
+        slowdown: float = POLL_SLOWDOWN_FACTOR,
+        jitter: float = POLL_JITTER
+    ):
+        self.floor = floor
+        self.ceiling = max(ceiling, floor)
+        self.interval = min(max(initial, self.floor), self.ceiling)
+        self.speedup = speedup
+        self.slowdown = slowdown
+        self.jitter = jitter
+        self.last_delay = self.interval
+    
+    def next_delay(self, new_trades: int) -> float:
+        """
+        Adapt the interval to the last poll and return the next sleep.
+        
+        Args:
+            new_trades: Number of new trades the last poll brought
             
-        except httpx.HTTPError as e:
-            logger.error(f"HTTP error polling internal API: {e}")
-            return [], []
-        except Exception as e:
-            logger.error(f"Unexpected error polling internal API: {e}", exc_info=True)
-            return [], []
+        Returns:
+            Seconds to sleep before the next poll
+        """
+        factor = self.speedup if new_trades > 0 else self.slowdown
+        self.interval = min(max(self.interval * factor, self.floor), self.ceiling)
+        self.last_delay = self.interval * (1 + random.uniform(-self.jitter, self.jitter))
+        return self.last_delay
+
+
+class PollSource:
+    """
+    One polled upstream endpoint, with its own schedule and statistics.
+    
+    Each source is polled by its own loop (see Poller): its cursor, adaptive
+    interval and error backoff only depend on its own responses.
+    
+    Attributes:
+        name: Source name (logs and metrics)
+        url: Endpoint URL
+        token: Bearer token ("" for none)
+        headers: Extra HTTP headers
+        timeout: Request timeout in seconds
+        response_format: Name of the response format of its items (None: detected per item)
+        cursor: Incremental polling state
+        schedule: Adaptive polling interval
+        retry_delay: Current retry delay in seconds (doubles on error)
+        polls: Number of successful polls
+        errors: Number of failed polls
+        consecutive_errors: Failed polls since the last success
+        last_error: Message of the last error
+        last_new_trades: New trades brought by the last successful poll
+        last_poll_at: Time of the last successful poll
+        last_latency: Duration of the last successful poll in seconds, excluding
+                      the time spent processing its batches
+        total_latency: Sum of the poll durations (for the mean)
+    """
+    
+    def __init__(
+        self,
+        name: str,
+        url: str,
+        token: str = "",
+        headers: Optional[Dict[str, str]] = None,
+        interval: float = POLL_INTERVAL,
+        interval_min: float = POLL_INTERVAL_MIN,
+        interval_max: float = POLL_INTERVAL_MAX,
+        timeout: float = HTTP_TIMEOUT,
+        response_format: Optional[str] = None
+    ):
+        self.name = name
+        self.url = url
+        self.token = token
+        self.headers = headers or {}
+        self.timeout = timeout
+        self.response_format = response_format
+        self.cursor = PollCursor()
+        self.schedule = AdaptiveSchedule(initial=interval, floor=interval_min, ceiling=interval_max)
+        self.retry_delay = 1
+        self.polls = 0
+        self.errors = 0
+        self.consecutive_errors = 0
+        self.last_error: Optional[str] = None
+        self.last_new_trades = 0
+        self.last_poll_at: Optional[datetime] = None
+        self.last_latency: Optional[float] = None
+        self.total_latency = 0.0
+    
+    def record_success(self, new_trades: int, latency: float):
+        """Record a successful poll (resets the backoff, even when the poll brought nothing)."""
+        self.retry_delay = 1
+        self.consecutive_errors = 0
+        self.polls += 1
+        self.last_new_trades = new_trades
+        self.last_poll_at = datetime.utcnow()
+        self.last_latency = latency
+        self.total_latency += latency
+    
+    def record_error(self, error: Exception, max_retry_delay: float) -> float:
+        """
+        Record a failed poll.
+        
+        Returns:
+            Seconds to wait before retrying (the retry delay then doubles, up to max_retry_delay)
+        """
+        self.errors += 1
+        self.consecutive_errors += 1
+        self.last_error = f"{type(error).__name__}: {error}"
+        delay = self.retry_delay
+        self.retry_delay = min(self.retry_delay * 2, max_retry_delay)
+        return delay
+    
+    def metrics(self) -> Dict[str, Any]:
+        """Polling cadence, latency and health of this source."""
+        return {
+            "url": self.url,
+            "interval_seconds": self.schedule.interval,
+            "last_delay_seconds": self.schedule.last_delay,
+            "interval_floor_seconds": self.schedule.floor,
+            "interval_ceiling_seconds": self.schedule.ceiling,
+            "retry_delay_seconds": self.retry_delay,
+            "polls": self.polls,
+            "errors": self.errors,
+            "consecutive_errors": self.consecutive_errors,
+            "last_error": self.last_error,
+            "last_new_trades": self.last_new_trades,
+            "last_poll_at": self.last_poll_at.isoformat() if self.last_poll_at else None,
+            "last_latency_seconds": self.last_latency,
+            "mean_latency_seconds": self.total_latency / self.polls if self.polls else None,
+            "incremental": self.cursor.since_supported and self.cursor.high_water is not None
+        }
+
+
+def load_poll_sources(sources_config: str = INTERNAL_API_SOURCES) -> List[PollSource]:
+    """
+    Build the polled sources from the INTERNAL_API_SOURCES JSON configuration.
+    
+    Args:
+        sources_config: JSON list of source objects (see config.py); empty for
+                        the single INTERNAL_API_URL source
+        
+    Returns:
+        List of PollSource objects
+        
+    Raises:
+        ValueError: If the configuration is invalid (bad JSON, missing url,
+                    duplicate name or unknown response format)
+    """
+    if not sources_config.strip():
+        return [PollSource("default", INTERNAL_API_URL, token=INTERNAL_API_TOKEN)]
+    
+    try:
+        entries = json.loads(sources_config)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"INTERNAL_API_SOURCES is not valid JSON: {e}")
+    if isinstance(entries, dict):
+        entries = [entries]
+    
+    sources = []
+    for index, entry in enumerate(entries):
+        if not isinstance(entry, dict) or not entry.get("url"):
+            raise ValueError(f"INTERNAL_API_SOURCES entry {index} must be an object with a 'url'")
+        name = str(entry.get("name") or f"source{index + 1}")
+        if any(source.name == name for source in sources):
+            raise ValueError(f"Duplicate source name '{name}' in INTERNAL_API_SOURCES")
+        response_format = entry.get("format")
+        if response_format and get_response_format(response_format) is None:
+            raise ValueError(f"Unknown response format '{response_format}' for source '{name}'")
+        sources.append(PollSource(
+            name=name,
+            url=entry["url"],
+            token=entry.get("token") or "",
+            headers=entry.get("headers"),
+            interval=float(entry.get("interval", POLL_INTERVAL)),
+            interval_min=float(entry.get("interval_min", POLL_INTERVAL_MIN)),
+            interval_max=float(entry.get("interval_max", POLL_INTERVAL_MAX)),
+            timeout=float(entry.get("timeout", HTTP_TIMEOUT)),
+            response_format=response_format
+        ))
+    return sources
 
 
 class Poller:
     """
-    Internal API poller with exponential backoff retry logic.
+    Concurrent poller of the internal API sources, with adaptive intervals and
+    exponential backoff retry logic.
     
-    This class manages continuous polling of the internal API at regular intervals.
-    It implements exponential backoff retry logic to handle temporary API failures
-    gracefully, automatically increasing the delay between retries up to a maximum.
+    This class manages continuous polling of one or more sources (see
+    PollSource and INTERNAL_API_SOURCES). Each source runs its own loop, and
+    the loops run concurrently (asyncio.gather), so a slow or failing source
+    never delays the others. Within a loop the interval adapts to market
+    activity (see AdaptiveSchedule), and errors trigger exponential backoff,
+    automatically increasing the delay between retries up to a maximum; any
+    successful poll, with or without data, resets the backoff.
+    
+    Batches from all sources go through the same callback, one at a time
+    (asyncio.Lock), so they are merged into a single processing stream where
+    trades already seen through another source are dropped as duplicates.
     
     Attributes:
-        callback: Async function called with (List[Trade], List[Strategy]) when new data is polled
+        callback: Async function called with (List[Trade], List[Strategy]) when new data is polled;
+                  it may return the number of new trades (otherwise all polled trades count as new)
         running: Boolean flag to control polling loop
-        retry_delay: Current retry delay in seconds (starts at 1, doubles on error)
+        task: Task running the source loops (see start(); cancelled by aclose())
         max_retry_delay: Maximum retry delay (60 seconds)
+        client: Pooled HTTP client shared by every source (closed by aclose())
+        executor: Ingest executor decoding and converting responses (None: inline)
+        sources: Polled sources, with their schedules and statistics
     
     Example:
-        >>> async def process_data(trades: List[Trade], strategies: List[Strategy]):
+        >>> async def process_data(trades: List[Trade], strategies: List[Strategy]) -> int:
         ...     print(f"Received {len(trades)} trades and {len(strategies)} strategies")
+        ...     return len(trades)
         >>> poller = Poller(process_data)
-        >>> poller.running = True
-        >>> await poller._poll_with_retry()  # Runs continuously
+        >>> poller.start()  # Polls in the background until aclose()
     """
     
-    def __init__(self, callback):
+    def __init__(self, callback, sources: Optional[List[PollSource]] = None):
         """
         Initialize poller with callback function.
         
         Args:
             callback: Async function that receives (List[Trade], List[Strategy]) as arguments.
                      This function is called whenever new data is polled from the API.
+            sources: Sources to poll (default: from INTERNAL_API_SOURCES)
         """
         self.callback = callback
         self.running = False
-        self.retry_delay = 1
+        self.task: Optional[asyncio.Task] = None
         self.max_retry_delay = 60
+        self.client = create_http_client()
+        self.executor = create_ingest_executor()
+        self.sources = sources if sources is not None else load_poll_sources()
+        self._callback_lock = asyncio.Lock()
     
     async def _poll_with_retry(self):
         """
-        Poll with exponential backoff on errors.
-        
-        Continuously polls the internal API at POLL_INTERVAL seconds. On success,
-        resets retry delay to 1 second. On error, doubles the retry delay
-        (up to max_retry_delay) before retrying.
+        Poll all sources concurrently until stopped.
         
         This method runs indefinitely until self.running is set to False.
-        It should be called as an async task (e.g., with asyncio.create_task()).
+        It should run as an async task (see start()).
         
         Note:
-            This is a private method. Use asyncio.create_task() to run it:
-            asyncio.create_task(poller._poll_with_retry())
+            This is a private method. Use start() to run it as a task.
+        """
+        logger.info(f"Polling {len(self.sources)} source(s): {', '.join(source.name for source in self.sources)}")
+        await asyncio.gather(*(self._poll_source(source) for source in self.sources))
+    
+    async def _poll_source(self, source: PollSource):
+        """
+        Poll one source with an adaptive interval, and exponential backoff on errors.
+        
+        Each batch of a streamed response is passed to the callback as soon as
+        it is parsed. After a successful poll (with or without data), resets the retry delay
+        and sleeps for the adaptive interval: shorter while polls bring new
+        trades, longer while idle. On error, sleeps for the retry delay and
+        doubles it (up to max_retry_delay).
         """
         while self.running:
+            started = time.monotonic()
+            processing_time = 0.0
             try:
-                trades, strategies = await poll_internal_api()
-                if trades or strategies:
-                    await self.callback(trades, strategies)
-                    self.retry_delay = 1  # Reset on success
-                await asyncio.sleep(POLL_INTERVAL)
+                # Batches are handed over while the response is still being read
+                new_trades = 0
+                async for trades, strategies in stream_internal_api(
+                    self.client, source.cursor, executor=self.executor, source=source
+                ):
+                    processing_started = time.monotonic()
+                    async with self._callback_lock:
+                        result = await self.callback(trades, strategies)
+                    processing_time += time.monotonic() - processing_started
+                    new_trades += result if isinstance(result, int) else len(trades)
             except Exception as e:
-                logger.error(f"Error in polling loop: {e}", exc_info=True)
-                await asyncio.sleep(self.retry_delay)
-                self.retry_delay = min(self.retry_delay * 2, self.max_retry_delay)
+                logger.error(f"Error polling source '{source.name}': {e}", exc_info=True)
+                await asyncio.sleep(source.record_error(e, self.max_retry_delay))
+                continue
+            
+            source.record_success(new_trades, time.monotonic() - started - processing_time)
+            await asyncio.sleep(source.schedule.next_delay(new_trades))
+    
+    def start(self):
+        """Start polling in a background task."""
+        self.running = True
+        self.task = asyncio.create_task(self._poll_with_retry())
+    
+    def metrics(self) -> Dict[str, Any]:
+        """Polling cadence, latency and health per source, for the /metrics endpoint."""
+        return {
+            "ingest_executor": INGEST_EXECUTOR if self.executor is not None else "inline",
+            "sources": {source.name: source.metrics() for source in self.sources}
+        }
     
     def stop(self):
         """
         Stop the polling loop.
         
-        Sets the running flag to False, which causes the _poll_with_retry()
-        loop to exit on the next iteration.
+        Sets the running flag to False, which causes the source loops to
+        exit on their next iteration.
         """
         self.running = False
         logger.info("Internal API poller stopped")
+    
+    async def aclose(self):
+        """
+        Stop polling, close the HTTP client and shut down the ingest executor.
+        
+        Called on application shutdown so pooled connections are closed cleanly.
+        The source loops are cancelled (they may be sleeping or waiting for a
+        response) and awaited first, so no poll uses the client once it is closed.
+        """
+        self.stop()
+        if self.task is not None:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+        await self.client.aclose()
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
 
@@ -0,0 +1,219 @@
+"""
+Push-based trade ingestion.
+
+This module lets the upstream system push trades instead of waiting to be
+polled. Items in the internal API response format (see app.poller) are
+posted to POST /ingest or streamed over the /ingest/ws WebSocket, both
+defined in app.main, and land in a bounded queue:
+- A full queue is backpressure: POST requests are rejected with 429 and the
+  WebSocket stops reading until there is room again
+- A single consumer task takes the queued items in batches, converts them in
+  the ingest executor and hands the trades to the same processing callback
+  as the poller, so pushed and polled trades form one deduplicated stream
+"""
+
+import asyncio
+import logging
+import time
+from concurrent.futures import Executor
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from app.config import PUSH_BATCH_DELAY, PUSH_BATCH_SIZE, PUSH_QUEUE_SIZE
+from app.models import Strategy, Trade
+from app.poller import convert_items, create_ingest_executor, response_format_counts
+
+logger = logging.getLogger(__name__)
+
+
+class PushIngestor:
+    """
+    Bounded queue and batching consumer for pushed response items.
+
+    Attributes:
+        callback: Async function called with (List[Trade], List[Strategy]) per batch
+                  (returns the number of new trades)
+        executor: Ingest executor converting the items (None: inline)
+        queue: Pending (enqueue time, item) pairs
+        batch_size: Maximum items per batch
+        batch_delay: Longest wait for a batch to fill, in seconds
+        running: Whether the consumer runs
+        task: Consumer task (None until start)
+        received: Items accepted
+        rejected: Items refused because the queue was full
+        processed: Items converted (including invalid ones)
+        invalid: Items that could not be converted
+        batches: Batches processed
+        new_trades: New trades reported by the callback
+        last_batch_size: Size of the last batch
+        last_queue_latency: Time the oldest item of the last batch waited in the queue (seconds)
+        last_batch_at: Time the last batch was processed
+    """
+
+    def __init__(
+        self,
+        callback,
+        executor: Optional[Executor] = None,
+        queue_size: int = PUSH_QUEUE_SIZE,
+        batch_size: int = PUSH_BATCH_SIZE,
+        batch_delay: float = PUSH_BATCH_DELAY
+    ):
+        self.callback = callback
+        self.executor = executor
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.batch_size = batch_size
+        self.batch_delay = batch_delay
+        self.running = False
+        self.task: Optional[asyncio.Task] = None
+        self._waiting = False  # Consumer idle, waiting for the first item of a batch
+        self.received = 0
+        self.rejected = 0
+        self.processed = 0
+        self.invalid = 0
+        self.batches = 0
+        self.new_trades = 0
+        self.last_batch_size = 0
+        self.last_queue_latency: Optional[float] = None
+        self.last_batch_at: Optional[datetime] = None
+
+    @classmethod
+    def create(cls, callback) -> "PushIngestor":
+        """Create an ingestor with its own ingest executor (see INGEST_EXECUTOR)."""
+        return cls(callback, executor=create_ingest_executor())
+
+    def free_slots(self) -> int:
+        """Number of items the queue can still take."""
+        return self.queue.maxsize - self.queue.qsize()
+
+    def start(self):
+        """Start the consumer task."""
+        self.task = asyncio.create_task(self.run())
+
+    def offer(self, items: List[Any]) -> bool:
+        """
+        Queue items if they all fit (all or nothing, so a rejected request can be retried as is).
+
+        Args:
+            items: Response items
+
+        Returns:
+            True if the items were queued, False if the queue is too full
+        """
+        if len(items) > self.free_slots():
+            self.rejected += len(items)
+            return False
+        enqueued_at = time.monotonic()
+        for item in items:
+            self.queue.put_nowait((enqueued_at, item))
+        self.received += len(items)
+        return True
+
+    async def put(self, items: List[Any]):
+        """Queue items, waiting for room when the queue is full (streaming backpressure)."""
+        enqueued_at = time.monotonic()
+        for item in items:
+            await self.queue.put((enqueued_at, item))
+        self.received += len(items)
+
+    async def run(self):
+        """
+        Consume the queue until stopped.
+
+        Waits for an item, lets the batch fill for up to batch_delay seconds
+        unless enough items are already queued, then processes up to
+        batch_size items at once.
+        """
+        self.running = True
+        logger.info("Push ingestion consumer started")
+        while self.running:
+            self._waiting = True
+            try:
+                batch = [await self.queue.get()]
+            finally:
+                self._waiting = False
+            if self.batch_delay > 0 and self.queue.qsize() < self.batch_size - 1:
+                await asyncio.sleep(self.batch_delay)
+            while len(batch) < self.batch_size and not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+
+            await self._process_batch_safely(batch)
+
+    async def _process_batch_safely(self, batch: List[tuple]):
+        """Process a batch, logging (not raising) errors."""
+        try:
+            await self._process_batch(batch)
+        except Exception as e:
+            logger.error(f"Error processing pushed batch of {len(batch)} items: {e}", exc_info=True)
+
+    async def _process_batch(self, batch: List[tuple]):
+        """Convert a batch of queued items and pass the trades to the callback."""
+        self.last_queue_latency = time.monotonic() - batch[0][0]
+        items = [item for _, item in batch]
+        if self.executor is None:
+            results = convert_items(items)
+        else:
+            results = await asyncio.get_running_loop().run_in_executor(self.executor, convert_items, items)
+
+        trades: List[Trade] = []
+        strategies: List[Strategy] = []
+        for format_name, item_trades, strategy, error in results:
+            response_format_counts[format_name] += 1
+            if error is not None:
+                self.invalid += 1
+                logger.error(f"Error processing pushed item ({format_name}): {error}")
+                continue
+            trades.extend(item_trades)
+            if strategy:
+                strategies.append(strategy)
+
+        self.processed += len(items)
+        self.batches += 1
+        self.last_batch_size = len(items)
+        self.last_batch_at = datetime.utcnow()
+        if trades or strategies:
+            result = await self.callback(trades, strategies)
+            self.new_trades += result if isinstance(result, int) else len(trades)
+
+    def metrics(self) -> Dict[str, Any]:
+        """Queue depth and throughput, for the /metrics endpoint."""
+        return {
+            "queued": self.queue.qsize(),
+            "capacity": self.queue.maxsize,
+            "received": self.received,
+            "rejected": self.rejected,
+            "processed": self.processed,
+            "invalid": self.invalid,
+            "batches": self.batches,
+            "new_trades": self.new_trades,
+            "last_batch_size": self.last_batch_size,
+            "last_queue_latency_seconds": self.last_queue_latency,
+            "last_batch_at": self.last_batch_at.isoformat() if self.last_batch_at else None
+        }
+
+    async def stop(self):
+        """
+        Stop the consumer, process the items still queued, then shut down the ingest executor.
+
+        Queued items were already acknowledged (202 / WebSocket ack), so they
+        are processed before shutdown rather than dropped. The consumer
+        finishes the batch it is processing; if it is idle, it is cancelled.
+        """
+        self.running = False
+        if self.task is not None:
+            if self._waiting:
+                self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            while not self.queue.empty():
+                batch = []
+                while len(batch) < self.batch_size and not self.queue.empty():
+                    batch.append(self.queue.get_nowait())
+                await self._process_batch_safely(batch)
+        elif not self.queue.empty():
+            # The history never finished loading: the items cannot be processed safely
+            logger.warning(f"Dropping {self.queue.qsize()} pushed items queued before the consumer started")
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+        logger.info("Push ingestion stopped")
@@ -0,0 +1,188 @@
+"""
+Mergeable quantile sketch (t-digest style).
+
+This module provides QuantileSketch, a compact summary of a distribution of
+values used for historical percentiles:
+- Values are clustered into weighted centroids; centroids near the tails are
+  kept small so extreme percentiles stay accurate
+- Sketches of different days merge into one without the raw values, so a
+  90-day distribution costs about a hundred centroids per instrument
+- Sketches serialize to plain dicts for the JSON day summaries
+
+Quantiles and ranks are interpolated between centroid centers, with the
+exact minimum and maximum kept at the ends.
+"""
+
+import math
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+
+
+class QuantileSketch:
+    """
+    t-digest style quantile sketch with bounded size.
+
+    The number of centroids is bounded by `compression` (the t-digest
+    arcsine scale function bounds each centroid's share of the total
+    weight, less so in the middle of the distribution than at the tails).
+
+    Attributes:
+        compression: Size/accuracy trade-off (higher is more accurate)
+        means: Centroid means, sorted ascending
+        weights: Centroid weights (number of values)
+        count: Total weight
+        min: Smallest value seen
+        max: Largest value seen
+    """
+
+    DEFAULT_COMPRESSION = 100
+
+    def __init__(self, compression: int = DEFAULT_COMPRESSION):
+        self.compression = compression
+        self.means = np.empty(0, dtype=np.float64)
+        self.weights = np.empty(0, dtype=np.float64)
+        self.count = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def __len__(self) -> int:
+        return int(self.count)
+
+    @classmethod
+    def from_values(cls, values: Iterable[float], compression: int = DEFAULT_COMPRESSION) -> "QuantileSketch":
+        """Build a sketch from raw values (NaN and infinite values are ignored)."""
+        sketch = cls(compression)
+        sketch.add_values(values)
+        return sketch
+
+    @classmethod
+    def merged(cls, sketches: Iterable["QuantileSketch"], compression: int = DEFAULT_COMPRESSION) -> "QuantileSketch":
+        """Merge several sketches into a new one."""
+        sketch = cls(compression)
+        for other in sketches:
+            sketch._absorb(other.means, other.weights, other.min, other.max)
+        sketch._compress()
+        return sketch
+
+    def add_values(self, values: Iterable[float]):
+        """Add raw values to the sketch."""
+        values = np.asarray(values if isinstance(values, np.ndarray) else list(values), dtype=np.float64)
+        values = values[np.isfinite(values)]
+        if not values.size:
+            return
+        self._absorb(values, np.ones(values.size), float(values.min()), float(values.max()))
+        self._compress()
+
+    def merge(self, other: "QuantileSketch"):
+        """Merge another sketch into this one."""
+        self._absorb(other.means, other.weights, other.min, other.max)
+        self._compress()
+
+    def _absorb(self, means: np.ndarray, weights: np.ndarray, minimum: float, maximum: float):
+        """Append centroids without compressing."""
+        if not means.size:
+            return
+        self.means = np.concatenate((self.means, means))
+        self.weights = np.concatenate((self.weights, weights))
+        self.count += float(weights.sum())
+        self.min = min(self.min, minimum)
+        self.max = max(self.max, maximum)
+
+    def _scale(self, q: float) -> float:
+        """t-digest k1 scale function: maps a quantile to a centroid index."""
+        return self.compression / (2 * math.pi) * math.asin(2 * q - 1)
+
+    def _compress(self):
+        """Greedily merge adjacent centroids while each stays within one scale unit."""
+        if self.means.size <= 1:
+            return
+        order = np.argsort(self.means, kind="stable")
+        means = self.means[order]
+        weights = self.weights[order]
+
+        merged_means = []
+        merged_weights = []
+        total = self.count
+        current_mean = means[0]
+        current_weight = weights[0]
+        weight_before = 0.0
+        k_lower = self._scale(0.0)
+        for mean, weight in zip(means[1:].tolist(), weights[1:].tolist()):
+            q_upper = (weight_before + current_weight + weight) / total
+            if self._scale(min(q_upper, 1.0)) - k_lower <= 1.0:
+                # Fold into the current centroid (weighted mean)
+                current_weight += weight
+                current_mean += (mean - current_mean) * weight / current_weight
+            else:
+                merged_means.append(current_mean)
+                merged_weights.append(current_weight)
+                weight_before += current_weight
+                k_lower = self._scale(min(weight_before / total, 1.0))
+                current_mean = mean
+                current_weight = weight
+        merged_means.append(current_mean)
+        merged_weights.append(current_weight)
+
+        self.means = np.asarray(merged_means, dtype=np.float64)
+        self.weights = np.asarray(merged_weights, dtype=np.float64)
+
+    def _knots(self):
+        """Interpolation knots: (cumulative weight at centroid centers, value), with min/max at the ends."""
+        centers = np.cumsum(self.weights) - self.weights / 2
+        positions = np.concatenate(([0.0], centers, [self.count]))
+        values = np.concatenate(([self.min], self.means, [self.max]))
+        return positions, values
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimate the value at quantile q (0-1), or None for an empty sketch."""
+        if not self.count:
+            return None
+        positions, values = self._knots()
+        return float(np.interp(min(max(q, 0.0), 1.0) * self.count, positions, values))
+
+    def cdf(self, value: float) -> Optional[float]:
+        """Estimate the fraction of values at or below value (0-1), or None for an empty sketch."""
+        if not self.count:
+            return None
+        if value < self.min:
+            return 0.0
+        if value >= self.max:
+            return 1.0
+        positions, values = self._knots()
+        return float(np.interp(value, values, positions)) / self.count
+
+    def percentile_of(self, value: float) -> Optional[float]:
+        """Percentile rank (0-100) of value, or None for an empty sketch."""
+        fraction = self.cdf(value)
+        return fraction * 100 if fraction is not None else None
+
+    def mean(self) -> Optional[float]:
+        """Mean of the sketched values, or None for an empty sketch."""
+        if not self.count:
+            return None
+        return float(np.dot(self.means, self.weights) / self.count)
+
+    def to_dict(self) -> Dict:
+        """Serialize for JSON storage."""
+        return {
+            "compression": self.compression,
+            "count": self.count,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+            "centroids": [[m, w] for m, w in zip(self.means.tolist(), self.weights.tolist())],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "QuantileSketch":
+        """Deserialize a sketch written by to_dict()."""
+        sketch = cls(data.get("compression", cls.DEFAULT_COMPRESSION))
+        centroids = data.get("centroids") or []
+        if centroids:
+            array = np.asarray(centroids, dtype=np.float64)
+            sketch.means = array[:, 0]
+            sketch.weights = array[:, 1]
+            sketch.count = float(data["count"])
+            sketch.min = float(data["min"])
+            sketch.max = float(data["max"])
+        return sketch
@@ -0,0 +1,263 @@
+"""
+Trade persistence backends.
+
+This module provides the Storage facade used by the application to persist
+trades and strategies and to reload the day's trades on startup. Two
+backends are available (STORAGE_BACKEND):
+- "journal": an append-only JSON-lines journal per day (trades_YYYYMMDD.jsonl)
+  is the system of record; the Excel workbook is a derived export, saved on a
+  slow cadence (EXCEL_EXPORT_INTERVAL) or on demand
+- "excel": the daily Excel workbook is the system of record (legacy behaviour)
+
+Appending to the journal is a single buffered line write per record, and
+loading it is a JSON parse per line, instead of openpyxl cell-by-cell I/O.
+"""
+
+import json
+import logging
+from datetime import date, datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, TextIO, Tuple
+
+from app.config import EXCEL_EXPORT_INTERVAL, JOURNAL_DIR, STORAGE_BACKEND
+from app.excel_writer import ExcelWriter
+from app.models import Analytics, Strategy, Trade, validate_trades
+
+logger = logging.getLogger(__name__)
+
+
+def _json_default(value):
+    """Serialize values json does not handle natively (datetimes)."""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class TradeJournal:
+    """
+    Append-only daily journal of trades and strategies (JSON lines).
+
+    Each line is {"type": "trade" | "strategy", "data": {...}}. Records are
+    never rewritten: a later record for the same ID supersedes earlier ones
+    when the journal is loaded.
+
+    Attributes:
+        current_date: Date of the open journal file
+        current_file_path: Path to the open journal file
+    """
+
+    # Lines read between two progress callbacks when loading
+    PROGRESS_INTERVAL = 5000
+
+    def __init__(self, directory: Path = JOURNAL_DIR):
+        self.directory = directory
+        self.current_date: Optional[date] = None
+        self.current_file_path: Optional[Path] = None
+        self._file: Optional[TextIO] = None
+
+    def _get_file_path(self, target_date: date) -> Path:
+        """Get journal file path for a given date."""
+        return self.directory / f"trades_{target_date.strftime('%Y%m%d')}.jsonl"
+
+    def _ensure_file_open(self):
+        """Open today's journal for appending, rotating files at day change."""
+        today = date.today()
+        if self._file is not None and today == self.current_date:
+            return
+        self.close()
+        self.current_date = today
+        self.current_file_path = self._get_file_path(today)
+        # Line buffered: every record reaches the OS as soon as it is written
+        self._file = open(self.current_file_path, "a", encoding="utf-8", buffering=1)
+
+    def _append(self, record_type: str, data: dict):
+        """Append one record to today's journal."""
+        self._ensure_file_open()
+        self._file.write(json.dumps({"type": record_type, "data": data}, default=_json_default) + "\n")
+
+    def append_trade(self, trade: Trade):
+        """Journal a trade."""
+        self._append("trade", trade.dict())
+
+    def update_strategy(self, strategy: Strategy):
+        """Journal a strategy (the latest record per strategy_id wins)."""
+        self._append("strategy", strategy.dict())
+
+    def load_trades(
+        self,
+        target_date: Optional[date] = None,
+        progress: Optional[Callable[[int], None]] = None
+    ) -> List[Trade]:
+        """
+        Load the trades journaled on a given day (today by default).
+
+        Strategy records are applied on top, so trades get back the
+        strategy_id assigned after they were first journaled.
+
+        Args:
+            target_date: Day to load (default: today)
+            progress: Optional callback, called with the number of lines read so far
+
+        Returns:
+            Trades in journal order (one per dissemination_identifier)
+        """
+        trades, _ = self.load_records(target_date, progress)
+        return trades
+
+    def load_records(
+        self,
+        target_date: Optional[date] = None,
+        progress: Optional[Callable[[int], None]] = None
+    ) -> Tuple[List[Trade], List[Strategy]]:
+        """
+        Load the trades and strategies journaled on a given day (today by default).
+
+        Strategy records are applied on top of the trades, so trades get back
+        the strategy_id assigned after they were first journaled.
+
+        Args:
+            target_date: Day to load (default: today)
+            progress: Optional callback, called with the number of lines read so far
+
+        Returns:
+            Tuple of (trades in journal order, one per dissemination_identifier;
+            strategies, the latest record per strategy_id)
+        """
+        file_path = self._get_file_path(target_date or date.today())
+        if not file_path.exists():
+            logger.info(f"No journal file found at {file_path}")
+            return [], []
+
+        trade_data: Dict[str, dict] = {}
+        strategy_data: Dict[str, dict] = {}
+        line_number = 0
+        with open(file_path, "r", encoding="utf-8") as journal_file:
+            for line_number, line in enumerate(journal_file, 1):
+                if progress and line_number % self.PROGRESS_INTERVAL == 0:
+                    progress(line_number)
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                    data = record["data"]
+                    if record["type"] == "trade":
+                        trade_data[data["dissemination_identifier"]] = data
+                    elif record["type"] == "strategy":
+                        strategy_data[data["strategy_id"]] = data
+                except Exception as e:
+                    # Typically a line cut short by a crash while appending
+                    logger.warning(f"Skipping unreadable journal line {line_number} in {file_path}: {e}")
+
+        for strategy_id, data in strategy_data.items():
+            for trade_id in data.get("legs") or []:
+                if trade_id in trade_data:
+                    trade_data[trade_id]["strategy_id"] = strategy_id
+
+        records = list(trade_data.values())
+        trades, errors = validate_trades(records)
+        for index, error in errors:
+            logger.warning(f"Error loading trade {records[index].get('dissemination_identifier')} from journal: {error}")
+
+        strategies = []
+        for strategy_id, data in strategy_data.items():
+            try:
+                strategies.append(Strategy(**data))
+            except Exception as e:
+                logger.warning(f"Error loading strategy {strategy_id} from journal: {e}")
+        if progress:
+            progress(line_number)
+
+        logger.info(f"Loaded {len(trades)} trades and {len(strategies)} strategies from journal {file_path}")
+        return trades, strategies
+
+    def close(self):
+        """Close the open journal file."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class Storage:
+    """
+    Persistence facade: system of record plus Excel workbook.
+
+    With the "journal" backend, every write goes to the journal first and
+    is also queued to an ExcelWriter that only saves every
+    EXCEL_EXPORT_INTERVAL seconds (or when export_excel() is called). With
+    the "excel" backend, the ExcelWriter is the only store.
+
+    Attributes:
+        backend: Selected backend name
+        journal: TradeJournal (journal backend only)
+        excel_writer: ExcelWriter (system of record or export)
+    """
+
+    BACKENDS = ("journal", "excel")
+
+    def __init__(self, backend: str = STORAGE_BACKEND):
+        if backend not in self.BACKENDS:
+            raise ValueError(f"Unknown storage backend '{backend}' (expected one of {', '.join(self.BACKENDS)})")
+        self.backend = backend
+        if backend == "journal":
+            self.journal: Optional[TradeJournal] = TradeJournal()
+            # Durability comes from the journal: the export only saves on its cadence
+            self.excel_writer = ExcelWriter(save_interval=EXCEL_EXPORT_INTERVAL, save_batch_size=None)
+        else:
+            self.journal = None
+            self.excel_writer = ExcelWriter()
+        logger.info(f"Storage backend: {backend}")
+
+    def append_trade(self, trade: Trade):
+        """Persist a new trade."""
+        if self.journal is not None:
+            self.journal.append_trade(trade)
+        self.excel_writer.append_trade(trade)
+
+    def update_strategy(self, strategy: Strategy):
+        """Persist a new or updated strategy."""
+        if self.journal is not None:
+            self.journal.update_strategy(strategy)
+        self.excel_writer.update_strategy(strategy)
+
+    def update_analytics(self, analytics: Analytics):
+        """Record the latest analytics summary (Excel only: analytics are derived data)."""
+        self.excel_writer.update_analytics(analytics)
+
+    def load_trades(self, progress: Optional[Callable[[int], None]] = None) -> List[Trade]:
+        """
+        Load today's trades from the system of record.
+
+        This reads files synchronously; the application runs it in a worker
+        thread. progress is called with the number of rows/lines read so far.
+
+        With the journal backend, today's Excel file is used as a fallback
+        when there is no journal yet (e.g. first start after switching
+        backends), and journaled trades and strategies are re-queued to the
+        Excel export so that it catches up with anything not exported before
+        a restart.
+        """
+        if self.journal is None:
+            return self.excel_writer.load_trades_from_excel(progress)
+
+        trades, strategies = self.journal.load_records(progress=progress)
+        if not trades:
+            trades = self.excel_writer.load_trades_from_excel(progress)
+            for trade in trades:
+                self.journal.append_trade(trade)
+            return trades
+
+        for trade in trades:
+            self.excel_writer.append_trade(trade)
+        for strategy in strategies:
+            self.excel_writer.update_strategy(strategy)
+        return trades
+
+    def export_excel(self):
+        """Ask the Excel writer to save the workbook as soon as possible."""
+        self.excel_writer.request_save()
+
+    def close(self):
+        """Flush and close all stores."""
+        if self.journal is not None:
+            self.journal.close()
+        self.excel_writer.close()
@@ -0,0 +1,144 @@
+"""
+Time-ordered in-memory trade buffer.
+
+This module provides the TradeBuffer used by the application to hold the
+trades of the current session. Trades are kept sorted by execution time,
+with parallel NumPy columns (see app.columnar_store), so that:
+- "Trades since T" window queries are a bisect plus a slice (O(log n + k))
+- Eviction always drops the oldest executions first
+- Trades can be looked up by dissemination_identifier in O(1)
+- Analytics can run vectorized over the columns of any time window
+
+Trades almost always arrive in time order, in which case adding them is a
+plain append; late trades are inserted at their sorted position.
+"""
+
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Iterator, List, Optional
+
+import numpy as np
+
+from app.columnar_store import TradeColumns
+from app.models import Trade
+
+
+def to_epoch(timestamp: datetime) -> float:
+    """
+    Convert a datetime to a UTC epoch timestamp.
+
+    Naive datetimes are taken to be UTC, which is how the rest of the
+    application treats them (datetime.utcnow()).
+
+    Args:
+        timestamp: Naive (UTC) or timezone-aware datetime
+
+    Returns:
+        Seconds since the epoch as a float
+    """
+    if timestamp.tzinfo is None:
+        return timestamp.replace(tzinfo=timezone.utc).timestamp()
+    return timestamp.timestamp()
+
+
+class TradeBuffer:
+    """
+    Trade buffer kept sorted by execution timestamp.
+
+    Iteration, indexing and slicing go from the oldest to the newest
+    execution. Trades with identical timestamps keep their arrival order.
+    The columns attribute mirrors the buffer row for row, for vectorized
+    analytics.
+
+    Attributes:
+        columns: TradeColumns aligned with _trades (timestamps included)
+        _trades: Trades, sorted by execution time
+        _by_id: Trades by dissemination_identifier
+    """
+
+    # Out-of-order batches up to this size are inserted one by one;
+    # larger ones are merged with a single sort
+    INSERT_BATCH_LIMIT = 32
+
+    def __init__(self, trades: Optional[Iterable[Trade]] = None):
+        self.columns = TradeColumns()
+        self._trades: List[Trade] = []
+        self._by_id: Dict[str, Trade] = {}
+        if trades:
+            self.extend(trades)
+
+    def __len__(self) -> int:
+        return len(self._trades)
+
+    def __iter__(self) -> Iterator[Trade]:
+        return iter(self._trades)
+
+    def __reversed__(self) -> Iterator[Trade]:
+        return reversed(self._trades)
+
+    def __getitem__(self, index):
+        return self._trades[index]
+
+    def add(self, trade: Trade):
+        """Add a single trade at its position in time."""
+        self.extend([trade])
+
+    def extend(self, trades: Iterable[Trade]):
+        """Add a batch of trades, keeping the buffer sorted."""
+        batch = sorted(
+            ((to_epoch(trade.execution_timestamp), trade) for trade in trades),
+            key=lambda item: item[0]
+        )
+        if not batch:
+            return
+
+        timestamps = self.columns.timestamp
+        if not len(timestamps) or batch[0][0] >= timestamps[-1]:
+            # Common case: everything is newer than what we hold
+            self._trades.extend(trade for _, trade in batch)
+            self.columns.extend(batch)
+        elif len(batch) <= self.INSERT_BATCH_LIMIT:
+            for timestamp, trade in batch:
+                index = int(np.searchsorted(self.columns.timestamp, timestamp, side="right"))
+                self._trades.insert(index, trade)
+                self.columns.insert(index, timestamp, trade)
+        else:
+            # Two sorted runs: the stable sort merges them in linear time
+            merged = list(zip(timestamps.tolist(), self._trades)) + batch
+            merged.sort(key=lambda item: item[0])
+            self._trades = [trade for _, trade in merged]
+            self.columns.reset(merged)
+
+        for _, trade in batch:
+            self._by_id[trade.dissemination_identifier] = trade
+
+    def get(self, trade_id: str) -> Optional[Trade]:
+        """Return the buffered trade with this dissemination_identifier, if any."""
+        return self._by_id.get(trade_id)
+
+    def index_since(self, epoch: float) -> int:
+        """Return the index of the first trade executed at or after the given epoch timestamp."""
+        return int(np.searchsorted(self.columns.timestamp, epoch, side="left"))
+
+    def since(self, epoch: float) -> List[Trade]:
+        """Return trades executed at or after the given epoch timestamp, oldest first."""
+        return self._trades[self.index_since(epoch):]
+
+    def trim(self, max_size: int) -> List[Trade]:
+        """
+        Drop the oldest executions so that at most max_size trades remain.
+
+        Returns:
+            The removed trades, oldest first
+        """
+        excess = len(self._trades) - max_size
+        if excess <= 0:
+            return []
+
+        removed = self._trades[:excess]
+        del self._trades[:excess]
+        self.columns.drop_front(excess)
+        for trade in removed:
+            trade_id = trade.dissemination_identifier
+            if self._by_id.get(trade_id) is trade:
+                del self._by_id[trade_id]
+        return removed
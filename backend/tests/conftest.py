@@ -0,0 +1,19 @@
+"""
+Test configuration.
+
+The backend is imported as the `app` package (run pytest from backend/), and
+the output directories created by app.config on import point to a temporary
+directory so tests never touch the working directories.
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+_output_dir = Path(tempfile.mkdtemp(prefix="irs-tests-"))
+os.environ.setdefault("EXCEL_OUTPUT_DIR", str(_output_dir / "excel_output"))
+os.environ.setdefault("JOURNAL_DIR", str(_output_dir / "journal"))
@@ -0,0 +1,115 @@
+"""Tests for the versioned analytics stream (app.analytics_stream)."""
+
+import copy
+import json
+
+import pytest
+
+from app.analytics_stream import AnalyticsStream, diff_json
+
+
+def apply_patch(document, ops):
+    """Apply "add", "remove" and "replace" operations the way a client does (RFC 6902)."""
+    document = copy.deepcopy(document)
+    for op in ops:
+        if op["path"] == "":
+            assert op["op"] == "replace"
+            document = copy.deepcopy(op["value"])
+            continue
+        *parents, last = [
+            token.replace("~1", "/").replace("~0", "~")
+            for token in op["path"].split("/")[1:]
+        ]
+        target = document
+        for token in parents:
+            target = target[int(token)] if isinstance(target, list) else target[token]
+        if isinstance(target, list):
+            if op["op"] == "add" and last == "-":
+                target.append(copy.deepcopy(op["value"]))
+            elif op["op"] == "remove":
+                del target[int(last)]
+            else:
+                target[int(last)] = copy.deepcopy(op["value"])
+        elif op["op"] == "remove":
+            del target[last]
+        else:
+            target[last] = copy.deepcopy(op["value"])
+    return document
+
+
+ROUND_TRIPS = [
+    ({"a": 1, "b": {"c": 2}}, {"a": 1, "b": {"c": 3}}),
+    ({"a": 1, "b": 2}, {"a": 1, "c": 3}),
+    ({"values": [1, 2, 3]}, {"values": [1, 2, 3, 4, 5]}),
+    ({"values": [1, 2, 3, 4, 5]}, {"values": [1, 2]}),
+    ({"values": [{"x": 1}, {"x": 2}]}, {"values": [{"x": 1, "y": 0}]}),
+    ({"a/b": 1, "c~d": {"~/": 2}}, {"a/b": 2, "c~d": {"~/": 3}, "~1": 4}),
+    ({"flag": 1}, {"flag": True}),
+    ({"flag": True}, {"flag": 1}),
+    ({"value": 0}, {"value": False}),
+    ({"a": [1]}, {"a": {"b": 1}}),
+    ([1, 2], {"a": 1}),
+]
+
+
+@pytest.mark.parametrize("old,new", ROUND_TRIPS)
+def test_diff_then_apply_round_trips(old, new):
+    """Applying the diff of two trees to the first gives the second, types included."""
+    result = apply_patch(old, diff_json(old, new))
+    assert result == new
+    assert json.dumps(result) == json.dumps(new)
+
+
+def test_list_growth_and_shrink_use_append_and_trailing_removes():
+    """Appended items are added with "-", trailing items removed from the last one."""
+    old = {"values": ["first item", "second item"]}
+    grown = {"values": ["first item", "second item", "third item"]}
+    assert diff_json(old, grown) == [{"op": "add", "path": "/values/-", "value": "third item"}]
+    assert diff_json(grown, old) == [{"op": "remove", "path": "/values/2"}]
+
+
+def test_pointer_tokens_are_escaped():
+    """"~" and "/" in keys are escaped as "~0" and "~1"."""
+    ops = diff_json({"a/b~c": 1}, {"a/b~c": 2})
+    assert ops == [{"op": "replace", "path": "/a~1b~0c", "value": 2}]
+
+
+def test_identical_trees_produce_no_operations():
+    """Equal values of the same type produce nothing; True and 1 are different."""
+    tree = {"a": [1, {"b": None}], "c": "text"}
+    assert diff_json(tree, copy.deepcopy(tree)) == []
+    assert diff_json(1, True) == [{"op": "replace", "path": "", "value": True}]
+
+
+def wide_tree(offset):
+    """A tree of many metrics (each distinct from the other offsets)."""
+    return {"metrics": {f"metric_{i}": i + offset for i in range(50)}}
+
+
+def test_update_sends_patch_when_smaller():
+    """A small change is published as a patch against the previous version."""
+    stream = AnalyticsStream(resync_interval=0)
+    assert stream.update(wide_tree(0))[0] == AnalyticsStream.SNAPSHOT_TYPE
+
+    changed = wide_tree(0)
+    changed["metrics"]["metric_7"] = -1
+    message_type, text = stream.update(changed)
+    message = json.loads(text)
+    assert message_type == AnalyticsStream.PATCH_TYPE
+    assert message["data"]["base_version"] == 1 and message["data"]["version"] == 2
+    assert apply_patch(wide_tree(0), message["data"]["ops"]) == changed
+    assert stream.update(changed) is None
+    assert stream.unchanged == 1
+
+
+def test_update_sends_snapshot_when_patch_is_not_smaller():
+    """When most of the tree changed, the snapshot is sent instead of the patch."""
+    stream = AnalyticsStream(resync_interval=0)
+    stream.update(wide_tree(0))
+    stream.update(wide_tree(0) | {"extra": 1})
+
+    message_type, text = stream.update({"other": wide_tree(1000)})
+    message = json.loads(text)
+    assert message_type == AnalyticsStream.SNAPSHOT_TYPE
+    assert message["data"] == {"version": 3, "analytics": {"other": wide_tree(1000)}}
+    assert stream.snapshots == 2 and stream.patches == 1
@@ -0,0 +1,30 @@
+"""Tests for the batched Excel writer (app.excel_writer)."""
+
+from app.excel_writer import ExcelWriter
+from app.poller import convert_items
+
+from tests.test_poller import new_format_item
+
+
+def make_trades(count):
+    """Trades converted from new-format response items."""
+    trades = []
+    for _, item_trades, _, error in convert_items([new_format_item(i) for i in range(count)]):
+        assert error is None
+        trades.extend(item_trades)
+    return trades
+
+
+def test_failing_item_does_not_stop_the_batch():
+    """A bad item is skipped; the items after it are applied and counted for saving."""
+    writer = ExcelWriter(save_interval=3600, save_batch_size=None)
+    try:
+        trades = make_trades(2)
+        with writer.lock:
+            writer._ensure_file_exists()
+            pending_before = writer.pending_writes
+            writer._apply_items([("trade", trades[0]), ("trade", object()), ("trade", trades[1])])
+            assert writer.pending_writes - pending_before == 2
+            assert set(writer.trade_rows) >= {t.dissemination_identifier for t in trades}
+    finally:
+        writer.close()
@@ -0,0 +1,32 @@
+"""Tests for the multi-day historical index (app.historical_index)."""
+
+import os
+from datetime import date, timedelta
+
+from app.historical_index import HistoricalIndex
+
+
+def test_failed_day_is_retried_only_when_its_file_changes(tmp_path, monkeypatch):
+    """A day whose summary fails to build is not re-parsed on every refresh."""
+    day = date.today() - timedelta(days=1)
+    day_file = tmp_path / f"trades_{day.strftime('%Y%m%d')}.jsonl"
+    day_file.write_text("{not json\n", encoding="utf-8")
+    index = HistoricalIndex(excel_dir=tmp_path, journal_dir=tmp_path, index_dir=tmp_path)
+
+    calls = []
+
+    def failing_build(build_day, paths):
+        calls.append(build_day)
+        raise ValueError("corrupt day file")
+
+    monkeypatch.setattr(index, "_load_or_build_summary", failing_build)
+    assert index.refresh() is False
+    assert index.refresh() is False
+    assert calls == [day]
+    assert day in index.failed_days
+
+    stat = day_file.stat()
+    os.utime(day_file, (stat.st_atime, stat.st_mtime + 10))
+    monkeypatch.undo()
+    assert index.refresh() is True
+    assert day in index.summaries and day not in index.failed_days
@@ -0,0 +1,203 @@
+"""Tests for the streamed poll response parsing (app.poller)."""
+
+import asyncio
+import json
+
+import httpx
+
+from app import poller
+
+
+def old_format_item(i):
+    """Old internal API format (InternalAPIResponse, snake_case legs)."""
+    timestamp = f"2026-10-16T10:00:{i:02d}Z"
+    return {
+        "id": f"S{i}",
+        "date": timestamp,
+        "price": 1.0,
+        "legs": [{
+            "dissemination_identifier": f"D{i}",
+            "notional_amount": 1e8,
+            "notional_currency": "EUR",
+            "fixed_rate": 0.02,
+            "effective_date": "2026-10-18",
+            "expiration_date": "2031-10-18",
+            "instrument": "5Y",
+            "underlying_name": "EUR-EURIBOR",
+            "execution_timestamp": timestamp
+        }]
+    }
+
+
+def new_format_item(i):
+    """New strategy API format (StrategyAPIResponse, camelCase legs)."""
+    timestamp = f"2026-10-16T10:00:{i:02d}Z"
+    return {
+        "id": i,
+        "executionDateTime": timestamp,
+        "instrument": "5Y",
+        "underlier": "EUR-EURIBOR",
+        "legs": [{
+            "id": f"L{i}",
+            "executionTime": timestamp,
+            "notionalAmountLeg1": 1e8,
+            "fixedRateLeg1": 0.02,
+            "effectiveDate": "2026-10-18",
+            "expirationDate": "2031-10-18",
+            "tenorLeg1": "5Y"
+        }]
+    }
+
+
+def stream_body(body: bytes, monkeypatch, chunk_size: int):
+    """Stream a response body through stream_internal_api; return (trades, strategies)."""
+    monkeypatch.setattr(poller, "INGEST_CHUNK_SIZE", chunk_size)
+    transport = httpx.MockTransport(lambda request: httpx.Response(200, content=body))
+
+    async def run():
+        trades, strategies = [], []
+        async with httpx.AsyncClient(transport=transport) as client:
+            async for batch_trades, batch_strategies in poller.stream_internal_api(client):
+                trades.extend(batch_trades)
+                strategies.extend(batch_strategies)
+        return trades, strategies
+
+    return asyncio.run(run())
+
+
+def test_mixed_formats_across_chunks(monkeypatch):
+    """Each item keeps its own detected format, whichever chunk it is in."""
+    items = [old_format_item(i) if i % 2 else new_format_item(i) for i in range(9)]
+    body = json.dumps(items).encode()
+    counts_before = dict(poller.response_format_counts)
+
+    trades, strategies = stream_body(body, monkeypatch, chunk_size=64)
+
+    assert len(body) > 64 * 4  # Really split across several chunks
+    assert len(trades) == 9
+    assert poller.response_format_counts["internal_api"] - counts_before.get("internal_api", 0) == 4
+    assert poller.response_format_counts["strategy_api"] - counts_before.get("strategy_api", 0) == 5
+
+
+def test_chunked_body_matches_single_chunk(monkeypatch):
+    """Chunk boundaries do not change the parsed trades."""
+    items = [old_format_item(i) if i % 3 == 0 else new_format_item(i) for i in range(12)]
+    body = json.dumps(items).encode()
+
+    whole, _ = stream_body(body, monkeypatch, chunk_size=len(body) + 1)
+    chunked, _ = stream_body(body, monkeypatch, chunk_size=7)
+
+    assert [t.dissemination_identifier for t in chunked] == [t.dissemination_identifier for t in whole]
+
+
+def test_not_modified_full_fetch_counts_as_full_fetch():
+    """A 304 to a full fetch lets the next polls be incremental again."""
+    cursor = poller.PollCursor(full_resync_interval=3600)
+    cursor.high_water = 1_000_000.0
+    cursor.etag = '"v1"'
+    transport = httpx.MockTransport(lambda request: httpx.Response(304))
+
+    async def run():
+        async with httpx.AsyncClient(transport=transport) as client:
+            return [batch async for batch in poller.stream_internal_api(client, cursor=cursor)]
+
+    assert cursor.since() is None
+    assert asyncio.run(run()) == []
+    assert cursor.since() is not None
+
+
+def test_aclose_cancels_the_source_loops():
+    """aclose() stops the polling task (even mid-sleep) before closing the client."""
+    polls = []
+
+    def respond(request):
+        polls.append(request.url)
+        return httpx.Response(200, json=[])
+
+    async def run():
+        source = poller.PollSource("test", "http://api.test/trades", interval=60, interval_min=60, interval_max=60)
+        instance = poller.Poller(lambda trades, strategies: None, sources=[source])
+        await instance.client.aclose()
+        instance.client = httpx.AsyncClient(transport=httpx.MockTransport(respond))
+        instance.start()
+        while not polls:
+            await asyncio.sleep(0.01)
+        await asyncio.wait_for(instance.aclose(), timeout=5)
+        return instance
+
+    instance = asyncio.run(run())
+    assert instance.task.done()
+    assert instance.client.is_closed
+    assert len(polls) == 1
+
+
+def trade_reported_at(epoch, event_time=True):
+    """A converted new-format trade reported (eventTime) at the given epoch."""
+    item = new_format_item(int(epoch) % 1000)
+    timestamp = poller.format_since(epoch)
+    item["legs"][0]["eventTime" if event_time else "executionTime"] = timestamp
+    ((_, trades, _, error),) = poller.convert_items([item])
+    assert error is None
+    return trades[0]
+
+
+def incremental_poll(cursor, trades):
+    """Run one poll through the cursor as stream_internal_api does; return its since."""
+    since = cursor.start_poll()
+    cursor.observe(trades, since)
+    cursor.commit(httpx.Response(200), since)
+    return since
+
+
+def test_mark_follows_event_time_and_ignores_missing_times():
+    """The mark is the legs' eventTime; a leg without any time never moves it."""
+    base = 1_800_000_000.0
+    reported = trade_reported_at(base + 60)
+    assert poller.to_epoch(reported.reported_timestamp) == base + 60
+    assert reported.reported_timestamp != reported.execution_timestamp
+    assert "reported_timestamp" not in reported.dict()
+
+    untimed = new_format_item(1)
+    untimed["executionDateTime"] = None
+    del untimed["legs"][0]["executionTime"]
+    ((_, (untimed_trade,), _, _),) = poller.convert_items([untimed])
+    assert untimed_trade.reported_timestamp is None
+
+    cursor = poller.PollCursor(full_resync_interval=3600)
+    incremental_poll(cursor, [reported, untimed_trade])
+    assert cursor.high_water == base + 60
+
+
+def test_late_reported_trade_does_not_disable_since():
+    """A few trades older than `since` are not evidence the server ignores it."""
+    base = 1_800_000_000.0
+    cursor = poller.PollCursor(full_resync_interval=3600)
+    incremental_poll(cursor, [trade_reported_at(base)])
+    for step in range(1, 6):
+        since = incremental_poll(cursor, [
+            trade_reported_at(base - 3600),
+            trade_reported_at(base + step),
+            trade_reported_at(base + step + 0.5)
+        ])
+        assert since is not None
+    assert cursor.since_supported and cursor.ignored_polls == 0
+
+
+def test_since_ignored_after_repeated_polls_then_probed_again(monkeypatch):
+    """Several polls of mostly old trades in a row disable `since` until the next resync interval."""
+    monkeypatch.setattr(poller, "INTERNAL_API_SINCE_IGNORED_POLLS", 3)
+    base = 1_800_000_000.0
+    old_trades = [trade_reported_at(base - 600 + i) for i in range(3)]
+    cursor = poller.PollCursor(full_resync_interval=3600)
+    incremental_poll(cursor, [trade_reported_at(base)])
+
+    for polls in range(1, 4):
+        assert incremental_poll(cursor, old_trades) is not None
+        assert cursor.since_supported is (polls < 3)
+    assert cursor.since() is None
+
+    now = poller.time.monotonic()
+    monkeypatch.setattr(poller.time, "monotonic", lambda: now + 3600)
+    assert incremental_poll(cursor, old_trades) is None
+    assert cursor.since_supported and cursor.ignored_polls == 0
+    assert cursor.since() is not None
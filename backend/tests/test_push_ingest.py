@@ -0,0 +1,45 @@
+"""Tests for push ingestion (app.push_ingest)."""
+
+import asyncio
+
+from app.push_ingest import PushIngestor
+
+from tests.test_poller import new_format_item
+
+
+def test_stop_processes_queued_items():
+    """Items acknowledged before shutdown are processed, not dropped."""
+    async def run():
+        received = []
+
+        async def callback(trades, strategies):
+            received.extend(trades)
+            return len(trades)
+
+        ingestor = PushIngestor(callback, queue_size=100, batch_size=10, batch_delay=0)
+        ingestor.start()
+        await asyncio.sleep(0)  # Consumer now waits for items
+        ingestor.running = False  # Stop before it picks up the next items
+        assert ingestor.offer([new_format_item(i) for i in range(25)])
+        await ingestor.stop()
+        return ingestor, received
+
+    ingestor, received = asyncio.run(run())
+    assert len(received) == 25
+    assert ingestor.queue.empty()
+    assert ingestor.task.done()
+
+
+def test_stop_idle_consumer():
+    """An idle consumer blocked on the empty queue is cancelled and awaited."""
+    async def run():
+        async def callback(trades, strategies):
+            return len(trades)
+
+        ingestor = PushIngestor(callback, queue_size=10, batch_size=10, batch_delay=0)
+        ingestor.start()
+        await asyncio.sleep(0)
+        await asyncio.wait_for(ingestor.stop(), timeout=1)
+        return ingestor
+
+    assert asyncio.run(run()).task.done()
@@ -0,0 +1,55 @@
+"""Tests for the trade journal and storage facade (app.storage)."""
+
+from app.poller import convert_items
+from app.storage import Storage, TradeJournal
+
+from tests.test_excel_writer import make_trades
+from tests.test_poller import new_format_item
+
+
+def make_strategy():
+    """A strategy (and its trades) converted from a new-format response item."""
+    ((_, trades, strategy, error),) = convert_items([new_format_item(10)])
+    assert error is None and strategy is not None
+    return trades, strategy
+
+
+def test_journal_returns_strategies(tmp_path):
+    """Journaled strategies are loaded back (latest record wins) and applied to their legs."""
+    trades, strategy = make_strategy()
+    journal = TradeJournal(tmp_path)
+    for trade in trades:
+        journal.append_trade(trade)
+    journal.update_strategy(strategy.copy(update={"price": 1.0}))
+    journal.update_strategy(strategy.copy(update={"price": 2.0}))
+    journal.close()
+
+    loaded_trades, loaded_strategies = journal.load_records()
+    assert [s.strategy_id for s in loaded_strategies] == [strategy.strategy_id]
+    assert loaded_strategies[0].price == 2.0
+    assert all(t.strategy_id == strategy.strategy_id for t in loaded_trades)
+    assert journal.load_trades() == loaded_trades
+
+
+def test_restart_requeues_strategies_to_excel(tmp_path):
+    """On restart, journaled strategies are re-queued to the Excel export with the trades."""
+    trades, strategy = make_strategy()
+    storage = Storage("journal")
+    storage.journal.directory = tmp_path
+    storage.excel_writer.close()
+    try:
+        for trade in trades + make_trades(2):
+            storage.journal.append_trade(trade)
+        storage.journal.update_strategy(strategy)
+        storage.journal.close()
+        while not storage.excel_writer.write_queue.empty():
+            storage.excel_writer.write_queue.get_nowait()
+
+        storage.load_trades()
+        queued = []
+        while not storage.excel_writer.write_queue.empty():
+            queued.append(storage.excel_writer.write_queue.get_nowait())
+        assert [item.strategy_id for kind, item in queued if kind == "strategy"] == [strategy.strategy_id]
+        assert sum(1 for kind, _ in queued if kind == "trade") == len(trades) + 2
+    finally:
+        storage.journal.close()
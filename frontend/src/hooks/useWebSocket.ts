@@ -29,6 +29,57 @@ const getWsUrl = () => {
 
 const WS_URL = getWsUrl();
 
+// JSON-patch-style operation of an analytics_patch message (RFC 6902 subset)
+interface PatchOperation {
+  op: 'add' | 'remove' | 'replace';
+  path: string;
+  value?: unknown;
+}
+
+// Apply patch operations without mutating the input: only the objects and
+// arrays along the patched paths are copied, so unchanged subtrees keep their
+// identity (and memoized components do not re-render).
+const applyPatch = (doc: any, ops: PatchOperation[]): any => {
+  let root = doc;
+  const copied = new Set<any>();
+  const copyOf = (value: any) => {
+    if (copied.has(value)) return value;
+    const copy = Array.isArray(value) ? [...value] : { ...value };
+    copied.add(copy);
+    return copy;
+  };
+
+  for (const op of ops) {
+    if (op.path === '') {
+      root = op.value;
+      continue;
+    }
+    const keys = op.path
+      .split('/')
+      .slice(1)
+      .map(k => k.replace(/~1/g, '/').replace(/~0/g, '~'));
+    root = copyOf(root);
+    let parent = root;
+    for (let i = 0; i < keys.length - 1; i++) {
+      const child = copyOf(parent[keys[i]]);
+      parent[keys[i]] = child;
+      parent = child;
+    }
+    const last = keys[keys.length - 1];
+    if (Array.isArray(parent)) {
+      if (op.op === 'remove') parent.splice(Number(last), 1);
+      else if (op.op === 'add' && last === '-') parent.push(op.value);
+      else if (op.op === 'add') parent.splice(Number(last), 0, op.value);
+      else parent[Number(last)] = op.value;
+    } else if (op.op === 'remove') {
+      delete parent[last];
+    } else {
+      parent[last] = op.value;
+    }
+  }
+  return root;
+};
+
 export function useWebSocket() {
   const [trades, setTrades] = useState<Trade[]>([]);
   const [strategies, setStrategies] = useState<Strategy[]>([]);
@@ -38,6 +89,11 @@ export function useWebSocket() {
   const wsRef = useRef<WebSocket | null>(null);
   const reconnectTimeoutRef = useRef<number>();
 
+  // Versioned analytics stream: snapshot on connect, then patches
+  const analyticsTreeRef = useRef<any>(null);
+  const analyticsVersionRef = useRef<number | null>(null);
+  const resyncRequestedRef = useRef(false);
+
   // ---------------------------------------------------------------------------
   // Trade/strategy caches: keep UI stable across reconnects and avoid full reload.
   // ---------------------------------------------------------------------------
@@ -301,6 +357,9 @@ export function useWebSocket() {
       ws.onopen = () => {
         console.log('WebSocket connected');
         setConnected(true);
+        // The server sends a fresh analytics snapshot on every connection
+        analyticsVersionRef.current = null;
+        resyncRequestedRef.current = false;
         if (reconnectTimeoutRef.current) {
           clearTimeout(reconnectTimeoutRef.current);
         }
@@ -351,13 +410,26 @@ export function useWebSocket() {
                 if (strategiesChanged) pendingStrategiesRef.current = true;
                 if (tradesChanged || strategiesChanged) scheduleFlush();
                 
-                if (data?.analytics) {
+                // Summary only: the full tree comes with analytics_snapshot
+                if (data?.analytics && analyticsVersionRef.current === null) {
                   setAnalytics(data.analytics);
                 }
               }
               break;
             
+            case 'new_trades':
+              {
+                // One message per processed batch of trades
+                const newTrades = (message.data ?? []) as Trade[];
+                if (upsertTrades(newTrades, { allowReorder: true })) {
+                  pendingTradesRef.current = true;
+                  scheduleFlush();
+                }
+              }
+              break;
+            
             case 'new_trade':
+              // Legacy per-trade message (WS_LEGACY_TRADE_MESSAGES)
               {
                 const newTrade = message.data as Trade;
                 if (upsertTrade(newTrade, { allowReorder: true })) {
@@ -380,6 +452,30 @@ export function useWebSocket() {
               }
               break;
             
+            case 'package_updated':
+              {
+                // A package gained legs: refresh the legs already cached
+                // (the new legs arrive with the package in new_trades)
+                const update = message.data as {
+                  package_key: string;
+                  parent_trade_id: string;
+                  legs: Trade[];
+                  legs_count: number;
+                };
+                const updatedLegs: Trade[] = [];
+                for (const leg of update.legs ?? []) {
+                  const cached = tradeCacheRef.current.get(leg.dissemination_identifier);
+                  if (cached) {
+                    updatedLegs.push({ ...cached, package_legs: update.legs, package_legs_count: update.legs_count });
+                  }
+                }
+                if (upsertTrades(updatedLegs, { allowReorder: false })) {
+                  pendingTradesRef.current = true;
+                  scheduleFlush();
+                }
+              }
+              break;
+            
             case 'strategy_detected':
               {
                 const strategy = message.data as Strategy;
@@ -397,7 +493,39 @@ export function useWebSocket() {
               });
               break;
             
+            case 'analytics_snapshot':
+              {
+                const snapshot = message.data as { version: number; analytics: Analytics };
+                analyticsTreeRef.current = snapshot.analytics;
+                analyticsVersionRef.current = snapshot.version;
+                resyncRequestedRef.current = false;
+                setAnalytics(snapshot.analytics);
+              }
+              break;
+            
+            case 'analytics_patch':
+              {
+                const patch = message.data as { base_version: number; version: number; ops: PatchOperation[] };
+                const current = analyticsVersionRef.current;
+                if (current !== null && patch.version <= current) {
+                  break; // Already included in the snapshot we have
+                }
+                if (current === null || patch.base_version !== current || !analyticsTreeRef.current) {
+                  // Missed a version: ask for a snapshot (once) and ignore patches until it arrives
+                  if (!resyncRequestedRef.current && ws.readyState === WebSocket.OPEN) {
+                    resyncRequestedRef.current = true;
+                    ws.send(JSON.stringify({ type: 'resync' }));
+                  }
+                  break;
+                }
+                analyticsTreeRef.current = applyPatch(analyticsTreeRef.current, patch.ops);
+                analyticsVersionRef.current = patch.version;
+                setAnalytics(analyticsTreeRef.current as Analytics);
+              }
+              break;
+            
             case 'analytics_update':
+              // Legacy full update (WS_LEGACY_ANALYTICS_MESSAGES)
               setAnalytics(message.data as Analytics);
               break;
           }